@@ -10,6 +10,9 @@ from GUI.dialogs.observatory_dialog import ObservatoryDialog
 from GUI.dialogs.target_dialog import TargetDialog
 from GUI.dialogs.window_dialog import WindowDialog
 
+#rows shown per result tab; busy nights have thousands of stretches
+SUMMARY_LIMIT = 50
+
 
 class MainWindow(QMainWindow):
     def __init__(self, state: AppState):
@@ -27,6 +30,7 @@ class MainWindow(QMainWindow):
         self._state.log_message.connect(self.log_view.append)
         self._state.analysis_complete.connect(self._on_analysis_done)
         self._state.analysis_failed.connect(self._on_analysis_failed)
+        self._state.analysis_progress.connect(self._on_analysis_progress)
 
     def _build_ui(self):
         central = QWidget()
@@ -136,8 +140,15 @@ class MainWindow(QMainWindow):
         self.export_csv_btn.setEnabled(True)
         self.export_video_btn.setEnabled(True)
         gap = self._state.window[2]
-        self.clean_stretches_view.setPlainText(results.analyser.clean_stretches_summary(gap))
-        self.linked_groups_view.setPlainText(results.analyser.linked_groups_summary(gap))
+        self.clean_stretches_view.setPlainText(results.analyser.clean_stretches_summary(gap, limit=SUMMARY_LIMIT))
+        self.linked_groups_view.setPlainText(results.analyser.linked_groups_summary(gap, limit=SUMMARY_LIMIT))
+
+    def _on_analysis_progress(self, analyser, done: int, total: int):
+        """Provisional clean stretches while shards or batches are still running."""
+        gap = self._state.window[2]
+        header = f"(provisional: {done}/{total} chunks complete)\n"
+        self.clean_stretches_view.setPlainText(header + analyser.clean_stretches_summary(gap, limit=SUMMARY_LIMIT))
+        self.linked_groups_view.setPlainText(header + analyser.linked_groups_summary(gap, limit=SUMMARY_LIMIT))
 
     def _on_analysis_failed(self, error: str):
         QMessageBox.critical(self, "Analysis Failed", error)
@@ -159,8 +170,7 @@ class MainWindow(QMainWindow):
     def _select_window(self):
         dlg = WindowDialog(self)
         if dlg.exec():
-            self._state.window = dlg.result()
-            self._state.state_changed.emit()
+            self._state.set_window(dlg.result())
 
     def _run_analysis(self):
         self._state.run_analysis()  #AppState owns this, not MainWindow
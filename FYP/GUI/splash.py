@@ -7,19 +7,19 @@ from core.paths import get_asset_path
 
 
 class SplashScreen(QDialog):
-    ready = pyqtSignal(str)
+    ready = pyqtSignal(list)
     
     @property
-    def tle_file(self) -> str | None:
-        return self._tle_file
+    def tle_files(self) -> list[str]:
+        return self._tle_files
     
-    def __init__(self, group: str = "active"):
+    def __init__(self, data_type: str = "active", source: str | None = None):
         super().__init__()
         self.setWindowTitle("RFI Window Analyser")
         self.setFixedSize(400, 200)
         self.setWindowFlags(Qt.WindowType.FramelessWindowHint)
 
-        self._tle_file = None
+        self._tle_files = []
 
         layout = QVBoxLayout(self)
         layout.setAlignment(Qt.AlignmentFlag.AlignCenter)
@@ -36,7 +36,7 @@ class SplashScreen(QDialog):
         layout.addStretch()
         layout.addWidget(self._close_btn)
 
-        self._thread = TLELoaderThread(group)
+        self._thread = TLELoaderThread(data_type, source)
         self._thread.status.connect(self._status_label.setText)
         self._thread.finished.connect(self._on_thread_done)
         self._thread.start()
@@ -47,13 +47,13 @@ class SplashScreen(QDialog):
         layout.addWidget(self._spinner, alignment=Qt.AlignmentFlag.AlignCenter)
         self._movie.start()
 
-    def _on_thread_done(self, tle_file: str):
-        self._tle_file = tle_file
+    def _on_thread_done(self, tle_files: list):
+        self._tle_files = tle_files
         self._status_label.setText("TLE catalogue ready.")
         self._close_btn.setEnabled(True)
         self._movie.stop()
         self._spinner.hide()
 
     def _on_close(self):
-        self.ready.emit(self._tle_file)
+        self.ready.emit(self._tle_files)
         self.accept()
\ No newline at end of file
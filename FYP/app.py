@@ -11,9 +11,9 @@ from pathlib import Path
 from PyQt6.QtWidgets import QApplication
 from PyQt6.QtGui import QIcon
 
+from config import DATA_TYPE, TLE_SOURCE
 from core.app_state import AppState
 from core.paths import get_base_dir, get_asset_path
-from enums.tle_group import TLEGroup
 from GUI.splash import SplashScreen
 from GUI.main_window import MainWindow
 
@@ -58,10 +58,10 @@ def run():
 
     state = AppState()
 
-    splash = SplashScreen(TLEGroup.ACTIVE)
+    splash = SplashScreen(DATA_TYPE, TLE_SOURCE)
     splash.exec()
 
-    state.set_tle_file(splash.tle_file)
+    state.set_tle_files(splash.tle_files)
 
     window = MainWindow(state)
     window.show()
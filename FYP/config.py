@@ -25,6 +25,17 @@ GAIN_CUTOFF_PERCENT = 3
 
 #TLE catalogue
 DATA_TYPE = "active"
+#None for CelesTrak, or a URL template containing {group} / a local mirror directory for offline sites
+TLE_SOURCE = None
+
+#campaign mode (python main.py --campaign DATE_BEGIN DATE_END): each night's search span in UTC,
+#narrowed to the longest stretch with the target above the altitude limit (None for no limit)
+CAMPAIGN_NIGHT_START_UTC = "18:00"
+CAMPAIGN_NIGHT_HOURS = 12.0
+CAMPAIGN_MIN_ALTITUDE_DEG = 20.0
+
+#propagation backend: "sopp" or "native" (vectorised SGP4)
+PROPAGATION_BACKEND = "sopp"
 
 #runtime settings
 CONCURRENCY_LEVEL = os.cpu_count()
\ No newline at end of file
@@ -1,9 +1,59 @@
+import dataclasses
 import pytest
 import os
+from pathlib import Path
+import numpy as np
 from PyQt6.QtWidgets import QApplication
+from core.run_config import RunConfig
+from core.time_bins import TimeBins
+
+ACTIVE_TLE = Path(__file__).resolve().parent / "data" / "active.tle"
+SITE = (40.8, -121.4, 986)
 
 @pytest.fixture(scope="session")
 def qapp():
     os.environ["QT_QPA_PLATFORM"] = "offscreen"
     app = QApplication.instance() or QApplication([])
-    return app
\ No newline at end of file
+    return app
+
+
+# --- Shared propagation helpers ---
+
+class StaticObserver:
+    """Picklable stand-in for Observer with a fixed pointing (no ephemeris download)."""
+    def __init__(self, alt, az, n=0):
+        self.alt, self.az = alt, az
+        self.target_alts = np.full(n, alt)
+        self.target_azs = np.full(n, az)
+
+    def get_target_position(self, sat_time):
+        return self.alt, self.az
+
+def static_observer(run_config):
+    """Observer factory for worker processes: a StaticObserver at run_config's pointing over its window."""
+    n = TimeBins.for_window(run_config.time_begin, run_config.time_end, run_config.time_resolution_seconds).n_steps
+    return StaticObserver(run_config.altitude_deg, run_config.azimuth_deg, n)
+
+def write_tle_subset(path, count):
+    """First count satellites of data/active.tle written to path."""
+    path.write_text("\n".join(ACTIVE_TLE.read_text().splitlines()[:3 * count]) + "\n")
+    return str(path)
+
+@pytest.fixture
+def tle_subset(request, tmp_path):
+    """
+    TLE file of the first satellites of data/active.tle: 200 by default, a
+    module's TLE_COUNT, or n with parametrize("tle_subset", [n], indirect=True).
+    """
+    count = getattr(request, "param", getattr(request.module, "TLE_COUNT", 200))
+    return write_tle_subset(tmp_path / "subset.tle", count)
+
+def make_run_config(**overrides) -> RunConfig:
+    """RunConfig for a 20 m dish at 135 MHz at the test site, pointing at alt 60 az 180 from 19:00 to 19:10."""
+    config = RunConfig(
+        latitude=SITE[0], longitude=SITE[1], elevation_m=SITE[2],
+        dish_diameter_m=20.0, frequency_hz=135e6,
+        time_begin="2026-04-06T19:00:00", time_end="2026-04-06T19:10:00",
+        azimuth_deg=180.0, altitude_deg=60.0,
+    )
+    return dataclasses.replace(config, **overrides)
@@ -7,11 +7,7 @@ import matplotlib
 matplotlib.use('Agg')  #non-interactive backend, no GUI windows
 
 from core.run_config import RunConfig
-from models.beam_model import BeamModel
-from core.observer import Observer
-from core.checker import InterferenceChecker
-from core.sopp_runner import SOPPRunner
-from core.window_analyser import WindowAnalyser
+from core.propagation_service import PropagationService
 from core.paths import get_base_dir
 output_dir = get_base_dir() / "outputs"
 output_dir.mkdir(exist_ok=True)
@@ -32,11 +28,13 @@ class AnalysisThread(QThread):
     log_message = pyqtSignal(str)
     finished = pyqtSignal(object, object, list, object, str, object)  # beam, observer, results, output_dir, timestamp, analyser
     failed = pyqtSignal(str)
+    progress = pyqtSignal(object, int, int)  # provisional IncrementalWindowAnalyser, chunks done, chunks total
 
-    def __init__(self, run_config: RunConfig, tle_file: str):
+    def __init__(self, run_config: RunConfig, tle_files: str | list[str], service: PropagationService | None = None):
         super().__init__()
         self._run_config = run_config
-        self._tle_file = tle_file
+        self._tle_files = tle_files
+        self._service = service or PropagationService() #AppState passes its long-lived service so runs stay warm
 
     def run(self):
         handler = QtLogHandler(self.log_message)
@@ -49,40 +47,9 @@ class AnalysisThread(QThread):
             log.info(f"Dish Size={self._run_config.dish_diameter_m}m")
             log.info(f"Frequency={self._run_config.frequency_hz/1e6}MHz")
             log.info(f"Main Beam Only? {self._run_config.bypass_airy}")
-            observer = Observer(
-                latitude=self._run_config.latitude,
-                longitude=self._run_config.longitude,
-                elevation_m=self._run_config.elevation_m,
-                time_begin=self._run_config.time_begin,
-                time_end=self._run_config.time_end,
-                ra_hours=self._run_config.ra_hours,
-                dec_degrees=self._run_config.dec_degrees,
-                azimuth_deg=self._run_config.azimuth_deg,
-                altitude_deg=self._run_config.altitude_deg,
-            )
-            beam_model = BeamModel(
-                dish_diameter_m=self._run_config.dish_diameter_m,
-                frequency_hz=self._run_config.frequency_hz,
-                gain_cutoff_percent=self._run_config.gain_cutoff_percent,
-                bypass=self._run_config.bypass_airy
-            )
-            if self._run_config.bypass_airy:
-                beam_model.prefilter_radius_deg = self._run_config.manual_beamwidth_deg / 2
-                beam_model.fwhm_deg = self._run_config.manual_beamwidth_deg / 2
-
-            runner = SOPPRunner(beam_model, self._run_config, self._tle_file)
-            interference_events = runner.run()
-            log.info(f"SOPP returned {len(interference_events)} events")
-
-            checker = InterferenceChecker(beam_model, observer)
-            results = checker.check(interference_events)
-            log.info(f"Check flagged {len(results)} position points")
-
-            analyser = WindowAnalyser(
-                results,
-                self._run_config.time_begin,
-                self._run_config.time_end
-            )
+            output = self._service.run(self._run_config, self._tle_files, on_progress=self.progress.emit)
+            beam_model, observer = output.beam_model, output.observer
+            results, analyser = output.results, output.analyser
             timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
             log.info("Analysis complete.")
             self.finished.emit(beam_model, observer, results, output_dir, timestamp, analyser)
@@ -7,6 +7,7 @@ from typing import Optional
 from pathlib import Path
 from core.run_config import RunConfig
 from core.analysis_thread import AnalysisThread, VideoExportThread
+from core.propagation_service import PropagationService
 
 log = logging.getLogger(__name__)
 
@@ -48,23 +49,43 @@ class AppState(QObject):
     log_message = pyqtSignal(str)
     analysis_complete = pyqtSignal(object)
     analysis_failed = pyqtSignal(str)
+    analysis_progress = pyqtSignal(object, int, int)
 
     def __init__(self):
         super().__init__()
-        self.tle_file: Optional[str] = None
+        self.tle_files: list[str] = [] #one file per loaded TLEGroup, merged by the propagation service
         self.observatory: Optional[Observatory] = None
         self.target: Optional[Target] = None
         self.window: Optional[tuple[str, str, int]] = None
         self._results: Optional[AnalysisResults] = None
         self._thread: Optional[AnalysisThread] = None
         self._video_thread = None
+        self.propagation_service = PropagationService() #keeps parsed catalogues, beams and observers warm across runs
+
+    @property
+    def tle_file(self) -> Optional[str]:
+        return self.tle_files[0] if self.tle_files else None
+
+    @tle_file.setter
+    def tle_file(self, tle_file: Optional[str]):
+        self.tle_files = [tle_file] if tle_file else []
 
     def set_tle_file(self, tle_file: str):
-        self.tle_file = tle_file
+        self.set_tle_files([tle_file])
+
+    def set_tle_files(self, tle_files: list[str]):
+        self.tle_files = list(tle_files)
+        self.state_changed.emit()
+
+    def set_window(self, window: tuple[str, str, int]):
+        previous, self.window = self.window, window
+        if self._results and previous and previous[:2] == window[:2] and previous[2] != window[2]:
+            #gap tolerance is applied after the run; regroup the last results instead of re-running
+            self.analysis_complete.emit(self._results)
         self.state_changed.emit()
 
     def is_ready(self) -> bool:
-        return all([self.tle_file, self.observatory, self.target, self.window])
+        return all([self.tle_files, self.observatory, self.target, self.window])
 
     def build_run_config(self) -> RunConfig:
         assert self.observatory and self.target and self.window
@@ -92,10 +113,11 @@ class AppState(QObject):
         if not self.is_ready():
             return
         run_config = self.build_run_config()
-        self._thread = AnalysisThread(run_config, self.tle_file)
+        self._thread = AnalysisThread(run_config, self.tle_files, self.propagation_service)
         self._thread.log_message.connect(self.log_message)
         self._thread.finished.connect(self._on_analysis_done)
         self._thread.failed.connect(self._on_analysis_failed)
+        self._thread.progress.connect(self.analysis_progress)
         self._thread.start()
 
     def _on_analysis_done(self, beam_model, observer, results, output_dir, timestamp, analyser):
@@ -0,0 +1,158 @@
+import dataclasses
+import logging
+import multiprocessing
+import os
+import tempfile
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from core.observer import TargetTrack
+from core.run_config import RunConfig
+from core.sharded_runner import make_beam_model, make_observer
+from core.tle_catalogue import read_tle_file
+from core.window_analyser import WindowAnalyser
+
+log = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 500
+
+
+@dataclass
+class BatchResult:
+    index: int
+    satellites: int
+    results: list = field(default_factory=list)
+    seconds: float = 0.0
+
+
+def write_batches(tle_file: str, batch_size: int, directory: Path) -> list[tuple[str, int]]:
+    """
+    Split a TLE file into consecutive files of at most batch_size satellites.
+
+    :returns: List of (path, satellite count) per batch, in catalogue order.
+    """
+    entries = read_tle_file(tle_file)
+    batches = []
+    for i, start in enumerate(range(0, len(entries), batch_size)):
+        chunk = entries[start:start + batch_size]
+        path = directory / f"batch_{i:05d}.tle"
+        path.write_text("".join(f"{name}\n{l1}\n{l2}\n" for name, l1, l2 in chunk))
+        batches.append((str(path), len(chunk)))
+    return batches
+
+
+def run_batch(run_config: RunConfig, tle_file: str, index: int, satellites: int, track) -> BatchResult:
+    """
+    Propagate and check one satellite batch in a worker process, returning
+    only the flagged points. Propagated positions are dropped with the worker's
+    locals, so they never travel back to the orchestrator.
+
+    :param track: TargetTrack (or Observer) giving the target position over the window.
+    """
+    from core.checker import InterferenceChecker
+    from core.runner_factory import create_runner
+
+    start = time.perf_counter()
+    beam_model = make_beam_model(run_config)
+    events = create_runner(beam_model, run_config, tle_file, track).run()
+    results = InterferenceChecker(beam_model, track).check(events)
+    return BatchResult(index, satellites, results, time.perf_counter() - start)
+
+
+class BatchRunner:
+    """
+    Propagates a catalogue as satellite batches on a process pool.
+
+    Each batch is propagated and checked by a worker that returns only its
+    flagged points. At most max_in_flight batches are submitted at once (and
+    never more workers than that are started), so peak memory is set by the
+    batch size and the cap, not by the size of the catalogue. The Observer is
+    built once here and only its target track is sent with each batch.
+
+    :param run_config: RunConfig for the whole run.
+    :param tle_file: Path to the TLE catalogue.
+    :param batch_size: Satellites per batch.
+    :param max_workers: Worker processes; defaults to run_config.concurrency_level.
+    :param max_in_flight: Batches submitted but not yet collected; defaults to twice the workers.
+        A smaller cap than max_workers also limits the workers started.
+    :param observer_factory: Callable building the Observer for a RunConfig, once per run.
+    """
+    def __init__(self, run_config: RunConfig, tle_file: str, batch_size: int = DEFAULT_BATCH_SIZE,
+                 max_workers: int | None = None, max_in_flight: int | None = None,
+                 observer_factory=make_observer):
+        if batch_size <= 0:
+            raise ValueError(f"batch_size must be greater than 0, provided: {batch_size}")
+        if max_in_flight is not None and max_in_flight <= 0:
+            raise ValueError(f"max_in_flight must be greater than 0, provided: {max_in_flight}")
+        self.tle_file = tle_file
+        self.batch_size = batch_size
+        self.max_workers = max_workers or run_config.concurrency_level or os.cpu_count() or 1
+        self.max_in_flight = max_in_flight or 2 * self.max_workers
+        self.observer_factory = observer_factory
+        self.peak_in_flight = 0
+        #per-batch files would only churn the result and pass-index caches
+        self.run_config = dataclasses.replace(
+            run_config, concurrency_level=1, result_cache=False, use_pass_index=False,
+        )
+
+    def _track(self) -> TargetTrack:
+        observer = self.observer_factory(self.run_config)
+        return TargetTrack.of(observer, self.run_config.time_begin, self.run_config.time_end)
+
+    def _collect(self, batches, pool, track, on_chunk=None) -> list[BatchResult]:
+        collected = []
+        pending = set()
+        queue = iter(enumerate(batches))
+        while True:
+            for index, (path, count) in queue:
+                pending.add(pool.submit(run_batch, self.run_config, path, index, count, track))
+                if len(pending) >= self.max_in_flight:
+                    break
+            if not pending:
+                return collected
+            self.peak_in_flight = max(self.peak_in_flight, len(pending))
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                result = future.result()
+                log.info(f"Batch {result.index + 1}/{len(batches)}: {result.satellites} satellites, "
+                         f"{len(result.results)} flagged points in {result.seconds:.1f}s")
+                collected.append(result)
+                if on_chunk is not None:
+                    on_chunk(result.results, None, len(collected), len(batches))
+
+    def run(self, on_chunk=None) -> tuple[list, WindowAnalyser]:
+        """
+        :param on_chunk: Optional callback(results, covered, done, total) called
+            in this process as each batch completes; covered is always None
+            since every batch spans the whole window.
+        :returns: Tuple of (flagged points in batch order, WindowAnalyser over the window).
+        """
+        start = time.perf_counter()
+        with tempfile.TemporaryDirectory(prefix="batches_") as directory:
+            batches = write_batches(self.tle_file, self.batch_size, Path(directory))
+            if not batches:
+                raise RuntimeError("Satellites list empty.")
+            workers = min(self.max_workers, self.max_in_flight, len(batches))
+            track = self._track()
+            log.info(f"Propagating {len(batches)} batches of up to {self.batch_size} satellites "
+                     f"on {workers} worker processes ({self.max_in_flight} in flight)...")
+            if workers == 1:
+                collected = []
+                for i, (path, count) in enumerate(batches):
+                    collected.append(run_batch(self.run_config, path, i, count, track))
+                    if on_chunk is not None:
+                        on_chunk(collected[-1].results, None, len(collected), len(batches))
+            else:
+                #spawn rather than fork: the GUI process holds Qt and logging threads
+                context = multiprocessing.get_context("spawn")
+                with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+                    collected = self._collect(batches, pool, track, on_chunk)
+
+        collected.sort(key=lambda r: r.index)
+        results = [row for r in collected for row in r.results]
+        busy = sum(r.seconds for r in collected)
+        log.info(f"Batched run finished in {time.perf_counter() - start:.1f}s "
+                 f"({busy:.1f}s of batch work, {len(results)} flagged points)")
+        return results, WindowAnalyser.for_run(results, self.run_config)
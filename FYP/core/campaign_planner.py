@@ -0,0 +1,308 @@
+import dataclasses
+import hashlib
+import json
+import logging
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+
+import numpy as np
+
+from core.paths import get_data_dir
+from core.run_config import RunConfig
+from core.sharded_runner import make_observer
+from core.window_analyser import run_bounds
+
+log = logging.getLogger(__name__)
+
+ALTITUDE_STEP_SECONDS = 60
+DEFAULT_BLOCKS_PER_NIGHT = 5
+
+
+def campaign_dir() -> Path:
+    path = get_data_dir() / "campaigns"
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def _iso(t: datetime) -> str:
+    return t.replace(tzinfo=None).isoformat()
+
+
+@dataclass(frozen=True)
+class NightlyWindow:
+    """
+    Which part of each night to analyse.
+
+    :param start_utc: UTC clock time ("HH:MM") each night's search span starts.
+    :param hours: Length of the search span; it may run past midnight.
+    :param min_altitude_deg: If set, only the longest stretch of the span with
+        the target at or above this altitude is analysed.
+    :param min_minutes: Nights whose window is shorter than this are skipped.
+    """
+    start_utc: str = "00:00"
+    hours: float = 24.0
+    min_altitude_deg: float | None = None
+    min_minutes: float = 10.0
+
+
+@dataclass
+class CampaignNight:
+    night: str          # ISO date the search span starts on
+    time_begin: str
+    time_end: str
+
+
+@dataclass
+class CampaignBlock:
+    start: str
+    end: str
+    clean_seconds: float
+    span_seconds: float
+
+
+@dataclass
+class NightResult:
+    night: str
+    time_begin: str
+    time_end: str
+    flagged_points: int
+    clean_seconds: float
+    blocks: list[CampaignBlock] = field(default_factory=list)
+    seconds: float = 0.0
+
+    @property
+    def best_block_seconds(self) -> float:
+        return self.blocks[0].clean_seconds if self.blocks else 0
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "NightResult":
+        blocks = [CampaignBlock(**b) for b in data.get("blocks", [])]
+        return cls(**{**data, "blocks": blocks})
+
+
+def target_altitude_deg(run_config: RunConfig, times: list[datetime]) -> np.ndarray:
+    """
+    Approximate target altitude in degrees at each UTC time, from GMST and the
+    J2000 RA/Dec without precession or refraction (a few tenths of a degree),
+    so nightly windows can be planned without the planetary ephemeris.
+    """
+    if run_config.is_static():
+        return np.full(len(times), float(run_config.altitude_deg))
+    from skyfield.api import load
+    from skyfield.sgp4lib import theta_GMST1982
+
+    t = load.timescale().from_datetimes(times)
+    gmst, _ = theta_GMST1982(t.whole, t.ut1_fraction)
+    hour_angle = gmst + np.radians(run_config.longitude) - np.radians(run_config.ra_hours * 15.0)
+    lat, dec = np.radians(run_config.latitude), np.radians(run_config.dec_degrees)
+    sin_alt = np.sin(lat) * np.sin(dec) + np.cos(lat) * np.cos(dec) * np.cos(hour_angle)
+    return np.degrees(np.arcsin(np.clip(sin_alt, -1.0, 1.0)))
+
+
+def plan_nights(run_config: RunConfig, date_begin: str, date_end: str, window: NightlyWindow) -> list[CampaignNight]:
+    """
+    One analysis window per night from date_begin to date_end inclusive
+    (ISO dates). Nights whose window is shorter than window.min_minutes are left out.
+    """
+    first, last = date.fromisoformat(date_begin), date.fromisoformat(date_end)
+    if last < first:
+        raise ValueError(f"date_end {date_end} is before date_begin {date_begin}")
+    hour, minute = (int(part) for part in window.start_utc.split(":"))
+    span = timedelta(hours=window.hours)
+
+    nights = []
+    for day in range((last - first).days + 1):
+        night = first + timedelta(days=day)
+        begin = datetime(night.year, night.month, night.day, hour, minute, tzinfo=timezone.utc)
+        end = begin + span
+        if window.min_altitude_deg is not None:
+            times = [begin + timedelta(seconds=s) for s in range(0, int(span.total_seconds()) + 1, ALTITUDE_STEP_SECONDS)]
+            starts, ends = run_bounds(target_altitude_deg(run_config, times) >= window.min_altitude_deg)
+            if not len(starts):
+                continue
+            longest = int(np.argmax(ends - starts))
+            begin, end = times[starts[longest]], times[ends[longest]]
+        if end - begin < timedelta(minutes=window.min_minutes):
+            continue
+        nights.append(CampaignNight(night.isoformat(), _iso(begin), _iso(end)))
+    log.info(f"Planned {len(nights)} of {(last - first).days + 1} nights from {date_begin} to {date_end}")
+    return nights
+
+
+#one PropagationService per worker process, so parsed catalogues, beam models
+#and observers are reused across the nights a worker runs
+_services: dict = {}
+
+
+def run_night(run_config: RunConfig, tle_file: str, night: CampaignNight,
+              observer_factory=make_observer, blocks: int = DEFAULT_BLOCKS_PER_NIGHT) -> NightResult:
+    """
+    Propagate, check and analyse one night. Runs in a worker process, so
+    everything it needs is rebuilt from picklable arguments.
+    """
+    from core.propagation_service import PropagationService
+
+    start = time.perf_counter()
+    #each night is one job; nested shard/batch pools would oversubscribe the workers
+    config = dataclasses.replace(
+        run_config, time_begin=night.time_begin, time_end=night.time_end,
+        concurrency_level=1, shard_seconds=0, batch_size=0,
+    )
+    if observer_factory not in _services:
+        _services[observer_factory] = PropagationService(observer_factory)
+    service = _services[observer_factory]
+    output = service.run(config, tle_file)
+    analyser = output.analyser
+    groups = analyser.top_linked_groups(blocks, config.gap_tolerance_seconds)
+    return NightResult(
+        night=night.night,
+        time_begin=night.time_begin,
+        time_end=night.time_end,
+        flagged_points=len(output.results),
+        clean_seconds=round(sum(s.duration_seconds for s in analyser.clean_stretches()), 6),
+        blocks=[CampaignBlock(_iso(g.start), _iso(g.end), g.total_clean_seconds, g.total_span_seconds) for g in groups],
+        seconds=time.perf_counter() - start,
+    )
+
+
+@dataclass
+class CampaignResult:
+    nights: list[NightResult]
+    planned: int
+
+    def ranked(self, limit: int | None = None) -> list[NightResult]:
+        """Nights by their best block's clean time, then total clean time, best first."""
+        ranked = sorted(self.nights, key=lambda n: (n.best_block_seconds, n.clean_seconds), reverse=True)
+        return ranked if limit is None else ranked[:limit]
+
+    def best_blocks(self, k: int = 10) -> list[tuple[str, CampaignBlock]]:
+        """The k blocks with the most clean time over the whole campaign, as (night, block)."""
+        blocks = [(n.night, b) for n in self.nights for b in n.blocks]
+        return sorted(blocks, key=lambda nb: nb[1].clean_seconds, reverse=True)[:k]
+
+    def table(self, limit: int = 20) -> str:
+        lines = [f"=== Campaign: best nights ({len(self.nights)} of {self.planned} evaluated) ==="]
+        if not self.nights:
+            lines.append("  No nights evaluated.")
+        for i, n in enumerate(self.ranked(limit), 1):
+            best = (f"best {n.blocks[0].start[11:19]} - {n.blocks[0].end[11:19]} ({n.best_block_seconds}s)"
+                    if n.blocks else "no clean blocks")
+            lines.append(f"  {i}. {n.night}  {n.time_begin[11:16]} - {n.time_end[11:16]}  "
+                         f"clean {n.clean_seconds}s  {best}")
+        if len(self.nights) > limit:
+            lines.append(f"  ... and {len(self.nights) - limit} lower-ranked nights")
+        return "\n".join(lines)
+
+
+class CampaignPlanner:
+    """
+    Evaluates a date range night by night on a process pool and ranks the nights.
+
+    Each night is an independent job over its own window (see plan_nights),
+    run through a PropagationService kept per worker process, so the TLE
+    catalogue is parsed once per worker and propagation results land in the
+    result cache. Every finished night is appended to a progress file as one
+    JSON line, keyed by a fingerprint of the run settings; a rerun of the same
+    campaign (or an extended date range) skips the nights already in it.
+
+    :param run_config: Settings for every night; its time window is replaced per night.
+    :param tle_file: TLE catalogue for the campaign.
+    :param date_begin: ISO date of the first night.
+    :param date_end: ISO date of the last night (inclusive).
+    :param window: NightlyWindow defining each night's analysis window.
+    :param progress_path: Progress file; defaults to data/campaigns/<fingerprint>.jsonl.
+    :param max_workers: Worker processes; defaults to run_config.concurrency_level.
+    :param observer_factory: Picklable callable building the Observer for a night's RunConfig.
+    :param blocks_per_night: Linked groups kept per night for the ranking.
+    """
+    def __init__(self, run_config: RunConfig, tle_file: str, date_begin: str, date_end: str,
+                 window: NightlyWindow = NightlyWindow(), progress_path: str | Path | None = None,
+                 max_workers: int | None = None, observer_factory=make_observer,
+                 blocks_per_night: int = DEFAULT_BLOCKS_PER_NIGHT):
+        self.run_config = run_config
+        self.tle_file = tle_file
+        self.window = window
+        self.blocks_per_night = blocks_per_night
+        self.nights = plan_nights(run_config, date_begin, date_end, window)
+        self.key = self._fingerprint()
+        self.progress_path = Path(progress_path) if progress_path is not None else campaign_dir() / f"{self.key[:16]}.jsonl"
+        self.max_workers = max_workers or run_config.concurrency_level or 1
+        self.observer_factory = observer_factory
+
+    def _fingerprint(self) -> str:
+        settings = dataclasses.asdict(self.run_config)
+        for name in ("time_begin", "time_end", "concurrency_level"):
+            settings.pop(name)
+        #the catalogue contents, not its path, so a refreshed download starts a new campaign
+        tle = hashlib.sha256(Path(self.tle_file).read_bytes()).hexdigest()
+        description = {"settings": settings, "window": dataclasses.asdict(self.window),
+                       "tle": tle, "blocks": self.blocks_per_night}
+        return hashlib.sha256(json.dumps(description, sort_keys=True).encode()).hexdigest()
+
+    def completed(self) -> dict[str, NightResult]:
+        """Nights already in the progress file for these settings; a torn last line is ignored."""
+        done = {}
+        if not self.progress_path.exists():
+            return done
+        with open(self.progress_path) as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                if entry.get("key") == self.key:
+                    result = NightResult.from_dict(entry["result"])
+                    done[result.night] = result
+        return done
+
+    def _record(self, result: NightResult):
+        self.progress_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.progress_path, "a") as f:
+            f.write(json.dumps({"key": self.key, "result": dataclasses.asdict(result)}) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    def run(self, on_night=None) -> CampaignResult:
+        """
+        :param on_night: Optional callback(night_result, done, total) called in
+            this process as each night completes, in completion order.
+        """
+        start = time.perf_counter()
+        done = self.completed()
+        planned = {n.night for n in self.nights}
+        results = {night: r for night, r in done.items() if night in planned}
+        pending = [n for n in self.nights if n.night not in results]
+        total = len(self.nights)
+        if results:
+            log.info(f"Resuming campaign: {len(results)} of {total} nights already in {self.progress_path}")
+
+        def completed(result: NightResult):
+            self._record(result)
+            results[result.night] = result
+            if on_night is not None:
+                on_night(result, len(results), total)
+
+        workers = min(self.max_workers, len(pending))
+        log.info(f"Running {len(pending)} nights on {max(workers, 1)} worker processes...")
+        args = (self.run_config, self.tle_file)
+        if workers <= 1:
+            for night in pending:
+                completed(run_night(*args, night, self.observer_factory, self.blocks_per_night))
+        else:
+            #spawn rather than fork: the GUI process holds Qt and logging threads
+            context = multiprocessing.get_context("spawn")
+            with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+                futures = [pool.submit(run_night, *args, n, self.observer_factory, self.blocks_per_night)
+                           for n in pending]
+                for future in as_completed(futures):
+                    completed(future.result())
+
+        campaign = CampaignResult([results[n.night] for n in self.nights if n.night in results], total)
+        log.info(f"Campaign of {total} nights finished in {time.perf_counter() - start:.1f}s "
+                 f"({len(pending)} run, {total - len(pending)} resumed)")
+        return campaign
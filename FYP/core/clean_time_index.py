@@ -0,0 +1,191 @@
+import math
+from dataclasses import dataclass
+from datetime import datetime, timezone
+
+import numpy as np
+
+from core.window_analyser import CleanStretch, WindowAnalyser, run_bounds
+
+
+@dataclass
+class SatelliteInterval:
+    satellite: str
+    start: datetime
+    end: datetime
+    peak_gain_percent: float
+
+
+def _as_utc(t: datetime | str) -> datetime:
+    if isinstance(t, str):
+        t = datetime.fromisoformat(t)
+    return t.replace(tzinfo=timezone.utc) if t.tzinfo is None else t.astimezone(timezone.utc)
+
+
+class CleanTimeIndex:
+    """
+    Query index over one run's analysis results for external schedulers.
+
+    Clean stretches and per-satellite interference intervals are held as
+    sorted integer arrays of the analyser's time slots (seconds by default), so point,
+    range and next-fit queries are binary searches rather than scans of the
+    result rows:
+
+    - clean stretches are disjoint, so the one containing t is found with a
+      single searchsorted on their starts;
+    - next-fit uses a sparse table of stretch durations (max over 2^k
+      consecutive stretches) to skip straight to the first long enough
+      stretch in O(log n);
+    - satellite intervals may overlap, but none is longer than the longest
+      interval, so those covering t all start within that many slots
+      before t and are found with two searchsorted calls.
+
+    :param analyser: WindowAnalyser for the run.
+    :param results: The flagged rows the analyser was built from
+        (``time_utc``, ``satellite``, ``gain_percent``).
+    """
+    def __init__(self, analyser: WindowAnalyser, results: list):
+        self.analyser = analyser
+        self.time_begin = analyser.time_begin
+        self.time_end = analyser.time_end
+        self._last = len(analyser.occupancy) - 1
+        self._span = analyser.sample_slots
+
+        self.clean_starts, self.clean_ends = run_bounds(~analyser.occupancy)
+        durations = self.clean_ends - self.clean_starts
+        self._max_durations = [durations]
+        while len(self._max_durations[-1]) > 1:
+            prev, width = self._max_durations[-1], 1 << (len(self._max_durations) - 1)
+            self._max_durations.append(np.maximum(prev[:-width], prev[width:]))
+
+        self._build_rows(results)
+        self._build_intervals()
+
+    @classmethod
+    def from_results(cls, results: list, time_begin: str, time_end: str) -> "CleanTimeIndex":
+        return cls(WindowAnalyser(results, time_begin, time_end), results)
+
+    def _build_rows(self, results: list):
+        n = len(results)
+        offsets = self.analyser.bins.slots_from_iso([r['time_utc'] for r in results])
+        self.satellites = sorted({r['satellite'] for r in results})
+        sat_ids = {name: i for i, name in enumerate(self.satellites)}
+        sats = np.fromiter((sat_ids[r['satellite']] for r in results), dtype=np.int32, count=n)
+        gains = np.fromiter((r['gain_percent'] for r in results), dtype=float, count=n)
+
+        inside = (offsets > -self._span) & (offsets <= self._last)
+        order = np.lexsort((sats[inside], offsets[inside]))
+        self.row_offsets = offsets[inside][order]
+        self.row_sats = sats[inside][order]
+        self.row_gains = gains[inside][order]
+
+    def _build_intervals(self):
+        #per-satellite runs of consecutive slots, then sorted by start across satellites
+        order = np.lexsort((self.row_offsets, self.row_sats))
+        sats, offsets, gains = self.row_sats[order], self.row_offsets[order], self.row_gains[order]
+        if len(sats):
+            #each row flags its own slot and the sample_slots - 1 after it
+            breaks = np.flatnonzero((np.diff(sats) != 0) | (np.diff(offsets) > self._span)) + 1
+            first = np.concatenate(([0], breaks))
+            last = np.concatenate((breaks, [len(sats)])) - 1
+            peaks = np.maximum.reduceat(gains, first)
+        else:
+            first = last = np.zeros(0, dtype=np.int64)
+            peaks = np.zeros(0)
+
+        by_start = np.argsort(offsets[first], kind="stable")
+        self.interval_sats = sats[first][by_start]
+        self.interval_starts = np.maximum(offsets[first][by_start], 0)
+        self.interval_ends = np.minimum(offsets[last][by_start] + self._span - 1, self._last)
+        self.interval_peaks = peaks[by_start]
+        self._max_interval = int((self.interval_ends - self.interval_starts).max()) if len(first) else 0
+
+    # --- Conversions ---
+
+    def _offset(self, t: datetime | str) -> int:
+        t = _as_utc(t)
+        if t < self.time_begin or t > self.time_end:
+            raise ValueError(f"{t.isoformat()} is outside the analysed window "
+                             f"{self.time_begin.isoformat()} - {self.time_end.isoformat()}")
+        return self.analyser.bins.slot_of(t)
+
+    def _at(self, offset: int) -> datetime:
+        return self.analyser.slot_time(int(offset))
+
+    def _stretch(self, start: int, end: int) -> CleanStretch:
+        return self.analyser.stretch_for_slots(int(start), int(end))
+
+    def _slots(self, seconds: float) -> int:
+        """Slots needed to span at least the given number of seconds."""
+        return math.ceil(seconds / self.analyser.resolution_seconds - 1e-9)
+
+    def _interval(self, i: int) -> SatelliteInterval:
+        return SatelliteInterval(
+            satellite=self.satellites[self.interval_sats[i]],
+            start=self._at(self.interval_starts[i]),
+            end=self._at(self.interval_ends[i]),
+            peak_gain_percent=float(self.interval_peaks[i]),
+        )
+
+    # --- Clean-time queries ---
+
+    def _containing(self, offset: int) -> int:
+        """Index of the clean stretch containing offset, or -1."""
+        i = int(np.searchsorted(self.clean_starts, offset, side="right")) - 1
+        return i if i >= 0 and self.clean_ends[i] >= offset else -1
+
+    def is_clean(self, t: datetime | str) -> bool:
+        return self._containing(self._offset(t)) >= 0
+
+    def is_range_clean(self, start: datetime | str, end: datetime | str) -> bool:
+        """True if every slot from start to end (inclusive) is clean."""
+        a, b = self._offset(start), self._offset(end)
+        i = self._containing(a)
+        return i >= 0 and self.clean_ends[i] >= b
+
+    def stretch_at(self, t: datetime | str) -> CleanStretch | None:
+        i = self._containing(self._offset(t))
+        return self._stretch(self.clean_starts[i], self.clean_ends[i]) if i >= 0 else None
+
+    def _first_at_least(self, j: int, min_duration: int) -> int:
+        """First stretch index >= j whose duration is at least min_duration, or -1."""
+        n = len(self.clean_starts)
+        for k in range(len(self._max_durations) - 1, -1, -1):
+            if j + (1 << k) <= n and self._max_durations[k][j] < min_duration:
+                j += 1 << k
+        return j if j < n else -1
+
+    def next_clean(self, after: datetime | str, min_duration_seconds: int = 0) -> CleanStretch | None:
+        """
+        Earliest clean block of at least min_duration_seconds starting at or after ``after``.
+        A stretch already in progress at ``after`` counts from ``after``.
+        """
+        a = self._offset(after)
+        i = int(np.searchsorted(self.clean_starts, a, side="right")) - 1
+        need = self._slots(min_duration_seconds)
+        if i >= 0 and self.clean_ends[i] >= a and self.clean_ends[i] - a >= need:
+            return self._stretch(a, self.clean_ends[i])
+        j = self._first_at_least(i + 1, need)
+        return self._stretch(self.clean_starts[j], self.clean_ends[j]) if j >= 0 else None
+
+    # --- Interference queries ---
+
+    def interferers_at(self, t: datetime | str) -> list[tuple[str, float]]:
+        """(satellite, gain_percent) of every satellite flagged at t, highest gain first."""
+        offset = self._offset(t)
+        lo = np.searchsorted(self.row_offsets, offset - self._span + 1, side="left")
+        hi = np.searchsorted(self.row_offsets, offset, side="right")
+        hits = [(self.satellites[s], float(g)) for s, g in zip(self.row_sats[lo:hi], self.row_gains[lo:hi])]
+        return sorted(hits, key=lambda hit: hit[1], reverse=True)
+
+    def interferers_between(self, start: datetime | str, end: datetime | str) -> list[SatelliteInterval]:
+        """Per-satellite interference intervals overlapping start - end, in start order."""
+        a, b = self._offset(start), self._offset(end)
+        lo = np.searchsorted(self.interval_starts, a - self._max_interval, side="left")
+        hi = np.searchsorted(self.interval_starts, b, side="right")
+        return [self._interval(i) for i in range(lo, hi) if self.interval_ends[i] >= a]
+
+    def intervals_for(self, satellite: str) -> list[SatelliteInterval]:
+        if satellite not in self.satellites:
+            return []
+        sat_id = self.satellites.index(satellite)
+        return [self._interval(i) for i in np.flatnonzero(self.interval_sats == sat_id)]
@@ -0,0 +1,223 @@
+import json
+import logging
+import math
+import os
+import shutil
+import time
+from contextlib import contextmanager
+from datetime import date, datetime, time as dtime, timedelta, timezone
+from pathlib import Path
+
+import numpy as np
+from sgp4.api import Satrec, SatrecArray
+
+from core.native_propagator import MAX_BLOCK_SAMPLES, site_enu_frame, teme_to_enu, time_grid
+from core.pass_index import SECONDS_PER_DAY, catalogue_identity, tle_digest
+from core.paths import get_data_dir
+from core.tle_catalogue import parse_norad_id, read_tle_file
+
+log = logging.getLogger(__name__)
+
+#the day is filled lazily in blocks of this many seconds
+BLOCK_SECONDS = 3600
+
+
+def ephemeris_dir() -> Path:
+    path = get_data_dir() / "ephemeris"
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+@contextmanager
+def _file_lock(path: Path):
+    """Exclusive lock on path (created if missing) shared by every process, held for the block."""
+    with open(path, "a+b") as f:
+        if os.name == "nt":
+            import msvcrt
+            while True:
+                try:
+                    #LK_LOCK gives up after ten one-second retries; keep waiting for long fills
+                    msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:
+                    continue
+        else:
+            import fcntl
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if os.name == "nt":
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+            else:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+class EphemerisStore:
+    """
+    Memory-mapped topocentric ENU unit vectors of every satellite in a
+    catalogue for one site and UTC day.
+
+    Each store is a directory holding ``enu.npy`` (float32, shape
+    (satellites, 86400, 3), NaN where SGP4 failed), ``index.json`` (satellite
+    names and NORAD IDs, in array order) and ``filled.npy`` (which hour blocks
+    have been propagated). Hour blocks are propagated the first time a view
+    touches them, under a lock file so concurrent processes never propagate
+    the same block twice or lose each other's updates to filled.npy. Views are
+    slices of the memmap, so readers in any process share the page cache
+    without copying. The array is sparse where the file system supports it
+    (not NTFS by default), so the full day is checked against free disk space
+    before a store is created.
+
+    :param path: Store directory.
+    :param day: UTC day covered by the store.
+    :param tle_file: Catalogue the store was created from, needed to fill
+        missing hours. Stores opened read-only without it can only serve
+        hours that are already filled.
+    """
+    def __init__(self, path: Path, day: date, tle_file: str | None = None):
+        self.path = Path(path)
+        self.day = day
+        self.tle_file = tle_file
+        self.day_start = datetime.combine(day, dtime(), tzinfo=timezone.utc)
+        index = json.loads((self.path / "index.json").read_text())
+        self.names: list[str] = index["names"]
+        self.norad_ids = np.array(index["norad_ids"], dtype=np.int64)
+        self.site = tuple(index["site"])
+        self._enu = np.load(self.path / "enu.npy", mmap_mode="r")
+
+    @staticmethod
+    def _site_prefix(tle_file: str, latitude: float, longitude: float, elevation_m: float, day: date) -> str:
+        site = f"{latitude:.4f}_{longitude:.4f}_{elevation_m:.0f}_{day.isoformat()}"
+        return f"{catalogue_identity(tle_file)}_{site}"
+
+    @classmethod
+    def store_path(cls, tle_file: str, latitude: float, longitude: float, elevation_m: float, day: date) -> Path:
+        prefix = cls._site_prefix(tle_file, latitude, longitude, elevation_m, day)
+        return ephemeris_dir() / f"{prefix}_{tle_digest(tle_file)}"
+
+    @classmethod
+    def open(cls, tle_file: str, latitude: float, longitude: float, elevation_m: float, day: date) -> "EphemerisStore":
+        """
+        Store for this catalogue version, site and day, created empty if it
+        does not exist yet. Stores for older versions of the same catalogue,
+        site and day are removed.
+
+        :raises RuntimeError: If there is not enough free disk space for a full day.
+        """
+        path = cls.store_path(tle_file, latitude, longitude, elevation_m, day)
+        if not (path / "index.json").exists():
+            entries = read_tle_file(tle_file)
+            if not entries:
+                raise ValueError("Satellites list empty.")
+            shape = (len(entries), SECONDS_PER_DAY, 3)
+            required = math.prod(shape) * np.dtype(np.float32).itemsize
+            free = shutil.disk_usage(path.parent).free
+            if free < required:
+                raise RuntimeError(f"Ephemeris store for {len(entries)} satellites needs {required / 1e9:.1f} GB, "
+                                   f"only {free / 1e9:.1f} GB free in {path.parent}")
+            #a private temporary directory per process; the first complete store renamed into place wins
+            tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+            shutil.rmtree(tmp, ignore_errors=True)
+            tmp.mkdir()
+            np.lib.format.open_memmap(tmp / "enu.npy", mode="w+", dtype=np.float32, shape=shape).flush()
+            np.save(tmp / "filled.npy", np.zeros(SECONDS_PER_DAY // BLOCK_SECONDS, dtype=bool))
+            (tmp / "index.json").write_text(json.dumps({
+                "names": [name for name, _, _ in entries],
+                "norad_ids": [parse_norad_id(l1) for _, l1, _ in entries],
+                "site": [latitude, longitude, elevation_m],
+            }))
+            try:
+                tmp.rename(path)
+                log.info(f"Created ephemeris store {path.name} for {len(entries)} satellites")
+            except OSError:
+                shutil.rmtree(tmp, ignore_errors=True)
+            prefix = cls._site_prefix(tle_file, latitude, longitude, elevation_m, day)
+            for old in ephemeris_dir().glob(f"{prefix}_*"):
+                if old != path:
+                    shutil.rmtree(old, ignore_errors=True)
+        return cls(path, day, tle_file)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    @property
+    def filled(self) -> np.ndarray:
+        return np.load(self.path / "filled.npy")
+
+    def satellite_index(self, key: str | int) -> int:
+        """Array row of a satellite by name or NORAD ID."""
+        if isinstance(key, str):
+            return self.names.index(key)
+        return int(np.flatnonzero(self.norad_ids == key)[0])
+
+    def _missing(self, first: int, stop: int) -> list[int]:
+        filled = self.filled
+        return [b for b in range(first // BLOCK_SECONDS, math.ceil(stop / BLOCK_SECONDS)) if not filled[b]]
+
+    def ensure(self, first: int, stop: int):
+        """Propagate any unfilled hour blocks overlapping seconds [first, stop) of the day."""
+        if not self._missing(first, stop):
+            return
+        if self.tle_file is None:
+            raise RuntimeError(f"Ephemeris store {self.path.name} is missing hours and was opened without its TLE file")
+        with _file_lock(self.path / "fill.lock"):
+            #another process may have filled some of the blocks while this one waited
+            blocks = self._missing(first, stop)
+            if blocks:
+                self._fill(blocks)
+
+    def _fill(self, blocks: list[int]):
+        start = time.perf_counter()
+        satrecs = SatrecArray([Satrec.twoline2rv(l1, l2) for _, l1, l2 in read_tle_file(self.tle_file)])
+        site, rotation = site_enu_frame(*self.site)
+        enu = np.load(self.path / "enu.npy", mmap_mode="r+")
+        chunk = max(1, MAX_BLOCK_SAMPLES // len(self))
+        for b in blocks:
+            offsets = np.arange(b * BLOCK_SECONDS, (b + 1) * BLOCK_SECONDS)
+            jd, fr, theta = time_grid(self.day_start, offsets)
+            for i in range(0, len(offsets), chunk):
+                part = slice(i, i + chunk)
+                first_second = b * BLOCK_SECONDS + i
+                err, r, _ = satrecs.sgp4(jd[part], fr[part])
+                r = np.where((err == 0)[..., None], r, np.nan)
+                vec = teme_to_enu(r, theta[part], site, rotation)
+                vec /= np.linalg.norm(vec, axis=-1, keepdims=True)
+                enu[:, first_second:first_second + vec.shape[1]] = vec
+            enu.flush()
+            filled = self.filled
+            filled[b] = True
+            #replaced atomically so readers outside the lock never see a torn file
+            tmp = self.path / "filled.tmp.npy"
+            np.save(tmp, filled)
+            tmp.replace(self.path / "filled.npy")
+        log.info(f"Ephemeris store: propagated {len(blocks)} hour block(s) for {len(self)} satellites "
+                 f"in {time.perf_counter() - start:.1f}s")
+
+    def view(self, begin: datetime, end: datetime) -> np.ndarray:
+        """
+        Read-only (satellites, seconds, 3) memmap slice covering [begin, end),
+        propagating any missing hours first. No data is copied.
+        """
+        first = int((begin - self.day_start).total_seconds())
+        stop = math.ceil((end - self.day_start).total_seconds())
+        if first < 0 or stop > SECONDS_PER_DAY or first >= stop:
+            raise ValueError(f"{begin} - {end} is not within {self.day.isoformat()}")
+        self.ensure(first, stop)
+        return self._enu[:, first:stop]
+
+
+def ephemeris_views(tle_file: str, latitude: float, longitude: float, elevation_m: float,
+                    begin: datetime, end: datetime) -> list[tuple[EphemerisStore, np.ndarray]]:
+    """
+    Memmap views covering a window, one per UTC day it touches, in time order.
+    """
+    views = []
+    day = begin.date()
+    while datetime.combine(day, dtime(), tzinfo=timezone.utc) < end:
+        store = EphemerisStore.open(tle_file, latitude, longitude, elevation_m, day)
+        next_day = store.day_start + timedelta(days=1)
+        views.append((store, store.view(max(begin, store.day_start), min(end, next_day))))
+        day += timedelta(days=1)
+    return views
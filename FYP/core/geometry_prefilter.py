@@ -0,0 +1,182 @@
+import logging
+import math
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+from sgp4.api import Satrec, SatrecArray
+
+from core.run_config import RunConfig
+from core.time_bins import track_index
+from core.tle_catalogue import read_tle_file, subscribe_changes
+from core.native_propagator import (
+    site_enu_frame, teme_to_enu, altaz_to_enu, time_grid,
+    orbit_radii_km, max_angular_rate_deg, TARGET_RATE_DEG_S,
+)
+
+log = logging.getLogger(__name__)
+
+#cadence of the coarse sky track used for slow movers (GEO/MEO)
+SKY_TRACK_STEP_SECONDS = 600
+#only satellites whose worst-case drift between coarse samples stays under this are track-screened
+SKY_TRACK_MAX_MARGIN_DEG = 30.0
+#padding on the inclination/footprint test for geodetic vs geocentric latitude and SGP4 short-period terms
+INCLINATION_MARGIN_DEG = 0.5
+
+#one result per (catalogue, site, pointing region, window), shared across runners in the same process;
+#least recently used results are dropped beyond MAX_CACHED_RESULTS, since each holds a mask per catalogue entry
+MAX_CACHED_RESULTS = 32
+_cache: OrderedDict[tuple, "PrefilterResult"] = OrderedDict()
+
+
+def _invalidate(tle_file: str, changes):
+    #results cover the whole catalogue, so any change to a file drops its entries
+    path = str(Path(tle_file).resolve())
+    for key in [key for key in _cache if key[0] == path]:
+        del _cache[key]
+
+subscribe_changes(_invalidate)
+
+
+@dataclass
+class PrefilterResult:
+    keep: np.ndarray                 # bool per catalogue entry, file order
+    satellite_numbers: set[int]      # NORAD numbers of surviving entries
+    pruned: dict[str, int] = field(default_factory=dict)
+
+    @property
+    def total(self) -> int:
+        return len(self.keep)
+
+    @property
+    def survivors(self) -> int:
+        return int(self.keep.sum())
+
+    def summary(self) -> str:
+        reasons = ", ".join(f"{reason}: {count}" for reason, count in self.pruned.items())
+        return f"Geometry prefilter kept {self.survivors}/{self.total} satellites ({reasons})"
+
+
+class GeometryPrefilter:
+    """
+    Catalogue-level screen that discards satellites which can never enter the
+    beam during the window, before any per-second propagation.
+
+    Each entry is tested in order and attributed to the first reason it fails:
+
+    - decayed: SGP4 cannot propagate it anywhere in the window, or its perigee
+      lies below the Earth's surface.
+    - inclination: its ground track never reaches far enough towards the
+      site's latitude to be seen above the lowest altitude the beam covers.
+    - sky_track: a slow mover (GEO/MEO) whose coarse sky track, padded by its
+      worst-case drift between samples, never comes within the beam radius.
+
+    Fast movers are left to the propagation stage. Results are cached per
+    (catalogue, site, pointing region, window).
+
+    :param run_config: RunConfig for site, pointing and window.
+    :param tle_file: Path to the TLE catalogue.
+    :param radius_deg: Beam search radius in degrees.
+    :param observer: Observer supplying the target track (tracking targets only).
+    """
+    def __init__(self, run_config: RunConfig, tle_file: str, radius_deg: float, observer=None):
+        self.run_config = run_config
+        self.tle_file = tle_file
+        self.radius_deg = radius_deg
+        self.observer = observer
+        self.begin = datetime.fromisoformat(run_config.time_begin).replace(tzinfo=timezone.utc)
+        self.end = datetime.fromisoformat(run_config.time_end).replace(tzinfo=timezone.utc)
+        self.n_steps = math.ceil((self.end - self.begin).total_seconds())
+        self._site, self._rotation = site_enu_frame(
+            run_config.latitude, run_config.longitude, run_config.elevation_m
+        )
+
+    def _cache_key(self) -> tuple:
+        rc = self.run_config
+        path = Path(self.tle_file)
+        stat = path.stat()
+        pointing = (rc.altitude_deg, rc.azimuth_deg) if rc.is_static() else (rc.ra_hours, rc.dec_degrees)
+        return (
+            str(path.resolve()), stat.st_mtime_ns, stat.st_size,
+            rc.latitude, rc.longitude, rc.elevation_m,
+            pointing, round(self.radius_deg, 6), rc.time_begin, rc.time_end,
+        )
+
+    def _target_track(self, offsets: np.ndarray):
+        """Target (alt_deg, enu) at offsets, or (None, None) if no track is available."""
+        rc = self.run_config
+        if rc.is_static():
+            alts = np.full(len(offsets), rc.altitude_deg)
+            return alts, altaz_to_enu(alts, np.full(len(offsets), rc.azimuth_deg))
+        if self.observer is None:
+            return None, None
+        idx = track_index(self.observer, offsets)
+        alts = self.observer.target_alts[idx]
+        return alts, altaz_to_enu(alts, self.observer.target_azs[idx])
+
+    def run(self) -> PrefilterResult:
+        key = self._cache_key()
+        if key in _cache:
+            _cache.move_to_end(key)
+        else:
+            _cache[key] = self._compute()
+            while len(_cache) > MAX_CACHED_RESULTS:
+                _cache.popitem(last=False)
+        result = _cache[key]
+        log.info(result.summary())
+        return result
+
+    def _compute(self) -> PrefilterResult:
+        entries = read_tle_file(self.tle_file)
+        satrecs = [Satrec.twoline2rv(l1, l2) for _, l1, l2 in entries]
+        keep = np.ones(len(satrecs), dtype=bool)
+        pruned = {"decayed": 0, "inclination": 0, "sky_track": 0}
+        if not satrecs:
+            return PrefilterResult(keep=keep, satellite_numbers=set(), pruned=pruned)
+
+        site_radius = float(np.linalg.norm(self._site))
+        offsets = np.unique(np.r_[np.arange(0, self.n_steps, SKY_TRACK_STEP_SECONDS), self.n_steps - 1])
+        jd, fr, theta = time_grid(self.begin, offsets)
+        err, r, _ = SatrecArray(satrecs).sgp4(jd, fr)
+        _, rp, ra = orbit_radii_km(satrecs)
+
+        # decayed
+        decayed = (err != 0).all(axis=1) | ~(rp > site_radius)
+        keep &= ~decayed
+        pruned["decayed"] = int(decayed.sum())
+
+        # inclination / footprint
+        target_alts, target_enu = self._target_track(offsets)
+        lowest_alt = 0.0 if target_alts is None else max(0.0, float(target_alts.min()) - self.radius_deg)
+        eps = np.radians(lowest_alt)
+        with np.errstate(invalid='ignore'):
+            reach = np.degrees(np.arccos(np.clip(site_radius * np.cos(eps) / ra, -1, 1)) - eps)
+        incl = np.degrees(np.array([sat.inclo for sat in satrecs]))
+        max_lat = np.minimum(incl, 180.0 - incl)
+        site_lat = np.degrees(np.arcsin(self._site[2] / site_radius))
+        unreachable = keep & (abs(site_lat) > max_lat + reach + INCLINATION_MARGIN_DEG)
+        keep &= ~unreachable
+        pruned["inclination"] = int(unreachable.sum())
+
+        # coarse sky track for slow movers
+        if target_enu is not None:
+            half = (SKY_TRACK_STEP_SECONDS + 1) // 2
+            target_rate = 0.0 if self.run_config.is_static() else TARGET_RATE_DEG_S
+            margin = (max_angular_rate_deg(satrecs, site_radius) + target_rate) * half
+            slow = keep & (margin <= SKY_TRACK_MAX_MARGIN_DEG)
+            with np.errstate(invalid='ignore'):
+                enu = teme_to_enu(r[slow], theta, self._site, self._rotation)
+                unit = enu / np.linalg.norm(enu, axis=-1)[..., None]
+                alt = np.degrees(np.arcsin(unit[..., 2]))
+                sep = np.degrees(np.arccos(np.clip(np.einsum('stk,tk->st', unit, target_enu), -1, 1)))
+                m = margin[slow][:, None]
+                near = (err[slow] != 0) | ((sep <= self.radius_deg + m) & (alt >= -m))
+            far = np.zeros_like(keep)
+            far[np.flatnonzero(slow)] = ~near.any(axis=1)
+            keep &= ~far
+            pruned["sky_track"] = int(far.sum())
+
+        numbers = {sat.satnum for sat, k in zip(satrecs, keep) if k}
+        return PrefilterResult(keep=keep, satellite_numbers=numbers, pruned=pruned)
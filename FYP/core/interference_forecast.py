@@ -0,0 +1,256 @@
+import logging
+import math
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+
+import numpy as np
+from sgp4.api import Satrec, SatrecArray
+
+from core.native_propagator import (
+    MAX_BLOCK_SAMPLES, MU_KM3_S2, TARGET_RATE_DEG_S,
+    altaz_to_enu, max_angular_rate_deg, orbit_radii_km, site_enu_frame, teme_to_enu, time_grid,
+)
+from core.run_config import RunConfig
+from core.time_bins import track_index
+from core.tle_catalogue import read_tle_file
+from core.window_analyser import WindowAnalyser
+from models.beam_model import BeamModel
+
+log = logging.getLogger(__name__)
+
+DEFAULT_REALIZATIONS = 200
+#realizations further out than this many sigma are clipped, which bounds how far each satellite is searched
+SIGMA_LIMIT = 4.0
+#coarse screening cadence when the run does not set coarse_step_seconds
+DEFAULT_SCREEN_STEP_SECONDS = 10
+
+
+@dataclass(frozen=True)
+class AlongTrackErrorModel:
+    """
+    1-sigma SGP4 along-track position error in km as a function of element
+    set age: base_km + km_per_day * age + km_per_day2 * age^2. The defaults
+    are typical of LEO element sets, about 1 km at epoch growing a few km a day.
+    """
+    base_km: float = 1.0
+    km_per_day: float = 2.0
+    km_per_day2: float = 0.0
+
+    def sigma_km(self, age_days) -> np.ndarray:
+        age = np.abs(np.asarray(age_days, dtype=float))
+        return self.base_km + self.km_per_day * age + self.km_per_day2 * age ** 2
+
+
+@dataclass
+class ForecastResult:
+    time_begin: str
+    time_end: str
+    probability: np.ndarray                 # chance any satellite interferes, per second of the window
+    expected_interferers: np.ndarray        # mean number of interfering satellites per second
+    satellite_peaks: dict[str, float] = field(default_factory=dict)
+    realizations: int = DEFAULT_REALIZATIONS
+
+    def analyser(self, min_probability: float = 0.5) -> WindowAnalyser:
+        """WindowAnalyser flagging every second whose interference probability is at least min_probability."""
+        if not 0 < min_probability <= 1:
+            raise ValueError(f"min_probability must be in (0, 1], provided: {min_probability}")
+        begin = datetime.fromisoformat(self.time_begin).replace(tzinfo=timezone.utc)
+        seconds = np.flatnonzero(self.probability >= min_probability)
+        return WindowAnalyser.from_epochs(begin.timestamp() + seconds, self.time_begin, self.time_end)
+
+    def summary(self, limit: int = 10) -> str:
+        lines = [f"=== Interference forecast ({self.realizations} realizations) ==="]
+        for level in (0.05, 0.5, 0.95):
+            lines.append(f"  P >= {level:.0%}: {int((self.probability >= level).sum())}s")
+        peaks = sorted(self.satellite_peaks.items(), key=lambda item: item[1], reverse=True)
+        for name, peak in peaks[:limit]:
+            lines.append(f"  {name}: peak {peak:.0%}")
+        if len(peaks) > limit:
+            lines.append(f"  ... and {len(peaks) - limit} less likely satellites")
+        return "\n".join(lines)
+
+
+class InterferenceForecast:
+    """
+    Monte Carlo interference forecast allowing for TLE prediction error.
+
+    SGP4 error is dominated by along-track drift, which is a timing error: a
+    satellite ahead of its prediction by e km is where the prediction puts it
+    e / v seconds later. Each realization therefore draws one along-track error
+    per satellite from AlongTrackErrorModel (by element set age) and
+    propagates the satellite at the shifted times.
+
+    The catalogue is first screened nominally over the window padded by the
+    largest shift (coarse-to-fine, as in NativePropagator), keeping the
+    satellites that ever enter the beam cone. Only those satellites, and only the seconds within their
+    own SIGMA_LIMIT shift of a nominal in-cone sample, are then propagated for
+    all realizations in one sgp4_array call per satellite. The result is the
+    per-second probability that at least one satellite is above the gain cutoff.
+
+    :param beam_model: BeamModel whose gain cutoff defines interference.
+    :param run_config: RunConfig for site, pointing and window.
+    :param tle_file: Path to the TLE catalogue.
+    :param observer: Observer supplying the target track (tracking targets only).
+    :param error_model: Along-track error growth with element set age.
+    :param realizations: Number of Monte Carlo realizations.
+    :param seed: Seed for the realizations, so forecasts are repeatable.
+    """
+    min_altitude_deg = 0.0
+
+    def __init__(self, beam_model: BeamModel, run_config: RunConfig, tle_file: str, observer,
+                 error_model: AlongTrackErrorModel | None = None,
+                 realizations: int = DEFAULT_REALIZATIONS, seed: int = 0):
+        if realizations < 1:
+            raise ValueError(f"realizations must be at least 1, provided: {realizations}")
+        self.beam_model = beam_model
+        self.run_config = run_config
+        self.tle_file = tle_file
+        self.observer = observer
+        self.error_model = error_model or AlongTrackErrorModel()
+        self.realizations = realizations
+        self.rng = np.random.default_rng(seed)
+        self.begin = datetime.fromisoformat(run_config.time_begin).replace(tzinfo=timezone.utc)
+        self.end = datetime.fromisoformat(run_config.time_end).replace(tzinfo=timezone.utc)
+        self.n_steps = math.ceil((self.end - self.begin).total_seconds())
+        self._site, self._rotation = site_enu_frame(run_config.latitude, run_config.longitude, run_config.elevation_m)
+        self._target = self._target_enu(np.arange(self.n_steps))
+
+    def _target_enu(self, offsets: np.ndarray) -> np.ndarray:
+        rc = self.run_config
+        if rc.is_static():
+            return np.broadcast_to(altaz_to_enu(rc.altitude_deg, rc.azimuth_deg), (len(offsets), 3))
+        idx = track_index(self.observer, offsets)
+        return altaz_to_enu(self.observer.target_alts[idx], self.observer.target_azs[idx])
+
+    def _timing_sigma(self, satrecs: list) -> np.ndarray:
+        """1-sigma timing error in seconds per satellite: along-track error over orbital speed."""
+        centre = self.begin + (self.end - self.begin) / 2
+        centre_jd = centre.timestamp() / 86400.0 + 2440587.5
+        age = centre_jd - np.array([s.jdsatepoch + s.jdsatepochF for s in satrecs])
+        a, _, _ = orbit_radii_km(satrecs)
+        speed = np.sqrt(MU_KM3_S2 / a)
+        return self.error_model.sigma_km(age) / speed
+
+    @staticmethod
+    def _alt_sep(enu: np.ndarray, target: np.ndarray):
+        """Altitude and separation from the target unit vectors in degrees; NaN where SGP4 failed."""
+        with np.errstate(invalid='ignore', divide='ignore'):
+            unit = enu / np.linalg.norm(enu, axis=-1)[..., None]
+            alt = np.degrees(np.arcsin(unit[..., 2]))
+            sep = np.degrees(np.arccos(np.clip(np.einsum('...k,...k->...', unit, target), -1.0, 1.0)))
+        return alt, sep
+
+    def _hits(self, enu: np.ndarray, err: np.ndarray, target: np.ndarray) -> np.ndarray:
+        """Samples above the minimum altitude whose gain is above the interference cutoff."""
+        alt, sep = self._alt_sep(enu, target)
+        with np.errstate(invalid='ignore'):
+            up = (err == 0) & (alt >= self.min_altitude_deg)
+        if self.beam_model.bypass:
+            return up & (sep <= self.beam_model.prefilter_radius_deg)
+        return up & np.isfinite(self.beam_model.interference_gains(np.where(up, sep, 180.0)))
+
+    def _candidates(self, satrecs: list, pad: int, step: int) -> list[np.ndarray]:
+        """
+        Nominal in-cone offsets per satellite over the window padded by pad
+        seconds on either side; the cone is widened by the target's own
+        motion over that padding.
+
+        Uses the same coarse-to-fine screening as NativePropagator.screen():
+        the catalogue is propagated every step seconds, and only satellites
+        and seconds within reach of the cone at their worst-case angular rate
+        are propagated at 1-second cadence.
+        """
+        offsets = np.arange(-pad, self.n_steps + pad)
+        jd, fr, theta = time_grid(self.begin, offsets)
+        target = self._target[np.clip(offsets, 0, self.n_steps - 1)]
+        target_rate = 0.0 if self.run_config.is_static() else TARGET_RATE_DEG_S
+        cone = self.beam_model.prefilter_radius_deg + target_rate * pad
+
+        half = (step + 1) // 2
+        coarse = np.unique(np.r_[np.arange(0, len(offsets), step), len(offsets) - 1])
+        margin = (max_angular_rate_deg(satrecs, np.linalg.norm(self._site)) + target_rate) * half
+        near = np.zeros((len(satrecs), len(coarse)), dtype=bool)
+        sat_array = SatrecArray(satrecs)
+        chunk = max(1, MAX_BLOCK_SAMPLES // max(1, len(satrecs)))
+        for start in range(0, len(coarse), chunk):
+            block = coarse[start:start + chunk]
+            err, r, _ = sat_array.sgp4(jd[block], fr[block])
+            r = np.where((err == 0)[..., None], r, np.nan)
+            alt, sep = self._alt_sep(teme_to_enu(r, theta[block], self._site, self._rotation), target[block][None])
+            with np.errstate(invalid='ignore'):
+                reachable = (sep <= cone + margin[:, None]) & (alt >= self.min_altitude_deg - margin[:, None])
+            near[:, start:start + len(block)] = (err != 0) | reachable
+
+        nominal = []
+        reach = np.arange(-half, half + 1)
+        for s in range(len(satrecs)):
+            if not near[s].any():
+                nominal.append(np.zeros(0, dtype=int))
+                continue
+            fine = np.unique((coarse[near[s]][:, None] + reach).ravel())
+            fine = fine[(fine >= 0) & (fine < len(offsets))]
+            err, r, _ = satrecs[s].sgp4_array(jd[fine], fr[fine])
+            r = np.where((err == 0)[..., None], r, np.nan)
+            alt, sep = self._alt_sep(teme_to_enu(r[None], theta[fine], self._site, self._rotation)[0], target[fine])
+            with np.errstate(invalid='ignore'):
+                inside = (err == 0) & (sep <= cone) & (alt >= self.min_altitude_deg)
+            nominal.append(offsets[fine[inside]])
+        return nominal
+
+    def _realize(self, satrec, nominal: np.ndarray, sigma: float):
+        """
+        Hits of every realization for one satellite, as (seconds, hits[realization, second]),
+        over the window seconds within reach of its nominal in-cone samples.
+        """
+        pad = math.ceil(SIGMA_LIMIT * sigma)
+        seconds = np.unique((nominal[:, None] + np.arange(-pad, pad + 1)).ravel())
+        seconds = seconds[(seconds >= 0) & (seconds < self.n_steps)]
+        if not len(seconds):
+            return seconds, np.zeros((self.realizations, 0), dtype=bool)
+        shifts = sigma * np.clip(self.rng.standard_normal(self.realizations), -SIGMA_LIMIT, SIGMA_LIMIT)
+        times = (seconds[None, :] + shifts[:, None]).ravel()
+        jd, fr, _ = time_grid(self.begin, times)
+        #only the satellite runs early or late; the Earth is rotated to the unshifted observing time
+        theta = np.tile(time_grid(self.begin, seconds)[2], self.realizations)
+        err, r, _ = satrec.sgp4_array(jd, fr)
+        r = np.where((err == 0)[..., None], r, np.nan)
+        enu = teme_to_enu(r[None], theta, self._site, self._rotation)[0]
+        target = np.tile(self._target[seconds], (self.realizations, 1))
+        hits = self._hits(enu, err, target).reshape(self.realizations, len(seconds))
+        return seconds, hits
+
+    def run(self) -> ForecastResult:
+        start = time.perf_counter()
+        rc = self.run_config
+        entries = read_tle_file(self.tle_file)
+        if not entries:
+            raise ValueError("Satellites list empty.")
+        if rc.geometry_prefilter:
+            from core.geometry_prefilter import GeometryPrefilter
+            keep = GeometryPrefilter(rc, self.tle_file, self.beam_model.prefilter_radius_deg, self.observer).run().keep
+            entries = [entry for entry, kept in zip(entries, keep) if kept]
+        names = [name for name, _, _ in entries]
+        satrecs = [Satrec.twoline2rv(l1, l2) for _, l1, l2 in entries]
+        sigma = self._timing_sigma(satrecs)
+        pad = math.ceil(SIGMA_LIMIT * float(sigma.max())) if len(satrecs) else 0
+
+        any_hit = np.zeros((self.realizations, self.n_steps), dtype=bool)
+        expected = np.zeros(self.n_steps)
+        peaks = {}
+        step = rc.coarse_step_seconds if rc.coarse_step_seconds > 1 else DEFAULT_SCREEN_STEP_SECONDS
+        nominal = self._candidates(satrecs, pad, step) if satrecs else []
+        candidates = [s for s, u in enumerate(nominal) if len(u)]
+        for s in candidates:
+            seconds, hits = self._realize(satrecs[s], nominal[s], float(sigma[s]))
+            if not hits.any():
+                continue
+            any_hit[:, seconds] |= hits
+            chance = hits.mean(axis=0)
+            expected[seconds] += chance
+            peaks[names[s]] = max(peaks.get(names[s], 0.0), float(chance.max()))
+
+        log.info(f"Forecast: {len(candidates)}/{len(satrecs)} satellites near the beam, "
+                 f"{len(peaks)} interfering in some realization, {self.realizations} realizations "
+                 f"in {time.perf_counter() - start:.1f}s")
+        return ForecastResult(rc.time_begin, rc.time_end, any_hit.mean(axis=0), expected, peaks, self.realizations)
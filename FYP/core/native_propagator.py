@@ -0,0 +1,398 @@
+import logging
+import math
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+from sgp4.api import Satrec, SatrecArray, jday
+from skyfield.api import load
+from skyfield.sgp4lib import theta_GMST1982
+from sopp.custom_dataclasses.overhead_window import OverheadWindow
+from sopp.custom_dataclasses.position import Position
+from sopp.custom_dataclasses.position_time import PositionTime
+from sopp.custom_dataclasses.satellite.satellite import Satellite
+
+from core.run_config import RunConfig
+from core.time_bins import track_index
+from core.tle_catalogue import read_tle_file
+from models.beam_model import BeamModel
+
+log = logging.getLogger(__name__)
+
+#WGS84 ellipsoid, same site model skyfield/SOPP use for the facility
+WGS84_A_KM = 6378.137
+WGS84_F = 1 / 298.257223563
+#upper bound on satellites x timesteps propagated in a single SatrecArray call
+MAX_BLOCK_SAMPLES = 2_000_000
+
+#coarse-to-fine screening
+MU_KM3_S2 = 398600.4418
+EARTH_ROTATION_RAD_S = 7.2921159e-5
+TARGET_RATE_DEG_S = 1.1 * np.degrees(EARTH_ROTATION_RAD_S)  #sidereal tracking, padded
+RATE_SAFETY = 1.2
+MIN_RANGE_KM = 50.0
+
+ts = load.timescale()
+
+
+def site_enu_frame(latitude: float, longitude: float, elevation_m: float):
+    """
+    Return the site's ECEF position and ECEF->ENU rotation matrix.
+
+    :param latitude: Geodetic latitude in degrees.
+    :param longitude: Longitude in degrees (positive = East).
+    :param elevation_m: Height above the WGS84 ellipsoid in metres.
+    :returns: Tuple of (site_ecef_km with shape (3,), rotation with shape (3, 3)).
+        Rows of the rotation are the East, North and Up unit vectors.
+    """
+    lat, lon = np.radians(latitude), np.radians(longitude)
+    e2 = WGS84_F * (2 - WGS84_F)
+    n = WGS84_A_KM / np.sqrt(1 - e2 * np.sin(lat) ** 2)
+    h = elevation_m / 1000.0
+    site = np.array([
+        (n + h) * np.cos(lat) * np.cos(lon),
+        (n + h) * np.cos(lat) * np.sin(lon),
+        (n * (1 - e2) + h) * np.sin(lat),
+    ])
+    rotation = np.array([
+        [-np.sin(lon),                np.cos(lon),                0.0],
+        [-np.sin(lat) * np.cos(lon), -np.sin(lat) * np.sin(lon),  np.cos(lat)],
+        [ np.cos(lat) * np.cos(lon),  np.cos(lat) * np.sin(lon),  np.sin(lat)],
+    ])
+    return site, rotation
+
+
+def teme_to_enu(r_teme: np.ndarray, theta: np.ndarray, site: np.ndarray, rotation: np.ndarray) -> np.ndarray:
+    """
+    Rotate TEME positions into the site's topocentric East-North-Up frame.
+
+    TEME -> PEF is a rotation about z by the GMST angle; polar motion is
+    ignored, as it is in SOPP's skyfield pipeline.
+
+    :param r_teme: TEME positions in km, shape (n_sat, n_time, 3).
+    :param theta: GMST 1982 angle in radians per timestep, shape (n_time,).
+    :param site: Site ECEF position in km, shape (3,).
+    :param rotation: ECEF->ENU rotation from site_enu_frame().
+    :returns: Topocentric ENU vectors in km, shape (n_sat, n_time, 3).
+    """
+    cos_t, sin_t = np.cos(theta), np.sin(theta)
+    x = cos_t * r_teme[..., 0] + sin_t * r_teme[..., 1] - site[0]
+    y = -sin_t * r_teme[..., 0] + cos_t * r_teme[..., 1] - site[1]
+    z = r_teme[..., 2] - site[2]
+    return np.einsum('ij,stj->sti', rotation, np.stack((x, y, z), axis=-1))
+
+
+def altaz_to_enu(alt_deg, az_deg) -> np.ndarray:
+    """Unit ENU vectors for alt/az arrays in degrees, shape (..., 3)."""
+    alt, az = np.radians(alt_deg), np.radians(az_deg)
+    return np.stack((np.cos(alt) * np.sin(az), np.cos(alt) * np.cos(az), np.sin(alt)), axis=-1)
+
+
+def time_grid(begin: datetime, offsets: np.ndarray):
+    """
+    UTC Julian dates (for SGP4) and GMST 1982 angle (for TEME->PEF) at integer
+    second offsets from ``begin``.
+
+    :returns: Tuple of (jd, fr, theta) arrays matching offsets.
+    """
+    seconds = begin.second + begin.microsecond * 1e-6
+    jd0, fr0 = jday(begin.year, begin.month, begin.day, begin.hour, begin.minute, seconds)
+    jd = np.full(len(offsets), jd0)
+    fr = fr0 + offsets / 86400.0
+    t = ts.utc(begin.year, begin.month, begin.day, begin.hour, begin.minute, seconds + offsets)
+    theta, _ = theta_GMST1982(t.whole, t.ut1_fraction)
+    return jd, fr, theta
+
+
+def orbit_radii_km(satrecs: list):
+    """Semi-major axis, perigee and apogee radii in km from each Satrec's mean elements."""
+    n = np.array([sat.no_kozai for sat in satrecs]) / 60.0  # rad/s
+    e = np.clip(np.array([sat.ecco for sat in satrecs]), 0.0, 0.999)
+    with np.errstate(divide='ignore'):
+        a = np.cbrt(MU_KM3_S2 / n ** 2)
+    return a, a * (1 - e), a * (1 + e)
+
+
+def max_angular_rate_deg(satrecs: list, site_radius_km: float) -> np.ndarray:
+    """
+    Conservative upper bound on each satellite's apparent angular rate
+    (deg/s) as seen from a site.
+
+    The bound is the largest relative speed the orbit allows (perigee speed
+    plus Earth-rotation speed at apogee) over the smallest possible range
+    (perigee radius minus site radius), padded by RATE_SAFETY for SGP4
+    perturbations. Orbits that can come within MIN_RANGE_KM of the site get
+    an infinite bound.
+
+    :param satrecs: sgp4 Satrec objects.
+    :param site_radius_km: Geocentric radius of the site in km.
+    """
+    a, rp, ra = orbit_radii_km(satrecs)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        v_rel = np.sqrt(MU_KM3_S2 * (2 / rp - 1 / a)) + EARTH_ROTATION_RAD_S * ra
+        d_min = rp - site_radius_km
+        rate = np.degrees(v_rel / d_min) * RATE_SAFETY
+    return np.where(np.isfinite(rate) & (d_min > MIN_RANGE_KM), rate, np.inf)
+
+
+def intersect_windows(a: dict[int, np.ndarray], b: dict[int, np.ndarray]) -> dict[int, np.ndarray]:
+    """Per-satellite intersection of two offset-window mappings, dropping empty results."""
+    out = {}
+    for s in a.keys() & b.keys():
+        both = np.intersect1d(a[s], b[s], assume_unique=True)
+        if len(both):
+            out[s] = both
+    return out
+
+
+class NativePropagator:
+    """
+    In-tree alternative to SOPPRunner using sgp4's vectorised SatrecArray.
+
+    Every satellite in the TLE file is propagated across the 1-second
+    observation grid in blocks of whole-catalogue SatrecArray calls, rotated
+    from TEME to topocentric ENU with NumPy, and tested against a circular
+    cone of the BeamModel prefilter radius around the target. Contiguous
+    in-cone samples are emitted as SOPP OverheadWindow events so the result
+    can be handed straight to InterferenceChecker.
+
+    :param beam_model: BeamModel whose prefilter radius defines the search cone.
+    :param run_config: RunConfig for site and window.
+    :param tle_file: Path to the TLE catalogue.
+    :param observer: Observer supplying the precomputed target track.
+    """
+    min_altitude_deg = 0.0
+
+    def __init__(self, beam_model: BeamModel, run_config: RunConfig, tle_file: str, observer):
+        self.beam_model = beam_model
+        self.run_config = run_config
+        self.tle_file = tle_file
+        self.observer = observer
+        self.begin = datetime.fromisoformat(run_config.time_begin).replace(tzinfo=timezone.utc)
+        self.end = datetime.fromisoformat(run_config.time_end).replace(tzinfo=timezone.utc)
+        self.n_steps = math.ceil((self.end - self.begin).total_seconds())
+        self._site, self._rotation = site_enu_frame(
+            run_config.latitude, run_config.longitude, run_config.elevation_m
+        )
+        self._grid = None
+        self._entries = read_tle_file(tle_file)
+
+    @property
+    def grid(self):
+        """
+        UTC Julian dates (for SGP4), GMST angle (for TEME->PEF) and target ENU
+        unit vectors at every second of the window, computed once per run.
+        """
+        if self._grid is None:
+            offsets = np.arange(self.n_steps)
+            self._grid = time_grid(self.begin, offsets) + (self._target_enu(offsets),)
+        return self._grid
+
+    def _target_enu(self, offsets: np.ndarray) -> np.ndarray:
+        """Target unit vectors in ENU at the given second offsets."""
+        rc = self.run_config
+        if rc.is_static():
+            return np.broadcast_to(altaz_to_enu(rc.altitude_deg, rc.azimuth_deg), (len(offsets), 3))
+        idx = track_index(self.observer, offsets)
+        return altaz_to_enu(self.observer.target_alts[idx], self.observer.target_azs[idx])
+
+    def _observe(self, err, r, offsets):
+        """
+        Turn SGP4 TEME output at the given offsets into topocentric quantities.
+
+        :returns: Tuple of (enu_km, range_km, alt_deg, cos_sep), each indexed
+            [satellite, time]; samples with SGP4 errors are NaN.
+        """
+        _, _, theta, target = self.grid
+        r = np.where((err == 0)[..., None], r, np.nan)
+        enu = teme_to_enu(r, theta[offsets], self._site, self._rotation)
+        rng = np.linalg.norm(enu, axis=-1)
+        unit = enu / rng[..., None]
+        alt = np.degrees(np.arcsin(unit[..., 2]))
+        cos_sep = np.einsum('stk,tk->st', unit, target[offsets])
+        return enu, rng, alt, cos_sep
+
+    def _blocks(self, satrecs: list, offsets: np.ndarray):
+        """
+        Yield (offsets, err, enu, range, alt, cos_sep) for the whole catalogue,
+        one SatrecArray call per block of timesteps.
+        """
+        jd, fr, _, _ = self.grid
+        sat_array = SatrecArray(satrecs)
+        chunk = max(1, MAX_BLOCK_SAMPLES // max(1, len(satrecs)))
+        for start in range(0, len(offsets), chunk):
+            block = offsets[start:start + chunk]
+            err, r, _ = sat_array.sgp4(jd[block], fr[block])
+            with np.errstate(invalid='ignore'):
+                yield (block, err) + self._observe(err, r, block)
+
+    def _in_cone(self, sat_idx, block, enu, rng, alt, cos_sep):
+        """Select in-cone samples from one observed block."""
+        cos_radius = np.cos(np.radians(self.beam_model.prefilter_radius_deg))
+        with np.errstate(invalid='ignore'):
+            in_cone = (alt >= self.min_altitude_deg) & (cos_sep >= cos_radius)
+        s_idx, t_idx = np.nonzero(in_cone)
+        az = np.degrees(np.arctan2(enu[s_idx, t_idx, 0], enu[s_idx, t_idx, 1])) % 360.0
+        return sat_idx[s_idx], block[t_idx], alt[s_idx, t_idx], az, rng[s_idx, t_idx]
+
+    @staticmethod
+    def _concat(found: list):
+        if not found:
+            empty = np.array([], dtype=int)
+            return empty, empty, np.array([]), np.array([]), np.array([])
+        return tuple(np.concatenate(parts) for parts in zip(*found))
+
+    def propagate(self, satrecs: list, offsets: np.ndarray):
+        """
+        Propagate satellites at the given second offsets and return every
+        sample that falls inside the prefilter cone.
+
+        :param satrecs: sgp4 Satrec objects to propagate.
+        :param offsets: Integer second offsets from the window start.
+        :returns: Tuple of arrays (sat_idx, offset, alt_deg, az_deg, range_km)
+            for in-cone samples.
+        """
+        sat_idx = np.arange(len(satrecs))
+        found = [
+            self._in_cone(sat_idx, block, enu, rng, alt, cos_sep)
+            for block, _, enu, rng, alt, cos_sep in self._blocks(satrecs, offsets)
+        ]
+        return self._concat(found)
+
+    def propagate_windows(self, satrecs: list, windows: dict[int, np.ndarray]):
+        """
+        Propagate individual satellites only at their own offsets.
+
+        :param satrecs: sgp4 Satrec objects, indexed by the keys of windows.
+        :param windows: Mapping of satellite index -> sorted offsets to propagate.
+        :returns: Same tuple as propagate().
+        """
+        jd, fr, _, _ = self.grid
+        found = []
+        for s, offsets in windows.items():
+            err, r, _ = satrecs[s].sgp4_array(jd[offsets], fr[offsets])
+            with np.errstate(invalid='ignore'):
+                observed = self._observe(err[None], r[None], offsets)
+            found.append(self._in_cone(np.array([s]), offsets, *observed))
+        return self._concat(found)
+
+    def screen(self, satrecs: list, step: int) -> dict[int, np.ndarray]:
+        """
+        Coarse stage: propagate the catalogue every ``step`` seconds and return
+        the fine offsets each satellite could possibly be in-cone at.
+
+        Any in-cone second lies within half = ceil(step/2) seconds of a coarse
+        sample, during which separation and altitude can change by at most
+        (satellite rate + target rate) * half. A coarse sample within that
+        margin of the cone (or one SGP4 could not evaluate) keeps the
+        surrounding +/- half seconds for the fine stage.
+
+        :param satrecs: sgp4 Satrec objects.
+        :param step: Coarse cadence in seconds.
+        :returns: Mapping of satellite index -> sorted fine offsets.
+        """
+        half = (step + 1) // 2
+        coarse = np.unique(np.r_[np.arange(0, self.n_steps, step), self.n_steps - 1])
+        target_rate = 0.0 if self.run_config.is_static() else TARGET_RATE_DEG_S
+        margin = (max_angular_rate_deg(satrecs, np.linalg.norm(self._site)) + target_rate) * half
+        limit = np.radians(np.minimum(self.beam_model.prefilter_radius_deg + margin, 180.0))
+        cos_limit = np.cos(limit)[:, None]
+        candidate = np.zeros((len(satrecs), len(coarse)), dtype=bool)
+        col = 0
+        for block, err, _, _, alt, cos_sep in self._blocks(satrecs, coarse):
+            with np.errstate(invalid='ignore'):
+                near = (cos_sep >= cos_limit) & (alt >= self.min_altitude_deg - margin[:, None])
+            candidate[:, col:col + len(block)] = (err != 0) | near
+            col += len(block)
+
+        windows = {}
+        reach = np.arange(-half, half + 1)
+        for s in np.flatnonzero(candidate.any(axis=1)):
+            fine = (coarse[candidate[s]][:, None] + reach).ravel()
+            windows[int(s)] = np.unique(fine[(fine >= 0) & (fine < self.n_steps)])
+        return windows
+
+    def propagate_coarse_to_fine(self, satrecs: list, step: int, horizon: dict[int, np.ndarray] | None = None):
+        """
+        Two-stage propagation: screen() at ``step`` seconds, then propagate only
+        the surviving satellite/time windows at 1-second cadence. Returns the
+        same samples as propagate() over the full grid.
+
+        :param horizon: Optional above-horizon offsets per satellite (see
+            core.pass_index); fine windows are intersected with them.
+        """
+        windows = self.screen(satrecs, step)
+        if horizon is not None:
+            windows = intersect_windows(windows, horizon)
+        n_fine = sum(len(w) for w in windows.values())
+        full = len(satrecs) * self.n_steps
+        log.info(
+            f"Coarse stage: {len(satrecs)} satellites x {math.ceil(self.n_steps / step)} samples at {step}s; "
+            f"fine stage: {len(windows)} satellites, {n_fine} samples "
+            f"({100 * n_fine / max(1, full):.2f}% of full resolution)"
+        )
+        return self.propagate_windows(satrecs, windows)
+
+    def _to_events(self, names: list[str], sat_idx, offsets, alts, azs, ranges) -> list[OverheadWindow]:
+        """Split in-cone samples into contiguous per-satellite OverheadWindows."""
+        order = np.lexsort((offsets, sat_idx))
+        sat_idx, offsets = sat_idx[order], offsets[order]
+        alts, azs, ranges = alts[order], azs[order], ranges[order]
+        breaks = np.flatnonzero((np.diff(sat_idx) != 0) | (np.diff(offsets) != 1)) + 1
+        events = []
+        for run in np.split(np.arange(len(order)), breaks):
+            if not len(run):
+                continue
+            satellite = Satellite(name=names[sat_idx[run[0]]])
+            positions = [
+                PositionTime(
+                    Position(altitude=float(alts[i]), azimuth=float(azs[i]), distance_km=float(ranges[i])),
+                    time=self.begin + timedelta(seconds=int(offsets[i]))
+                )
+                for i in run
+            ]
+            events.append(OverheadWindow(satellite=satellite, positions=positions))
+        return events
+
+    def run(self) -> list[OverheadWindow]:
+        """
+        Propagate the full catalogue and return prefilter-cone crossing events
+        in the same structure as SOPPRunner.run().
+        """
+        try:
+            if self.beam_model.prefilter_radius_deg <= 0:
+                raise ValueError(f"prefilter radius must be greater than 0, provided: {self.beam_model.prefilter_radius_deg}")
+            if not self._entries:
+                raise ValueError("Satellites list empty.")
+            rc = self.run_config
+            positions = np.arange(len(self._entries))
+            if rc.geometry_prefilter:
+                from core.geometry_prefilter import GeometryPrefilter
+                keep = GeometryPrefilter(
+                    rc, self.tle_file, self.beam_model.prefilter_radius_deg, self.observer
+                ).run().keep
+                positions = np.flatnonzero(keep)
+            entries = [self._entries[p] for p in positions]
+            names = [name for name, _, _ in entries]
+            satrecs = [Satrec.twoline2rv(l1, l2) for _, l1, l2 in entries]
+            log.info(f"Running native SGP4 propagation for {len(satrecs)} satellites...")
+            horizon = None
+            if rc.use_pass_index:
+                from core.pass_index import above_horizon_windows
+                up = above_horizon_windows(
+                    self.tle_file, rc.latitude, rc.longitude, rc.elevation_m, self.begin, self.n_steps
+                )
+                horizon = {i: up[int(p)] for i, p in enumerate(positions) if int(p) in up}
+                log.info(f"Pass index: {len(horizon)}/{len(satrecs)} satellites above the horizon during the window")
+            step = rc.coarse_step_seconds
+            if step > 1:
+                samples = self.propagate_coarse_to_fine(satrecs, step, horizon)
+            elif horizon is not None:
+                samples = self.propagate_windows(satrecs, horizon)
+            else:
+                samples = self.propagate(satrecs, np.arange(self.n_steps))
+            return self._to_events(names, *samples)
+        except Exception as e:
+            raise RuntimeError(
+                f"Native propagation failed: {e}\n"
+                f"Check that the TLE file is valid and the observation window is correctly set."
+            ) from e
@@ -1,10 +1,13 @@
 import sys
+import math
 import shutil
 import numpy as np
 from skyfield.api import Loader, wgs84, Star
+from dataclasses import dataclass
 from datetime import datetime, timezone
 from pathlib import Path
 from core.paths import get_base_dir, is_frozen
+from core.time_bins import DEFAULT_RESOLUTION_SECONDS, TimeBins
 
 def _seed_ephemeris():
     """Copy de421.bsp from the PyInstaller bundle to the user data dir if not present."""
@@ -22,9 +25,9 @@ class Observer:
     Wraps skyfield setup, precomputes target positions across observation window,
     and provides angular separation via haversine.
 
-    On construction, the full observation window is sampled at 1-second
-    resolution and target alt/az positions are stored as numpy arrays for fast
-    lookup during interference checking. Supply either RA/Dec (tracking target)
+    On construction, the full observation window is sampled once per analysis
+    slot (1 second by default, see core.time_bins) and target alt/az positions
+    are stored as numpy arrays for fast lookup during interference checking. Supply either RA/Dec (tracking target)
     or Az/Alt (fixed pointing), not both.
 
     :param latitude: Observatory latitude in decimal degrees (positive = North).
@@ -36,11 +39,13 @@ class Observer:
     :param dec_degrees: Declination of the tracking target in degrees.
     :param azimuth_deg: Fixed azimuth for static pointings in degrees.
     :param altitude_deg: Fixed altitude for static pointings in degrees.
+    :param resolution_seconds: Spacing of the precomputed grid, shared with WindowAnalyser and SkyPlot.
     """
     def __init__(self, latitude: float, longitude: float, elevation_m: float,
                  time_begin: str, time_end: str,
                  ra_hours: float | None = None, dec_degrees: float | None = None,
-                 azimuth_deg: float | None = None, altitude_deg: float | None = None):
+                 azimuth_deg: float | None = None, altitude_deg: float | None = None,
+                 resolution_seconds: float = DEFAULT_RESOLUTION_SECONDS):
         self.ts = load.timescale()
         self.planets = load('de421.bsp')
         self.earth = self.planets['earth']
@@ -48,6 +53,7 @@ class Observer:
         self.observer = self.location + self.earth
         self._time_begin = time_begin
         self._time_end = time_end
+        self.resolution_seconds = resolution_seconds
         self._is_static = azimuth_deg is not None and altitude_deg is not None
         self._fixed_az = azimuth_deg
         self._fixed_alt = altitude_deg
@@ -65,9 +71,9 @@ class Observer:
         t_end = self.ts.utc(
             datetime.fromisoformat(self._time_end).replace(tzinfo=timezone.utc)
         )
-        one_second = 1 / 86400.0
+        step = self.resolution_seconds / 86400.0
         self._time_array = self.ts.tt_jd(
-            np.arange(t_begin.tt, t_end.tt, one_second)
+            t_begin.tt + np.arange(self.bins.n_steps) * step
         )
 
         if self._is_static:
@@ -94,6 +100,10 @@ class Observer:
     def time_array(self):
         """Full precomputed time array as skyfield time object."""
         return self._time_array
+    @property
+    def bins(self) -> TimeBins:
+        """Time slots of the precomputed grid; grid index i is slot i."""
+        return TimeBins.for_window(self._time_begin, self._time_end, self.resolution_seconds)
 
     def get_target_position(self, sat_time) -> tuple[float, float]:
         """
@@ -128,4 +138,42 @@ class Observer:
         alt1, az1, alt2, az2 = map(np.radians, [alt1, az1, alt2, az2])
         d_az = az2 - az1
         cos_sep = (np.sin(alt1) * np.sin(alt2) + np.cos(alt1) * np.cos(alt2) * np.cos(d_az))
-        return np.degrees(np.arccos(np.clip(cos_sep, -1, 1)))
\ No newline at end of file
+        return np.degrees(np.arccos(np.clip(cos_sep, -1, 1)))
+
+
+@dataclass
+class TargetTrack:
+    """
+    Picklable copy of an Observer's precomputed target track, for checking
+    satellites in worker processes without loading the ephemeris or
+    recomputing the target positions there.
+
+    :param bins: Time slots of the track; sample i is at the start of slot i.
+    :param target_alts: Target altitude per sample in degrees.
+    :param target_azs: Target azimuth per sample in degrees.
+    """
+    bins: TimeBins
+    target_alts: np.ndarray
+    target_azs: np.ndarray
+
+    @classmethod
+    def of(cls, observer, time_begin: str, time_end: str) -> "TargetTrack":
+        """Track of an Observer (or stand-in with target_alts/target_azs) over its window."""
+        resolution = getattr(observer, "resolution_seconds", DEFAULT_RESOLUTION_SECONDS)
+        return cls(
+            TimeBins.for_window(time_begin, time_end, resolution),
+            np.asarray(observer.target_alts), np.asarray(observer.target_azs),
+        )
+
+    @property
+    def resolution_seconds(self) -> float:
+        return self.bins.resolution_seconds
+
+    def get_target_position(self, sat_time: datetime) -> tuple[float, float]:
+        """Target (alt, az) in degrees at the sample nearest sat_time, as Observer.get_target_position."""
+        if sat_time.tzinfo is None:
+            sat_time = sat_time.replace(tzinfo=timezone.utc)
+        offset = (sat_time - self.bins.begin).total_seconds() / self.resolution_seconds
+        #ties go to the earlier sample, like argmin over the time array
+        idx = min(max(math.ceil(offset - 0.5), 0), len(self.target_alts) - 1)
+        return self.target_alts[idx], self.target_azs[idx]
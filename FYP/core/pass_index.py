@@ -0,0 +1,363 @@
+import hashlib
+import logging
+import re
+import time
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+
+import numpy as np
+from sgp4.api import Satrec, SatrecArray
+
+from core.native_propagator import site_enu_frame, teme_to_enu, time_grid, MAX_BLOCK_SAMPLES
+from core.tle_catalogue import CatalogueChangeSet, parse_epoch, parse_norad_id, read_tle_file
+from core.paths import get_data_dir
+
+log = logging.getLogger(__name__)
+
+SECONDS_PER_DAY = 86400
+#coarse altitude sampling; a pass is always found through the sampled local maximum nearest its culmination
+COARSE_STEP_SECONDS = 60
+#intervals longer than this (GEO, high MEO) are kept aside so point queries stay O(log n)
+LONG_PASS_SECONDS = 2 * 3600
+#culmination search switches from ternary to a dense scan below this bracket width
+DENSE_SECONDS = 16
+
+
+def pass_index_dir() -> Path:
+    path = get_data_dir() / "pass_index"
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def tle_digest(tle_file: str) -> str:
+    """Short content hash identifying a TLE catalogue version."""
+    return hashlib.sha1(Path(tle_file).read_bytes()).hexdigest()[:12]
+
+
+def catalogue_identity(tle_file: str) -> str:
+    """
+    Which catalogue a TLE file is a version of: its file name without any
+    trailing content digest, so successive downloads of a group (or pruned
+    copies of it) share one identity while different groups do not.
+    """
+    return re.sub(r"_[0-9a-f]{12}$", "", Path(tle_file).stem)
+
+
+class _DayAltitude:
+    """Per-satellite altitude evaluator on the integer-second grid of one UTC day."""
+    def __init__(self, day_start: datetime, latitude: float, longitude: float, elevation_m: float):
+        self.jd, self.fr, self.theta = time_grid(day_start, np.arange(SECONDS_PER_DAY + 1))
+        self.site, self.rotation = site_enu_frame(latitude, longitude, elevation_m)
+        self._cos, self._sin = np.cos(self.theta), np.sin(self.theta)
+
+    def __call__(self, satrec: Satrec, offsets: np.ndarray) -> np.ndarray:
+        #inlined teme_to_enu for the up component only; this is called many times per satellite
+        err, r, _ = satrec.sgp4_array(self.jd[offsets], self.fr[offsets])
+        c, s = self._cos[offsets], self._sin[offsets]
+        x = c * r[:, 0] + s * r[:, 1] - self.site[0]
+        y = -s * r[:, 0] + c * r[:, 1] - self.site[1]
+        z = r[:, 2] - self.site[2]
+        up = self.rotation[2, 0] * x + self.rotation[2, 1] * y + self.rotation[2, 2] * z
+        alt = np.degrees(np.arcsin(up / np.sqrt(x * x + y * y + z * z)))
+        alt[err != 0] = np.nan
+        return alt
+
+    def coarse(self, satrecs: list, offsets: np.ndarray) -> np.ndarray:
+        """Altitudes for the whole catalogue at shared offsets, shape (n_sat, n_offsets)."""
+        batch = max(1, MAX_BLOCK_SAMPLES // len(offsets))
+        out = np.empty((len(satrecs), len(offsets)))
+        for start in range(0, len(satrecs), batch):
+            err, r, _ = SatrecArray(satrecs[start:start + batch]).sgp4(self.jd[offsets], self.fr[offsets])
+            r = np.where((err == 0)[..., None], r, np.nan)
+            enu = teme_to_enu(r, self.theta[offsets], self.site, self.rotation)
+            with np.errstate(invalid='ignore'):
+                out[start:start + batch] = np.degrees(np.arcsin(enu[..., 2] / np.linalg.norm(enu, axis=-1)))
+        return out
+
+
+class PassIndex:
+    """
+    Rise/culminate/set table of every catalogue satellite for one site and UTC day.
+
+    Built by sampling altitude every COARSE_STEP_SECONDS, refining each sampled
+    local maximum to the culmination second with a ternary search, and
+    bisecting rise and set to the second on either side of every culmination
+    above the horizon. Times are integer seconds from 00:00 UTC; rise and set
+    are the first and last seconds above the horizon, clipped to the day.
+
+    Indexes are persisted under data/pass_index keyed by site, day and TLE
+    content, so repeated runs for the same night reuse them. Each index also
+    records the NORAD number and epoch of every catalogue entry it was built
+    from; when the catalogue is refreshed, update() diffs against that and
+    re-predicts only added and updated satellites.
+
+    :param sat_index: Catalogue position (file order) of each pass.
+    :param rise: First second above the horizon.
+    :param culminate: Second of maximum altitude.
+    :param set_: Last second above the horizon.
+    :param max_alt: Altitude at culmination in degrees.
+    :param day: UTC day the index covers.
+    :param norad_ids: NORAD number of every catalogue position.
+    :param epochs: Element set epoch (unix seconds) of every catalogue position.
+    """
+    min_altitude_deg = 0.0
+
+    def __init__(self, sat_index, rise, culminate, set_, max_alt, day: date, norad_ids=None, epochs=None):
+        order = np.argsort(rise, kind="stable")
+        self.sat_index = np.asarray(sat_index, dtype=np.int32)[order]
+        self.rise = np.asarray(rise, dtype=np.int32)[order]
+        self.culminate = np.asarray(culminate, dtype=np.int32)[order]
+        self.set = np.asarray(set_, dtype=np.int32)[order]
+        self.max_alt = np.asarray(max_alt, dtype=np.float32)[order]
+        self.day = day
+        self.norad_ids = None if norad_ids is None else np.asarray(norad_ids, dtype=np.int64)
+        self.epochs = None if epochs is None else np.asarray(epochs, dtype=np.float64)
+        self.day_start = datetime(day.year, day.month, day.day, tzinfo=timezone.utc)
+        long = (self.set - self.rise) > LONG_PASS_SECONDS
+        self._long = np.flatnonzero(long)
+        self._short = np.flatnonzero(~long)
+        self._short_rise = self.rise[self._short]
+        self._max_short = int((self.set - self.rise)[self._short].max()) if len(self._short) else 0
+
+    def __len__(self) -> int:
+        return len(self.rise)
+
+    # --- construction / persistence ---
+
+    @classmethod
+    def build(cls, tle_file: str, latitude: float, longitude: float, elevation_m: float, day: date) -> "PassIndex":
+        start = time.perf_counter()
+        entries = read_tle_file(tle_file)
+        columns = cls._predict(entries, range(len(entries)), latitude, longitude, elevation_m, day)
+        index = cls(*columns, day=day, **cls._catalogue_arrays(entries))
+        log.info(f"Built pass index for {day}: {len(index)} passes of {len(entries)} satellites "
+                 f"in {time.perf_counter() - start:.1f}s")
+        return index
+
+    @classmethod
+    def _predict(cls, entries, positions, latitude, longitude, elevation_m, day) -> tuple[list, ...]:
+        """Pass table columns (sat_index, rise, culminate, set, max_alt) for the given catalogue positions."""
+        positions = list(positions)
+        satrecs = [Satrec.twoline2rv(entries[p][1], entries[p][2]) for p in positions]
+        columns = ([], [], [], [], [])
+        if not satrecs:
+            return columns
+        day_start = datetime(day.year, day.month, day.day, tzinfo=timezone.utc)
+        altitude = _DayAltitude(day_start, latitude, longitude, elevation_m)
+        coarse = np.arange(0, SECONDS_PER_DAY + 1, COARSE_STEP_SECONDS)
+        coarse_alt = altitude.coarse(satrecs, coarse)
+        for position, satrec, alt in zip(positions, satrecs, coarse_alt):
+            for row in cls._passes(satrec, coarse, alt, altitude):
+                for col, value in zip(columns, (position,) + row):
+                    col.append(value)
+        return columns
+
+    @staticmethod
+    def _catalogue_arrays(entries) -> dict:
+        norad_ids, epochs = [], []
+        for _, l1, _ in entries:
+            try:
+                norad_ids.append(parse_norad_id(l1))
+                epochs.append(parse_epoch(l1).timestamp())
+            except ValueError:
+                norad_ids.append(-1)
+                epochs.append(np.nan)
+        return {"norad_ids": norad_ids, "epochs": epochs}
+
+    def update(self, tle_file: str, latitude: float, longitude: float, elevation_m: float) -> "PassIndex | None":
+        """
+        Index for a new version of the catalogue, re-predicting only satellites
+        that were added or whose epoch changed; passes of unchanged satellites
+        are carried over and remapped to their new catalogue positions.
+
+        :returns: The updated index, or None when this index cannot be diffed
+            (no catalogue record, or NORAD numbers repeat within a catalogue).
+        """
+        entries = read_tle_file(tle_file)
+        arrays = self._catalogue_arrays(entries)
+        new_ids, new_epochs = np.asarray(arrays["norad_ids"]), np.asarray(arrays["epochs"])
+        if self.norad_ids is None or len(np.unique(self.norad_ids)) != len(self.norad_ids) \
+                or len(np.unique(new_ids)) != len(new_ids) or np.any(new_ids < 0):
+            return None
+        start = time.perf_counter()
+        changes = CatalogueChangeSet.between(
+            dict(zip(self.norad_ids.tolist(), self.epochs.tolist())),
+            dict(zip(new_ids.tolist(), new_epochs.tolist())),
+        )
+        position_of = {n: i for i, n in enumerate(new_ids.tolist())}
+        row_ids = self.norad_ids[self.sat_index]
+        carried = ~np.isin(row_ids, list(changes.affected))
+        remapped = np.array([position_of[n] for n in row_ids[carried].tolist()], dtype=np.int32)
+        rebuild = sorted(position_of[n] for n in changes.added | changes.updated)
+        fresh = self._predict(entries, rebuild, latitude, longitude, elevation_m, self.day)
+        index = PassIndex(
+            np.r_[remapped, fresh[0]].astype(np.int32),
+            np.r_[self.rise[carried], fresh[1]],
+            np.r_[self.culminate[carried], fresh[2]],
+            np.r_[self.set[carried], fresh[3]],
+            np.r_[self.max_alt[carried], fresh[4]],
+            day=self.day, norad_ids=new_ids, epochs=new_epochs,
+        )
+        log.info(f"Updated pass index for {self.day} ({changes.summary()}): re-predicted {len(rebuild)} "
+                 f"of {len(entries)} satellites in {time.perf_counter() - start:.1f}s")
+        return index
+
+    @classmethod
+    def _passes(cls, satrec, coarse, alt, altitude):
+        """Yield (rise, culminate, set, max_alt) for one satellite."""
+        if np.all(np.isnan(alt)):
+            return
+        padded = np.r_[-np.inf, np.nan_to_num(alt, nan=-np.inf), -np.inf]
+        k = np.flatnonzero((padded[1:-1] >= padded[:-2]) & (padded[1:-1] > padded[2:]) & np.isfinite(padded[1:-1]))
+        if not len(k):
+            return
+        lo = coarse[np.maximum(k - 1, 0)]
+        hi = coarse[np.minimum(k + 1, len(coarse) - 1)]
+
+        # ternary search for each culmination, finished with a dense scan of the last few seconds
+        while np.any(hi - lo > DENSE_SECONDS):
+            m1 = lo + (hi - lo) // 3
+            m2 = hi - (hi - lo) // 3
+            a = altitude(satrec, np.r_[m1, m2])
+            left = a[:len(m1)] < a[len(m1):]
+            lo, hi = np.where(left, m1, lo), np.where(left, hi, m2)
+        candidates = np.minimum(lo[:, None] + np.arange(DENSE_SECONDS + 1), hi[:, None])
+        cand_alt = altitude(satrec, candidates.ravel()).reshape(candidates.shape)
+        best = np.argmax(np.nan_to_num(cand_alt, nan=-np.inf), axis=1)
+        culm = candidates[np.arange(len(k)), best]
+        culm_alt = cand_alt[np.arange(len(k)), best]
+        up = culm_alt >= cls.min_altitude_deg
+        if not np.any(up):
+            return
+        culm, culm_alt = culm[up], culm_alt[up]
+
+        # bracket rise/set by the nearest coarse samples below the horizon
+        below = np.r_[-1, coarse[alt < cls.min_altitude_deg], SECONDS_PER_DAY + 1]
+        pos = np.searchsorted(below, culm)
+        rise_lo, set_hi = below[pos - 1], below[pos]
+        rise, set_ = cls._bisect(satrec, altitude, rise_lo, culm, set_hi)
+
+        seen = {}
+        for r, c, s, a in zip(rise, culm, set_, culm_alt):
+            key = (int(r), int(s))
+            if key not in seen or a > seen[key][1]:
+                seen[key] = (int(c), float(a))
+        for (r, s), (c, a) in seen.items():
+            yield r, c, s, a
+
+    @classmethod
+    def _bisect(cls, satrec, altitude, rise_lo, culm, set_hi):
+        """
+        Integer bisection of rise in (rise_lo, culm] and set in [culm, set_hi),
+        both brackets advanced with one propagation call per iteration.
+        Sentinels outside the day (-1 / SECONDS_PER_DAY + 1) clip to the day edge.
+        """
+        n = len(culm)
+        lo = np.r_[rise_lo, culm]
+        hi = np.r_[culm, set_hi]
+        rising = np.r_[np.ones(n, dtype=bool), np.zeros(n, dtype=bool)]
+        clipped = np.r_[rise_lo < 0, set_hi > SECONDS_PER_DAY]
+        active = ~clipped & (hi - lo > 1)
+        while np.any(active):
+            mid = (lo[active] + hi[active]) // 2
+            above = altitude(satrec, mid) >= cls.min_altitude_deg
+            to_hi = above == rising[active]
+            idx = np.flatnonzero(active)
+            hi[idx[to_hi]] = mid[to_hi]
+            lo[idx[~to_hi]] = mid[~to_hi]
+            active &= hi - lo > 1
+        rise = np.where(clipped[:n], 0, hi[:n])
+        set_ = np.where(clipped[n:], SECONDS_PER_DAY, lo[n:])
+        return rise, set_
+
+    @staticmethod
+    def _site_prefix(tle_file: str, latitude: float, longitude: float, elevation_m: float, day: date) -> str:
+        site = f"{latitude:.4f}_{longitude:.4f}_{elevation_m:.0f}_{day.isoformat()}"
+        return f"{catalogue_identity(tle_file)}_{site}"
+
+    @classmethod
+    def cache_path(cls, tle_file: str, latitude: float, longitude: float, elevation_m: float, day: date) -> Path:
+        prefix = cls._site_prefix(tle_file, latitude, longitude, elevation_m, day)
+        return pass_index_dir() / f"{prefix}_{tle_digest(tle_file)}.npz"
+
+    @classmethod
+    def load_or_build(cls, tle_file: str, latitude: float, longitude: float, elevation_m: float, day: date) -> "PassIndex":
+        """
+        Cached index for this catalogue version if present; otherwise the most
+        recent index of the same catalogue (see catalogue_identity) for the
+        same site and day updated incrementally, falling back to a full build.
+        Superseded index files of that catalogue are removed; indexes of other
+        catalogues are left alone.
+        """
+        path = cls.cache_path(tle_file, latitude, longitude, elevation_m, day)
+        if path.exists():
+            log.info(f"Loaded pass index {path.name}")
+            return cls.load(path)
+        prefix = cls._site_prefix(tle_file, latitude, longitude, elevation_m, day)
+        previous = sorted(pass_index_dir().glob(f"{prefix}_*.npz"), key=lambda p: p.stat().st_mtime)
+        index = None
+        if previous:
+            index = cls.load(previous[-1]).update(tle_file, latitude, longitude, elevation_m)
+        if index is None:
+            index = cls.build(tle_file, latitude, longitude, elevation_m, day)
+        index.save(path)
+        for old in previous:
+            old.unlink(missing_ok=True)
+        return index
+
+    def save(self, path: Path):
+        tmp = path.with_suffix(".tmp.npz")
+        catalogue = {} if self.norad_ids is None else {"norad_ids": self.norad_ids, "epochs": self.epochs}
+        np.savez_compressed(
+            tmp, sat_index=self.sat_index, rise=self.rise, culminate=self.culminate,
+            set=self.set, max_alt=self.max_alt, day=self.day.isoformat(), **catalogue,
+        )
+        tmp.replace(path)
+
+    @classmethod
+    def load(cls, path: Path) -> "PassIndex":
+        with np.load(path) as data:
+            catalogue = {key: data[key] for key in ("norad_ids", "epochs") if key in data}
+            return cls(data["sat_index"], data["rise"], data["culminate"], data["set"], data["max_alt"],
+                       day=date.fromisoformat(str(data["day"])), **catalogue)
+
+    # --- queries ---
+
+    def up_at(self, t: datetime) -> np.ndarray:
+        """Catalogue positions of satellites above the horizon at time t."""
+        s = int((t - self.day_start).total_seconds())
+        lo = np.searchsorted(self._short_rise, s - self._max_short, side="left")
+        hi = np.searchsorted(self._short_rise, s, side="right")
+        rows = np.r_[self._short[lo:hi], self._long]
+        rows = rows[(self.rise[rows] <= s) & (self.set[rows] >= s)]
+        return np.unique(self.sat_index[rows])
+
+    def windows(self, begin: datetime, n_steps: int) -> dict[int, np.ndarray]:
+        """
+        Above-horizon offsets (seconds from ``begin``) per catalogue position,
+        restricted to [0, n_steps) and to this index's day.
+        """
+        shift = int((begin - self.day_start).total_seconds())
+        out: dict[int, list] = {}
+        lo = np.maximum(self.rise - shift, 0)
+        hi = np.minimum(self.set - shift, n_steps - 1)
+        for row in np.flatnonzero(lo <= hi):
+            out.setdefault(int(self.sat_index[row]), []).append(np.arange(lo[row], hi[row] + 1))
+        return {s: np.unique(np.concatenate(parts)) for s, parts in out.items()}
+
+
+def above_horizon_windows(tle_file: str, latitude: float, longitude: float, elevation_m: float,
+                          begin: datetime, n_steps: int) -> dict[int, np.ndarray]:
+    """
+    Above-horizon offsets per catalogue position for a window, stitched from
+    the pass index of every UTC day it touches.
+    """
+    end = begin + timedelta(seconds=n_steps)
+    day = begin.date()
+    merged: dict[int, list] = {}
+    while datetime(day.year, day.month, day.day, tzinfo=timezone.utc) < end:
+        index = PassIndex.load_or_build(tle_file, latitude, longitude, elevation_m, day)
+        for s, offsets in index.windows(begin, n_steps).items():
+            merged.setdefault(s, []).append(offsets)
+        day += timedelta(days=1)
+    return {s: np.unique(np.concatenate(parts)) for s, parts in merged.items()}
@@ -0,0 +1,273 @@
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field, fields, replace
+
+from core.run_config import RunConfig
+from core.time_bins import strongest_per_slot
+from core.window_analyser import IncrementalWindowAnalyser, WindowAnalyser
+
+log = logging.getLogger(__name__)
+
+#intermediates kept per kind; observers and catalogues are small, parsed satellite lists are not
+MAX_OBSERVERS = 4
+MAX_BEAM_MODELS = 4
+MAX_SATELLITE_SETS = 2
+MAX_CATALOGUES = 8
+
+
+@dataclass
+class RunTiming:
+    """Wall time per pipeline stage of one run, and which memoised stages were served from memory or built."""
+    stages: dict[str, float] = field(default_factory=dict)
+    reused: set[str] = field(default_factory=set)
+    built: set[str] = field(default_factory=set)
+
+    @property
+    def warm(self) -> bool:
+        """Every memoised stage was served from memory."""
+        return bool(self.reused) and not self.built
+
+    @property
+    def state(self) -> str:
+        if self.warm:
+            return "Warm"
+        return "Partly warm" if self.reused else "Cold"
+
+    @property
+    def total_seconds(self) -> float:
+        return sum(self.stages.values())
+
+    def summary(self) -> str:
+        parts = ", ".join(
+            f"{name} {seconds:.2f}s{' (reused)' if name in self.reused else ''}"
+            for name, seconds in self.stages.items()
+        )
+        return f"{self.state} run in {self.total_seconds:.2f}s: {parts}"
+
+
+@dataclass
+class AnalysisOutput:
+    beam_model: object
+    observer: object
+    results: list
+    analyser: WindowAnalyser
+    timing: RunTiming
+
+    def clean_time_index(self):
+        """Point, range and next-fit query index over this run (see core.clean_time_index)."""
+        from core.clean_time_index import CleanTimeIndex
+        return CleanTimeIndex(self.analyser, self.results)
+
+
+class _Memo:
+    """Small LRU mapping used for each kind of reusable intermediate."""
+    def __init__(self, size: int):
+        self.size = size
+        self._items: OrderedDict = OrderedDict()
+
+    def get(self, key, build, timing: RunTiming, stage: str, valid=None):
+        """
+        :param valid: Optional check on a held item; one that fails it is rebuilt.
+        """
+        start = time.perf_counter()
+        if key in self._items and (valid is None or valid(self._items[key])):
+            self._items.move_to_end(key)
+            timing.reused.add(stage)
+        else:
+            self._items[key] = build()
+            self._items.move_to_end(key)
+            timing.built.add(stage)
+            while len(self._items) > self.size:
+                self._items.popitem(last=False)
+        timing.stages[stage] = timing.stages.get(stage, 0.0) + time.perf_counter() - start
+        return self._items[key]
+
+    def clear(self):
+        self._items.clear()
+
+
+def _as_list(tle_files: str | list[str]) -> list[str]:
+    return [tle_files] if isinstance(tle_files, str) else list(tle_files)
+
+
+def _file_version(path: str) -> tuple:
+    stat = os.stat(path)
+    return (str(path), stat.st_mtime_ns, stat.st_size)
+
+
+class PropagationService:
+    """
+    Long-lived propagation pipeline owned by AppState.
+
+    Keeps the expensive, reusable intermediates of a run in memory between
+    GUI runs: the pruned/deduplicated catalogue file, SOPP's parsed satellite
+    list, BeamModel scans and Observer target tracks. Each is keyed only on
+    the RunConfig fields (and TLE file versions) it depends on, so a run that
+    changes the target or window rebuilds just the observer and reuses the
+    parsed catalogue. Per-stage timings of every run are kept in ``timings``.
+
+    :param observer_factory: Callable building the Observer for a RunConfig;
+        defaults to core.sharded_runner.make_observer.
+    """
+    def __init__(self, observer_factory=None):
+        self.observer_factory = observer_factory
+        self._catalogues = _Memo(MAX_CATALOGUES)
+        self._satellites = _Memo(MAX_SATELLITE_SETS)
+        self._beam_models = _Memo(MAX_BEAM_MODELS)
+        self._observers = _Memo(MAX_OBSERVERS)
+        self._lock = threading.Lock()
+        self.last_config: RunConfig | None = None
+        self.last_tle_files: list[str] | None = None
+        self.timings: list[RunTiming] = []
+
+    def clear(self):
+        for memo in (self._catalogues, self._satellites, self._beam_models, self._observers):
+            memo.clear()
+
+    # --- Intermediates ---
+
+    def catalogue(self, rc: RunConfig, tle_files: list[str], timing: RunTiming) -> str:
+        """Catalogue merged from tle_files, deduplicated and pruned for rc's window."""
+        from core.tle_catalogue import catalogue_for_run
+        key = (tuple(_file_version(f) for f in tle_files), rc.time_begin, rc.time_end, rc.stale_policy,
+               rc.max_element_age_days, rc.observing_band())
+        #selected catalogues on disk can be evicted by other runs, so a vanished path is rebuilt
+        return self._catalogues.get(key, lambda: catalogue_for_run(
+            list(tle_files), rc.time_begin, rc.time_end, rc.stale_policy, rc.max_element_age_days, rc.observing_band(),
+        ), timing, "catalogue", valid=os.path.exists)
+
+    def satellites(self, tle_file: str, timing: RunTiming) -> list:
+        """
+        SOPP Satellite objects parsed from a TLE file, keyed on its contents
+        so windows whose pruning keeps the same element sets share them.
+        """
+        from sopp.satellites_loader.satellites_loader_from_files import SatellitesLoaderFromFiles
+        from core.pass_index import tle_digest
+        return self._satellites.get(
+            tle_digest(tle_file),
+            lambda: SatellitesLoaderFromFiles(tle_file=tle_file).load_satellites(),
+            timing, "satellites",
+        )
+
+    def beam_model(self, rc: RunConfig, timing: RunTiming):
+        from core.sharded_runner import make_beam_model
+        key = (rc.dish_diameter_m, rc.frequency_hz, rc.gain_cutoff_percent, rc.bypass_airy, rc.manual_beamwidth_deg)
+        return self._beam_models.get(key, lambda: make_beam_model(rc), timing, "beam")
+
+    def observer(self, rc: RunConfig, timing: RunTiming):
+        from core.sharded_runner import make_observer
+        factory = self.observer_factory or make_observer
+        key = (rc.latitude, rc.longitude, rc.elevation_m, rc.time_begin, rc.time_end,
+               rc.ra_hours, rc.dec_degrees, rc.azimuth_deg, rc.altitude_deg, rc.time_resolution_seconds)
+        return self._observers.get(key, lambda: factory(rc), timing, "observer")
+
+    # --- Runs ---
+
+    def run(self, rc: RunConfig, tle_files: str | list[str], on_progress=None) -> AnalysisOutput:
+        """
+        Propagate, check and analyse one run, reusing whatever the previous runs left in memory.
+
+        :param tle_files: TLE file, or several (e.g. one per TLEGroup) merged into one catalogue.
+
+        :param on_progress: Optional callback(analyser, done, total) receiving a
+            snapshot of an IncrementalWindowAnalyser with provisional clean
+            stretches each time a shard or batch completes.
+        """
+        from core.checker import InterferenceChecker
+        from core.result_cache import cached_run
+        from core.runner_factory import create_runner
+        from enums.propagation_backend import PropagationBackend
+
+        with self._lock:
+            tle_files = _as_list(tle_files)
+            self._log_changes(rc, tle_files)
+            timing = RunTiming()
+            beam_model = self.beam_model(rc, timing)
+            observer = self.observer(rc, timing)
+            catalogue = self.catalogue(rc, tle_files, timing)
+
+            if rc.sky_track or rc.shard_seconds > 0 or rc.batch_size > 0:
+                start = time.perf_counter()
+                on_chunk = self._progress_handler(rc, on_progress) if on_progress is not None else None
+                results, analyser = self._run_alternative(rc, catalogue, beam_model, observer, on_chunk)
+                timing.stages["propagate+check"] = time.perf_counter() - start
+            else:
+                satellites = None
+                if PropagationBackend(rc.propagation_backend) == PropagationBackend.SOPP:
+                    satellites = self.satellites(catalogue, timing)
+                start = time.perf_counter()
+                events = cached_run(create_runner(beam_model, rc, catalogue, observer, satellites=satellites))
+                log.info(f"{rc.propagation_backend} backend returned {len(events)} events")
+                timing.stages["propagate"] = time.perf_counter() - start
+                start = time.perf_counter()
+                results = InterferenceChecker(beam_model, observer).check(events)
+                analyser = WindowAnalyser.for_run(results, rc)
+                timing.stages["check"] = time.perf_counter() - start
+            results = strongest_per_slot(results, analyser.bins)
+            log.info(f"Check flagged {len(results)} position points")
+            log.info(timing.summary())
+
+            self.last_config, self.last_tle_files = rc, tle_files
+            self.timings.append(timing)
+            return AnalysisOutput(beam_model, observer, results, analyser, timing)
+
+    @staticmethod
+    def _progress_handler(rc: RunConfig, on_progress):
+        """Chunk callback for the sharded and batched runners feeding an incremental analyser."""
+        analyser = IncrementalWindowAnalyser.for_run(rc)
+
+        def on_chunk(results, covered, done, total):
+            analyser.add(results, covered)
+            on_progress(analyser.snapshot(), done, total)
+        return on_chunk
+
+    @staticmethod
+    def _run_alternative(rc: RunConfig, catalogue: str, beam_model, observer,
+                         on_chunk=None) -> tuple[list, WindowAnalyser]:
+        """Sky-track, sharded and batched pipelines, which manage their own propagation."""
+        if rc.sky_track:
+            from core.sky_track import sky_track_for
+            results = sky_track_for(rc, catalogue).check(beam_model, observer)
+            return results, WindowAnalyser.for_run(results, rc)
+        if rc.shard_seconds > 0:
+            from core.sharded_runner import ShardedRunner
+            sharded = ShardedRunner(rc, catalogue, rc.shard_seconds, rc.shard_overlap_seconds).run(on_chunk)
+            return sharded.results, sharded.analyser
+        from core.batch_runner import BatchRunner
+        #the batches only need the target track of the observer already held for this run
+        return BatchRunner(
+            rc, catalogue, rc.batch_size, max_in_flight=rc.max_in_flight_batches or None,
+            observer_factory=lambda _: observer,
+        ).run(on_chunk)
+
+    def forecast(self, rc: RunConfig, tle_files: str | list[str], **options):
+        """
+        Probabilistic interference forecast for a run (see core.interference_forecast),
+        reusing the catalogue, beam model and observer held for it.
+
+        :param options: InterferenceForecast options (error_model, realizations, seed).
+        """
+        from core.interference_forecast import InterferenceForecast
+        with self._lock:
+            timing = RunTiming()
+            beam_model = self.beam_model(rc, timing)
+            observer = self.observer(rc, timing)
+            catalogue = self.catalogue(rc, _as_list(tle_files), timing)
+        return InterferenceForecast(beam_model, rc, catalogue, observer, **options).run()
+
+    def rerun(self, **changes) -> AnalysisOutput:
+        """Run again with only the given RunConfig fields changed from the previous run."""
+        if self.last_config is None:
+            raise RuntimeError("No previous run to modify")
+        return self.run(replace(self.last_config, **changes), self.last_tle_files)
+
+    def _log_changes(self, rc: RunConfig, tle_files: list[str]):
+        if self.last_config is None:
+            return
+        changed = [f.name for f in fields(rc) if getattr(rc, f.name) != getattr(self.last_config, f.name)]
+        if tle_files != self.last_tle_files:
+            changed.append("tle_files")
+        log.info(f"Changed since last run: {', '.join(changed) if changed else 'nothing'}")
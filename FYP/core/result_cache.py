@@ -0,0 +1,199 @@
+import hashlib
+import json
+import logging
+import os
+import pickle
+import threading
+import time
+from pathlib import Path
+
+from core.paths import get_data_dir
+
+log = logging.getLogger(__name__)
+
+MAX_CACHE_MB = 512
+
+
+def result_cache_dir() -> Path:
+    path = get_data_dir() / "cache"
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def search_radius_deg(runner) -> float:
+    """
+    Search cone radius the runner propagates with: the beam model's prefilter
+    radius, which follows the gain cutoff (or half the manual beamwidth in
+    bypass mode, see core.sharded_runner.make_beam_model).
+    """
+    return round(float(runner.beam_model.prefilter_radius_deg), 9)
+
+
+def propagation_key(runner) -> str:
+    """
+    Content hash identifying a propagation result: TLE file contents, site,
+    pointing and window, plus the backend that produced it.
+
+    The search radius is not part of the key. It follows the gain cutoff, and
+    events found with a wider cone are a superset of those for a narrower one
+    (the checker drops positions below the cutoff), so entries are stored with
+    their radius and serve any run whose radius is no larger; see
+    ResultCache.get_covering(). Settings applied after propagation (gap
+    tolerance, gain cutoff) therefore reuse the cached events. Bypass mode is
+    part of the key, since the backends size their search cone differently
+    from the manual beamwidth than from the Airy cutoff.
+    """
+    rc = runner.run_config
+    pointing = (
+        {"alt": rc.altitude_deg, "az": rc.azimuth_deg} if rc.is_static()
+        else {"ra": rc.ra_hours, "dec": rc.dec_degrees}
+    )
+    description = {
+        "site": [rc.latitude, rc.longitude, rc.elevation_m],
+        "pointing": pointing,
+        "window": [rc.time_begin, rc.time_end],
+        "sample_seconds": rc.sample_seconds(),
+        "backend": rc.propagation_backend,
+        "bypass_airy": rc.bypass_airy,
+        "geometry_prefilter": rc.geometry_prefilter,
+    }
+    digest = hashlib.sha256(Path(runner.tle_file).read_bytes())
+    digest.update(json.dumps(description, sort_keys=True).encode())
+    return digest.hexdigest()
+
+
+class ResultCache:
+    """
+    Content-addressed on-disk cache of pickled propagation results.
+
+    Entries are files named by their key (and, for propagation results,
+    the search radius they cover). A hit refreshes the file's mtime,
+    and whenever the cache grows past its size limit the least recently used
+    entries are evicted. Hit/miss counts are kept per instance and reported
+    by stats().
+
+    :param directory: Cache directory; defaults to data/cache.
+    :param max_mb: Size limit in megabytes.
+    """
+    def __init__(self, directory: Path | None = None, max_mb: float = MAX_CACHE_MB):
+        self.directory = Path(directory) if directory is not None else result_cache_dir()
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{key}.pkl"
+
+    def _entries(self) -> list[Path]:
+        return list(self.directory.glob("*.pkl"))
+
+    def _covering_path(self, key: str, radius_deg: float) -> Path:
+        return self.directory / f"{key}@{radius_deg:.9f}.pkl"
+
+    def _covering_entries(self, key: str) -> list[tuple[float, Path]]:
+        """(radius, path) of every entry stored for key with a search radius, narrowest first."""
+        entries = []
+        for path in self.directory.glob(f"{key}@*.pkl"):
+            try:
+                entries.append((float(path.stem.split("@", 1)[1]), path))
+            except ValueError:
+                continue
+        return sorted(entries)
+
+    def get(self, key: str):
+        """Cached value for key, or None on a miss."""
+        return self._load(self._path(key))
+
+    def get_covering(self, key: str, radius_deg: float):
+        """Value stored for key with the narrowest search radius of at least radius_deg, or None on a miss."""
+        for radius, path in self._covering_entries(key):
+            if radius >= radius_deg:
+                return self._load(path)
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put_covering(self, key: str, radius_deg: float, value):
+        """Store value for key at radius_deg, replacing entries for key it covers."""
+        self._write(self._covering_path(key, radius_deg), value)
+        for radius, path in self._covering_entries(key):
+            if radius < radius_deg:
+                path.unlink(missing_ok=True)
+        self._evict()
+
+    def _load(self, path: Path):
+        try:
+            with open(path, "rb") as f:
+                value = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError):
+            with self._lock:
+                self.misses += 1
+            return None
+        os.utime(path)
+        with self._lock:
+            self.hits += 1
+        return value
+
+    def put(self, key: str, value):
+        self._write(self._path(key), value)
+        self._evict()
+
+    def _write(self, path: Path, value):
+        tmp = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        with open(tmp, "wb") as f:
+            pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+
+    def _evict(self):
+        entries = []
+        for path in self._entries():
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+            with self._lock:
+                self.evictions += 1
+
+    def size_bytes(self) -> int:
+        return sum(path.stat().st_size for path in self._entries())
+
+    def clear(self):
+        for path in self._entries():
+            path.unlink(missing_ok=True)
+
+    def stats(self) -> str:
+        return (
+            f"Result cache: {self.hits} hits, {self.misses} misses, {self.evictions} evictions, "
+            f"{len(self._entries())} entries, {self.size_bytes() / 1e6:.1f}/{self.max_bytes / 1e6:.0f} MB"
+        )
+
+
+def cached_run(runner, cache: ResultCache | None = None):
+    """
+    runner.run() through the result cache: a hit returns the stored events
+    without propagating, a miss runs the runner and stores its events.
+    """
+    if not runner.run_config.result_cache:
+        return runner.run()
+    cache = cache or ResultCache(max_mb=runner.run_config.result_cache_mb)
+    key, radius = propagation_key(runner), search_radius_deg(runner)
+    events = cache.get_covering(key, radius)
+    if events is None:
+        start = time.perf_counter()
+        events = runner.run()
+        cache.put_covering(key, radius, events)
+        log.info(f"Propagation cache miss, computed in {time.perf_counter() - start:.1f}s")
+    else:
+        log.info(f"Propagation cache hit ({key[:12]})")
+    log.info(cache.stats())
+    return events
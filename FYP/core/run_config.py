@@ -2,6 +2,11 @@ import os
 from dataclasses import dataclass, field
 from typing import Optional
 
+def tle_groups(data_type: str) -> list[str]:
+    """TLE groups named by a data_type of one group or several joined with commas."""
+    return [group.strip() for group in data_type.split(",") if group.strip()]
+
+
 @dataclass
 class RunConfig:
     latitude: float
@@ -20,13 +25,47 @@ class RunConfig:
     manual_beamwidth_deg: float = 3.0
     # defaults
     gap_tolerance_seconds: int = 30
+    time_resolution_seconds: float = 1.0  # analysis slot length (e.g. 0.1, 1 or 10) shared by Observer, WindowAnalyser and SkyPlot, see core.time_bins
     gain_cutoff_percent: float = 3.0
-    data_type: str = "active"
+    data_type: str = "active"  # TLEGroup, or several joined with commas e.g. "starlink,oneweb"
     concurrency_level: int = field(default_factory=os.cpu_count)
+    stale_policy: str = "keep"  # "keep", "drop" or "quarantine" for stale/decayed element sets, see enums.stale_policy
+    max_element_age_days: float = 14.0  # element sets with epochs further than this from the window are stale
+    band_filter: bool = False  # leave out satellites whose known downlinks miss the observing band, see core.transmitter_db
+    observing_bandwidth_mhz: float = 10.0
+    propagation_backend: str = "sopp"  # "sopp" or "native", see enums.propagation_backend
+    geometry_prefilter: bool = False  # drop satellites that can never reach the beam before propagating
+    coarse_step_seconds: int = 0  # native backend: >1 enables coarse-to-fine screening at this cadence
+    result_cache: bool = True  # reuse propagation results for identical TLEs/site/radius/pointing/window, see core.result_cache
+    result_cache_mb: int = 512
+    use_pass_index: bool = False  # native backend: only propagate satellites/seconds above the horizon, see core.pass_index
+    shard_seconds: int = 0  # >0 splits the window into shards of this length run on worker processes, see core.sharded_runner
+    shard_overlap_seconds: int = 60
+    batch_size: int = 0  # >0 propagates the catalogue in satellite batches of this size on worker processes, see core.batch_runner
+    max_in_flight_batches: int = 0  # 0 = twice the worker count
+    sky_track: bool = False  # propagate the catalogue once per site/window and check pointings against it, see core.sky_track
+    ephemeris_store: bool = False  # build sky tracks from the per-site, per-day memory-mapped ephemeris, see core.ephemeris_store
     
 
     def is_static(self) -> bool:
         return self.azimuth_deg is not None and self.altitude_deg is not None
 
     def is_tracking(self) -> bool:
-        return self.ra_hours is not None and self.dec_degrees is not None
\ No newline at end of file
+        return self.ra_hours is not None and self.dec_degrees is not None
+
+    def sample_seconds(self) -> float:
+        """
+        Cadence of the propagated samples. SOPP samples at the analysis
+        resolution but no finer than 1 s; the native backend and sky tracks
+        always sample every second.
+        """
+        if self.sky_track or self.propagation_backend != "sopp":
+            return 1.0
+        return max(1.0, self.time_resolution_seconds)
+
+    def observing_band(self) -> tuple[float, float] | None:
+        """(frequency_hz, bandwidth_mhz) for catalogue band filtering, or None when disabled."""
+        return (self.frequency_hz, self.observing_bandwidth_mhz) if self.band_filter else None
+
+    def tle_groups(self) -> list[str]:
+        return tle_groups(self.data_type)
@@ -0,0 +1,21 @@
+from core.run_config import RunConfig
+from core.sopp_runner import SOPPRunner
+from core.native_propagator import NativePropagator
+from enums.propagation_backend import PropagationBackend
+from models.beam_model import BeamModel
+
+
+def create_runner(beam_model: BeamModel, run_config: RunConfig, tle_file: str, observer, satellites=None):
+    """
+    Return the propagation runner selected by run_config.propagation_backend.
+
+    Both runners expose run() returning a list of SOPP-style OverheadWindow
+    events for InterferenceChecker.
+
+    :param satellites: Optional SOPP satellites already parsed from tle_file,
+        reused by the SOPP backend instead of reloading the file.
+    """
+    backend = PropagationBackend(run_config.propagation_backend)
+    if backend == PropagationBackend.NATIVE:
+        return NativePropagator(beam_model, run_config, tle_file, observer)
+    return SOPPRunner(beam_model, run_config, tle_file, observer, satellites)
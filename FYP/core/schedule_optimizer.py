@@ -0,0 +1,190 @@
+import logging
+import math
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from core.time_bins import TimeBins
+from core.window_analyser import span_seconds
+
+log = logging.getLogger(__name__)
+
+
+@dataclass
+class ScheduledBlock:
+    target: str
+    start: datetime
+    end: datetime
+    clean_seconds: float
+
+
+@dataclass
+class Schedule:
+    blocks: list[ScheduledBlock] = field(default_factory=list)
+    clean_seconds: float = 0.0
+
+    def summary(self) -> str:
+        lines = [f"=== Schedule ({self.clean_seconds}s clean on-source) ==="]
+        if not self.blocks:
+            lines.append("  No target has a clean block long enough to schedule.")
+        for i, b in enumerate(self.blocks, 1):
+            lines.append(f"  {i}. {b.start.strftime('%H:%M:%S')} - {b.end.strftime('%H:%M:%S')}  "
+                         f"{b.target}  ({b.clean_seconds}s clean)")
+        return "\n".join(lines)
+
+
+def slew_matrix(ra_hours, dec_degrees, deg_per_second: float, settle_seconds: float = 0.0) -> np.ndarray:
+    """
+    Slew time in seconds between every pair of fixed RA/Dec targets: great-circle
+    separation at a constant slew rate, plus a settle time for any move.
+    """
+    ra = np.radians(np.asarray(ra_hours, dtype=float) * 15.0)
+    dec = np.radians(np.asarray(dec_degrees, dtype=float))
+    cos_sep = (np.sin(dec)[:, None] * np.sin(dec)[None, :]
+               + np.cos(dec)[:, None] * np.cos(dec)[None, :] * np.cos(ra[:, None] - ra[None, :]))
+    separation = np.degrees(np.arccos(np.clip(cos_sep, -1.0, 1.0)))
+    slew = separation / deg_per_second + settle_seconds
+    np.fill_diagonal(slew, 0.0)
+    return slew
+
+
+class ScheduleOptimizer:
+    """
+    Chooses which target to observe when over one window, maximising total
+    clean on-source time.
+
+    Dynamic programming over the shared time slots with all targets handled
+    as vectors at each slot. A schedule is a sequence of blocks, each at least
+    min_dwell long, with the slew time between consecutive targets spent
+    off-source. With per-target prefix sums of clean slots, a block on j from
+    s to t is worth C[t + 1, j] - C[s, j], so the best block ending at t is
+    C[t + 1, j] plus a running maximum of (best value available at s) - C[s, j]
+    over the starts at least min_dwell slots back. The result is optimal for
+    the slot grid in O(slots * targets^2) vector work.
+
+    :param clean_masks: Target name -> boolean clean mask over bins (True = usable).
+    :param bins: TimeBins all masks are on.
+    :param slew_seconds: Slew time between targets; a scalar for every pair or
+        a (targets, targets) matrix in clean_masks order (see slew_matrix).
+    :param min_dwell_seconds: Shortest block worth slewing to.
+    """
+    def __init__(self, clean_masks: dict[str, np.ndarray], bins: TimeBins,
+                 slew_seconds=0.0, min_dwell_seconds: float = 0.0):
+        if not clean_masks:
+            raise ValueError("At least one target is required")
+        self.targets = list(clean_masks)
+        self.bins = bins
+        self.clean = np.column_stack([np.asarray(clean_masks[t], dtype=bool) for t in self.targets])
+        if self.clean.shape[0] != bins.n_slots:
+            raise ValueError(f"Clean masks have {self.clean.shape[0]} slots, expected {bins.n_slots}")
+
+        n = len(self.targets)
+        slew = np.broadcast_to(np.asarray(slew_seconds, dtype=float), (n, n)).copy()
+        if (slew < 0).any() or min_dwell_seconds < 0:
+            raise ValueError("Slew and minimum dwell times must not be negative")
+        np.fill_diagonal(slew, 0.0)
+        self.slew_slots = np.ceil(slew / bins.resolution_seconds - 1e-9).astype(np.int64)
+        self.min_dwell_slots = max(1, math.ceil(min_dwell_seconds / bins.resolution_seconds - 1e-9))
+
+    @classmethod
+    def from_analysers(cls, analysers: dict, slew_seconds=0.0, min_dwell_seconds: float = 0.0,
+                       visible: dict[str, np.ndarray] | None = None) -> "ScheduleOptimizer":
+        """
+        Optimiser over one WindowAnalyser per target, all on the same window and resolution.
+
+        :param visible: Optional target name -> boolean mask of slots the target
+            is observable (e.g. above the horizon limit), ANDed with its clean mask.
+        """
+        bins = next(iter(analysers.values())).bins
+        if any(a.bins != bins for a in analysers.values()):
+            raise ValueError("All analysers must share the same window and resolution")
+        masks = {name: ~a.occupancy for name, a in analysers.items()}
+        for name, mask in (visible or {}).items():
+            masks[name] = masks[name] & np.asarray(mask, dtype=bool)
+        return cls(masks, bins, slew_seconds, min_dwell_seconds)
+
+    def optimise(self) -> Schedule:
+        n_slots, n = self.clean.shape
+        dwell, slew = self.min_dwell_slots, self.slew_slots
+        cols = np.arange(n)
+        prefix = np.zeros((n_slots + 1, n), dtype=np.int32)
+        np.cumsum(self.clean, axis=0, out=prefix[1:])
+
+        #best[t, i]: best schedule whose last block is on i and ends at or before t; best_end: where it ends
+        best = np.full((n_slots, n), -1, dtype=np.int32)
+        best_end = np.full((n_slots, n), -1, dtype=np.int32)
+        #start_value[s, j]: best value available to a block on j starting at s; start_pred: the previous target
+        start_value = np.zeros((n_slots, n), dtype=np.int32)
+        start_pred = np.full((n_slots, n), -1, dtype=np.int32)
+        #block_start[t, j]: start of the best block on j ending at t
+        block_start = np.full((n_slots, n), -1, dtype=np.int32)
+
+        running = np.full(n, -1, dtype=np.int32)
+        running_start = np.full(n, -1, dtype=np.int32)
+        for t in range(n_slots):
+            before = t - slew - 1
+            reachable = before >= 0
+            values = np.where(reachable, best[np.maximum(before, 0), cols[:, None]], -1)
+            pred = values.argmax(axis=0)
+            top = values[pred, cols]
+            start_value[t] = np.maximum(top, 0)
+            start_pred[t] = np.where(top > 0, pred, -1)
+
+            s = t - dwell + 1
+            if s >= 0:
+                key = start_value[s] - prefix[s]
+                better = key > running
+                running = np.where(better, key, running)
+                running_start = np.where(better, s, running_start)
+                ending = np.where(running_start >= 0, running + prefix[t + 1], -1)
+            else:
+                ending = np.full(n, -1, dtype=np.int32)
+            block_start[t] = running_start
+
+            if t:
+                improved = ending > best[t - 1]
+                best[t] = np.where(improved, ending, best[t - 1])
+                best_end[t] = np.where(improved, t, best_end[t - 1])
+            else:
+                best[t], best_end[t] = ending, np.where(ending >= 0, t, -1)
+
+        return self._backtrack(best, best_end, block_start, start_pred)
+
+    def _backtrack(self, best, best_end, block_start, start_pred) -> Schedule:
+        j = int(best[-1].argmax())
+        if best[-1, j] <= 0:
+            return Schedule()
+        spans = []
+        t = int(best_end[-1, j])
+        while j >= 0:
+            s = int(block_start[t, j])
+            spans.append((j, s, t))
+            i = int(start_pred[s, j])
+            if i >= 0:
+                t = int(best_end[s - self.slew_slots[i, j] - 1, i])
+            j = i
+        return self._schedule(reversed(spans))
+
+    def _schedule(self, spans) -> Schedule:
+        #join back-to-back blocks on the same target and drop blocks with no clean time
+        merged = []
+        for j, s, t in spans:
+            if merged and merged[-1][0] == j and merged[-1][2] == s - 1:
+                merged[-1][2] = t
+            else:
+                merged.append([j, s, t])
+
+        res = self.bins.resolution_seconds
+        blocks, total = [], 0
+        for j, s, t in merged:
+            clean = int(self.clean[s:t + 1, j].sum())
+            if clean:
+                total += clean
+                end = min(self.bins.slot_start(t + 1), self.bins.end)
+                blocks.append(ScheduledBlock(self.targets[j], self.bins.slot_start(s), end,
+                                             span_seconds(timedelta(seconds=clean * res))))
+        schedule = Schedule(blocks, span_seconds(timedelta(seconds=total * res)))
+        log.info(f"Scheduled {len(blocks)} blocks over {len(self.targets)} targets, "
+                 f"{schedule.clean_seconds}s clean on-source")
+        return schedule
@@ -0,0 +1,198 @@
+import dataclasses
+import logging
+import math
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+
+from core.run_config import RunConfig
+from core.window_analyser import WindowAnalyser
+
+log = logging.getLogger(__name__)
+
+DEFAULT_OVERLAP_SECONDS = 60
+
+
+@dataclass
+class Shard:
+    index: int
+    begin: datetime        # propagated span, including overlap
+    end: datetime
+    own_begin: datetime    # span whose results this shard reports
+    own_end: datetime
+    last: bool = False     # the final shard also owns own_end, which is the window end
+
+    def owns(self, t: datetime) -> bool:
+        return self.own_begin <= t < self.own_end or (self.last and t == self.own_end)
+
+
+@dataclass
+class ShardResult:
+    shard: Shard
+    results: list = field(default_factory=list)
+    seconds: float = 0.0
+
+
+def _utc(iso: str) -> datetime:
+    return datetime.fromisoformat(iso).replace(tzinfo=timezone.utc)
+
+
+def _iso(t: datetime) -> str:
+    return t.replace(tzinfo=None).isoformat()
+
+
+def plan_shards(time_begin: str, time_end: str, shard_seconds: int,
+                overlap_seconds: int = DEFAULT_OVERLAP_SECONDS) -> list[Shard]:
+    """
+    Split a window into consecutive owned spans of shard_seconds, each
+    propagated with overlap_seconds of padding on either side (clipped to the
+    window) so events crossing a boundary are seen whole by both neighbours.
+    """
+    begin, end = _utc(time_begin), _utc(time_end)
+    total = (end - begin).total_seconds()
+    count = max(1, math.ceil(total / shard_seconds))
+    pad = timedelta(seconds=overlap_seconds)
+    shards = []
+    for i in range(count):
+        own_begin = begin + timedelta(seconds=i * shard_seconds)
+        own_end = min(end, own_begin + timedelta(seconds=shard_seconds))
+        shards.append(Shard(i, max(begin, own_begin - pad), min(end, own_end + pad), own_begin, own_end, i == count - 1))
+    return shards
+
+
+def make_observer(run_config: RunConfig):
+    from core.observer import Observer
+    return Observer(
+        latitude=run_config.latitude,
+        longitude=run_config.longitude,
+        elevation_m=run_config.elevation_m,
+        time_begin=run_config.time_begin,
+        time_end=run_config.time_end,
+        ra_hours=run_config.ra_hours,
+        dec_degrees=run_config.dec_degrees,
+        azimuth_deg=run_config.azimuth_deg,
+        altitude_deg=run_config.altitude_deg,
+        resolution_seconds=run_config.time_resolution_seconds,
+    )
+
+
+def make_beam_model(run_config: RunConfig):
+    from models.beam_model import BeamModel
+    beam_model = BeamModel(
+        dish_diameter_m=run_config.dish_diameter_m,
+        frequency_hz=run_config.frequency_hz,
+        gain_cutoff_percent=run_config.gain_cutoff_percent,
+        bypass=run_config.bypass_airy,
+    )
+    if run_config.bypass_airy:
+        beam_model.prefilter_radius_deg = run_config.manual_beamwidth_deg / 2
+        beam_model.fwhm_deg = run_config.manual_beamwidth_deg / 2
+    return beam_model
+
+
+def _owned_span(shard: Shard, run_config: RunConfig) -> tuple[str, str]:
+    """ISO span a shard owns with an inclusive end, as WindowAnalyser expects; owned spans are half open but the last."""
+    resolution = timedelta(seconds=run_config.time_resolution_seconds)
+    last = shard.own_end if shard.last else shard.own_end - resolution
+    return _iso(shard.own_begin), _iso(last)
+
+
+def run_shard(run_config: RunConfig, tle_file: str, shard: Shard, observer_factory=make_observer) -> ShardResult:
+    """
+    Propagate and check one shard. Runs in a worker process, so
+    everything it needs is rebuilt from picklable arguments.
+    """
+    from core.checker import InterferenceChecker
+    from core.result_cache import cached_run
+    from core.runner_factory import create_runner
+
+    start = time.perf_counter()
+    #workers already use every core; SOPP's own pool would oversubscribe them
+    config = dataclasses.replace(
+        run_config, time_begin=_iso(shard.begin), time_end=_iso(shard.end), concurrency_level=1,
+    )
+    observer = observer_factory(config)
+    beam_model = make_beam_model(config)
+    events = cached_run(create_runner(beam_model, config, tle_file, observer))
+    results = [
+        row for row in InterferenceChecker(beam_model, observer).check(events)
+        if shard.owns(_utc(row["time_utc"]))
+    ]
+    return ShardResult(shard, results, time.perf_counter() - start)
+
+
+@dataclass
+class ShardedAnalysis:
+    results: list
+    analyser: WindowAnalyser
+    shards: list[ShardResult]
+
+
+class ShardedRunner:
+    """
+    Runs propagation and interference checking for long windows as
+    overlapping time shards on a process pool.
+
+    Each worker propagates its shard plus overlap and keeps only the flagged
+    points inside the span it owns. The orchestrator concatenates the owned
+    results, which therefore contain every flagged second exactly once, and
+    analyses the whole window from them in one vectorised pass.
+
+    :param run_config: RunConfig for the whole window.
+    :param tle_file: Path to the TLE catalogue.
+    :param shard_seconds: Owned span per shard.
+    :param overlap_seconds: Padding propagated on either side of each shard.
+    :param max_workers: Worker processes; defaults to run_config.concurrency_level.
+    :param observer_factory: Picklable callable building the Observer for a shard's RunConfig.
+    """
+    def __init__(self, run_config: RunConfig, tle_file: str, shard_seconds: int,
+                 overlap_seconds: int = DEFAULT_OVERLAP_SECONDS, max_workers: int | None = None,
+                 observer_factory=make_observer):
+        if shard_seconds <= 0:
+            raise ValueError(f"shard_seconds must be greater than 0, provided: {shard_seconds}")
+        self.run_config = run_config
+        self.tle_file = tle_file
+        self.shards = plan_shards(run_config.time_begin, run_config.time_end, shard_seconds, overlap_seconds)
+        self.max_workers = max_workers or run_config.concurrency_level or 1
+        self.observer_factory = observer_factory
+
+    def run(self, on_chunk=None) -> ShardedAnalysis:
+        """
+        :param on_chunk: Optional callback(results, covered, done, total) called
+            in this process as each shard completes, in completion order;
+            covered is the ISO (begin, end) span the shard owns.
+        """
+        start = time.perf_counter()
+        total = len(self.shards)
+
+        def completed(result: ShardResult, done: int):
+            if on_chunk is not None:
+                on_chunk(result.results, _owned_span(result.shard, self.run_config), done, total)
+
+        workers = min(self.max_workers, len(self.shards))
+        log.info(f"Running {len(self.shards)} shards on {workers} worker processes...")
+        if workers == 1:
+            shard_results = []
+            for s in self.shards:
+                shard_results.append(run_shard(self.run_config, self.tle_file, s, self.observer_factory))
+                completed(shard_results[-1], len(shard_results))
+        else:
+            #spawn rather than fork: the GUI process holds Qt and logging threads
+            context = multiprocessing.get_context("spawn")
+            with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+                futures = [
+                    pool.submit(run_shard, self.run_config, self.tle_file, s, self.observer_factory)
+                    for s in self.shards
+                ]
+                for done, future in enumerate(as_completed(futures), 1):
+                    completed(future.result(), done)
+                shard_results = [f.result() for f in futures]
+
+        results = [row for r in shard_results for row in r.results]
+        analyser = WindowAnalyser.for_run(results, self.run_config)
+        busy = sum(r.seconds for r in shard_results)
+        log.info(f"Sharded run finished in {time.perf_counter() - start:.1f}s "
+                 f"({busy:.1f}s of shard work, {len(results)} flagged points)")
+        return ShardedAnalysis(results, analyser, shard_results)
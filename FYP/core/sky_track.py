@@ -0,0 +1,217 @@
+import hashlib
+import json
+import logging
+import math
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import numpy as np
+from sgp4.api import Satrec, SatrecArray
+
+from core.native_propagator import MAX_BLOCK_SAMPLES, site_enu_frame, teme_to_enu, time_grid
+from core.observer import Observer
+from core.run_config import RunConfig
+from core.time_bins import track_index
+from core.tle_catalogue import read_tle_file
+from models.beam_model import BeamModel
+
+log = logging.getLogger(__name__)
+
+#most recent track kept in memory so consecutive runs skip even the disk cache
+_last: tuple[str, "SkyTrack"] | None = None
+
+
+@dataclass
+class SkyTrack:
+    """
+    Topocentric positions of every satellite in a catalogue for one site and
+    window, independent of where the dish is pointed.
+
+    Only above-horizon samples are kept, as flat arrays indexed by sample:
+    satellite index, second offset from begin, altitude, azimuth and range.
+    Checking a pointing against the track is then a vectorised separation
+    and gain test with no propagation.
+    """
+    begin: datetime
+    n_steps: int
+    names: list[str]
+    sat_idx: np.ndarray     # int32
+    offsets: np.ndarray     # int32
+    alt_deg: np.ndarray
+    az_deg: np.ndarray
+    range_km: np.ndarray    # float32
+
+    @classmethod
+    def build(cls, run_config: RunConfig, tle_file: str, min_altitude_deg: float = 0.0) -> "SkyTrack":
+        """
+        Propagate the whole catalogue over the window at 1-second cadence and
+        keep every sample at or above min_altitude_deg.
+        """
+        start = time.perf_counter()
+        begin = datetime.fromisoformat(run_config.time_begin).replace(tzinfo=timezone.utc)
+        end = datetime.fromisoformat(run_config.time_end).replace(tzinfo=timezone.utc)
+        n_steps = math.ceil((end - begin).total_seconds())
+        entries = read_tle_file(tle_file)
+        if not entries:
+            raise ValueError("Satellites list empty.")
+        site, rotation = site_enu_frame(run_config.latitude, run_config.longitude, run_config.elevation_m)
+        offsets = np.arange(n_steps)
+        jd, fr, theta = time_grid(begin, offsets)
+        sat_array = SatrecArray([Satrec.twoline2rv(l1, l2) for _, l1, l2 in entries])
+
+        parts = []
+        chunk = max(1, MAX_BLOCK_SAMPLES // len(entries))
+        for first in range(0, n_steps, chunk):
+            block = offsets[first:first + chunk]
+            err, r, _ = sat_array.sgp4(jd[block], fr[block])
+            r = np.where((err == 0)[..., None], r, np.nan)
+            enu = teme_to_enu(r, theta[block], site, rotation)
+            rng = np.linalg.norm(enu, axis=-1)
+            with np.errstate(invalid='ignore'):
+                alt = np.degrees(np.arcsin(enu[..., 2] / rng))
+                s_idx, t_idx = np.nonzero(alt >= min_altitude_deg)
+            az = np.degrees(np.arctan2(enu[s_idx, t_idx, 0], enu[s_idx, t_idx, 1])) % 360.0
+            parts.append((s_idx, block[t_idx], alt[s_idx, t_idx], az, rng[s_idx, t_idx]))
+
+        s_idx, t_idx, alt, az, rng = (np.concatenate(p) for p in zip(*parts))
+        order = np.lexsort((t_idx, s_idx))
+        track = cls(
+            begin=begin, n_steps=n_steps, names=[name for name, _, _ in entries],
+            sat_idx=s_idx[order].astype(np.int32), offsets=t_idx[order].astype(np.int32),
+            alt_deg=alt[order], az_deg=az[order], range_km=rng[order].astype(np.float32),
+        )
+        log.info(f"Sky track: {len(entries)} satellites, {len(track)} above-horizon samples "
+                 f"({track.nbytes / 1e6:.1f} MB) built in {time.perf_counter() - start:.1f}s")
+        return track
+
+    @classmethod
+    def from_ephemeris(cls, run_config: RunConfig, tle_file: str, min_altitude_deg: float = 0.0) -> "SkyTrack":
+        """
+        Build the track from the site's memory-mapped ephemeris stores (see
+        core.ephemeris_store) instead of propagating. The stores hold unit
+        vectors only, so range_km is NaN.
+        """
+        from core.ephemeris_store import ephemeris_views
+
+        begin = datetime.fromisoformat(run_config.time_begin).replace(tzinfo=timezone.utc)
+        end = datetime.fromisoformat(run_config.time_end).replace(tzinfo=timezone.utc)
+        n_steps = math.ceil((end - begin).total_seconds())
+        views = ephemeris_views(
+            tle_file, run_config.latitude, run_config.longitude, run_config.elevation_m,
+            begin, begin + timedelta(seconds=n_steps),
+        )
+        parts = []
+        base = 0
+        for store, view in views:
+            chunk = max(1, MAX_BLOCK_SAMPLES // len(store))
+            for first in range(0, view.shape[1], chunk):
+                enu = view[:, first:first + chunk]
+                with np.errstate(invalid='ignore'):
+                    alt = np.degrees(np.arcsin(np.clip(enu[..., 2], -1.0, 1.0)))
+                    s_idx, t_idx = np.nonzero(alt >= min_altitude_deg)
+                az = np.degrees(np.arctan2(enu[s_idx, t_idx, 0], enu[s_idx, t_idx, 1])) % 360.0
+                parts.append((s_idx, base + first + t_idx, alt[s_idx, t_idx].astype(float), az.astype(float)))
+            base += view.shape[1]
+
+        s_idx, t_idx, alt, az = (np.concatenate(p) for p in zip(*parts))
+        order = np.lexsort((t_idx, s_idx))
+        return cls(
+            begin=begin, n_steps=n_steps, names=views[0][0].names,
+            sat_idx=s_idx[order].astype(np.int32), offsets=t_idx[order].astype(np.int32),
+            alt_deg=alt[order], az_deg=az[order], range_km=np.full(len(order), np.nan, dtype=np.float32),
+        )
+
+    def __len__(self) -> int:
+        return len(self.offsets)
+
+    @property
+    def nbytes(self) -> int:
+        return sum(a.nbytes for a in (self.sat_idx, self.offsets, self.alt_deg, self.az_deg, self.range_km))
+
+    def check(self, beam_model: BeamModel, observer) -> list[dict]:
+        """
+        Flag every sample whose gain in the beam of observer's pointing is
+        above the cutoff, returning rows in InterferenceChecker's format.
+
+        :param beam_model: BeamModel supplying prefilter radius and gain.
+        :param observer: Observer (or anything with target_alts/target_azs
+            arrays sampled from the window start at its resolution_seconds, default 1 s).
+        """
+        idx = track_index(observer, self.offsets)
+        target_alt = np.asarray(observer.target_alts)[idx]
+        target_az = np.asarray(observer.target_azs)[idx]
+        sep = Observer.angular_separation(self.alt_deg, self.az_deg, target_alt, target_az)
+        near = np.flatnonzero(sep <= beam_model.prefilter_radius_deg)
+        gains = beam_model.interference_gains(sep[near])
+        hit = near[~np.isnan(gains)]
+        gains = gains[~np.isnan(gains)]
+        return [
+            {
+                "time_utc":        (self.begin + timedelta(seconds=int(self.offsets[i]))).isoformat(),
+                "satellite":       self.names[self.sat_idx[i]],
+                "sat_alt_deg":     float(self.alt_deg[i]),
+                "sat_az_deg":      float(self.az_deg[i]),
+                "target_alt_deg":  float(target_alt[i]),
+                "target_az_deg":   float(target_az[i]),
+                "angular_sep_deg": float(sep[i]),
+                "gain_percent":    float(gain),
+            }
+            for i, gain in zip(hit, gains)
+        ]
+
+    def check_pointings(self, beam_model: BeamModel, observers: dict) -> dict[str, list[dict]]:
+        """check() for several named pointings against the same track."""
+        return {name: self.check(beam_model, observer) for name, observer in observers.items()}
+
+
+def sky_track_key(run_config: RunConfig, tle_file: str, min_altitude_deg: float = 0.0) -> str:
+    """Content hash of everything a sky track depends on: TLEs, site, window and source."""
+    description = {
+        "kind": "sky_track",
+        "ephemeris_store": run_config.ephemeris_store,
+        "site": [run_config.latitude, run_config.longitude, run_config.elevation_m],
+        "window": [run_config.time_begin, run_config.time_end],
+        "min_altitude_deg": min_altitude_deg,
+    }
+    digest = hashlib.sha256(Path(tle_file).read_bytes())
+    digest.update(json.dumps(description, sort_keys=True).encode())
+    return digest.hexdigest()
+
+
+def sky_track_for(run_config: RunConfig, tle_file: str, cache=None) -> SkyTrack:
+    """
+    Sky track for a run, reused from memory or the result cache when the
+    TLEs, site and window match and built (then stored) otherwise.
+    """
+    global _last
+    from core.result_cache import ResultCache
+
+    key = sky_track_key(run_config, tle_file)
+    if _last is not None and _last[0] == key:
+        log.info("Sky track reused from memory")
+        return _last[1]
+    track = None
+    if run_config.result_cache:
+        cache = cache or ResultCache(max_mb=run_config.result_cache_mb)
+        track = cache.get(key)
+        if track is not None:
+            log.info(f"Sky track cache hit ({key[:12]})")
+    if track is None:
+        if run_config.ephemeris_store:
+            try:
+                track = SkyTrack.from_ephemeris(run_config, tle_file)
+            except RuntimeError as e:
+                log.warning(f"{e}; propagating the sky track directly")
+        if track is None:
+            track = SkyTrack.build(run_config, tle_file)
+        #a track over half the cache (about 28 bytes per sample, ~1 GB for 12 h of the active
+        #catalogue) would evict every other entry and then itself, so it is only kept in memory
+        if run_config.result_cache and track.nbytes <= cache.max_bytes // 2:
+            cache.put(key, track)
+        elif run_config.result_cache:
+            log.info(f"Sky track of {track.nbytes / 1e6:.0f} MB is too large for the "
+                     f"{cache.max_bytes / 2**20:.0f} MB result cache; keeping it in memory only")
+    _last = (key, track)
+    return track
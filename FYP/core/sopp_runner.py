@@ -1,10 +1,11 @@
+from datetime import timedelta
 from sopp.builder.configuration_builder import ConfigurationBuilder
 from sopp.sopp import Sopp
 from core.run_config import RunConfig
 from models.beam_model import BeamModel
 import logging
-import os
 from enums.tle_group import TLEGroup
+from core.geometry_prefilter import GeometryPrefilter
 
 log = logging.getLogger(__name__)
 from core.paths import get_base_dir
@@ -15,37 +16,35 @@ class SOPPRunner:
     """
     Builds SOPP configuration and runs the interference engine.
     Uses BeamModel prefilter radius as the beamwidth passed to SOPP.
+    When run_config.geometry_prefilter is set, only satellites surviving the
+    GeometryPrefilter screen are handed to SOPP.
     """
-    def __init__(self, beam_model: BeamModel, run_config: RunConfig, tle_file: str):
+    def __init__(self, beam_model: BeamModel, run_config: RunConfig, tle_file: str, observer=None, satellites=None):
         self.beam_model = beam_model
         self.run_config = run_config
         self.tle_file = tle_file #passed in from TLELoaderThread on gui boot or initialisation on main for cli
-        self.config = self._build_config()
+        self.observer = observer #optional, supplies the target track to the geometry prefilter
+        self.satellites = satellites #optional, SOPP satellites already parsed from tle_file (see core.propagation_service)
+        self._config = None
+
+    @property
+    def config(self):
+        #built on first use, so a result-cache hit skips SOPP setup and the geometry prefilter
+        if self._config is None:
+            self._config = self._build_config()
+        return self._config
 
     @staticmethod
-    def select_data(group: TLEGroup | str) -> str:
-        from skyfield.api import Loader
-        load = Loader('.', verbose=False)
-        max_days = 7.0
-        data_dir.mkdir(exist_ok=True)
-        filename = str(data_dir / f"{group}.tle")
-        url = f"https://celestrak.org/NORAD/elements/gp.php?GROUP={group}&FORMAT=tle"
-        if not os.path.exists(filename) or load.days_old(filename) >= max_days:
-            log.info(f"Downloading TLEs for {group}...")
-            try:
-                load.download(url, filename=filename)
-                log.info("TLE catalogue updated.")
-            except Exception as e:
-                if os.path.exists(filename):
-                    log.warning(f"TLE download failed ({e}) — using cached file.")
-                else:
-                    raise RuntimeError(
-                        f"TLE download failed and no cached file exists for '{group}'.\n"
-                        f"Please check your internet connection or manually place a TLE file at:\n{filename}"
-                    ) from e
-        else:
-            log.info("TLE catalogue up to date.")
-        return filename
+    def select_data(group: TLEGroup | str, source: str | None = None) -> str:
+        """
+        Path to the cached catalogue for a group. Returns immediately when a
+        cache exists (refreshing it in the background if stale); only blocks
+        on the network when there is no cache. See core.tle_refresh.
+
+        :param source: CelesTrak by default, or a URL template / mirror directory.
+        """
+        from core.tle_refresh import TLERefreshManager
+        return TLERefreshManager(source=source, data_dir=data_dir).ensure([group])[0]
 
     def _build_config(self):
         rc = self.run_config
@@ -64,11 +63,21 @@ class SOPPRunner:
                 name="observer",
                 beamwidth=beamwidth
             )
-            .set_runtime_settings(concurrency_level=rc.concurrency_level)
+            .set_runtime_settings(
+                time_continuity_resolution=timedelta(seconds=rc.sample_seconds()),
+                concurrency_level=rc.concurrency_level,
+            )
             .set_time_window(begin=rc.time_begin, end=rc.time_end)
-            .set_frequency_range(bandwidth=10, frequency=frequency_mhz)
-            .set_satellites(tle_file=self.tle_file)
+            .set_frequency_range(bandwidth=rc.observing_bandwidth_mhz, frequency=frequency_mhz)
         )
+        if self.satellites is not None:
+            builder.satellites = list(self.satellites)
+        else:
+            builder = builder.set_satellites(tle_file=self.tle_file)
+
+        if rc.geometry_prefilter:
+            survivors = GeometryPrefilter(rc, self.tle_file, beamwidth, self.observer).run().satellite_numbers
+            builder = builder.add_filter(lambda sat: sat.tle_information.satellite_number in survivors)
 
         if rc.is_static():
             builder = builder.set_observation_target(
@@ -0,0 +1,102 @@
+import math
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+
+DEFAULT_RESOLUTION_SECONDS = 1.0
+
+
+def _utc(iso: str) -> datetime:
+    return datetime.fromisoformat(iso).replace(tzinfo=timezone.utc)
+
+
+def _naive_iso(iso: str) -> str:
+    """ISO UTC time without its +00:00 / Z suffix, as numpy datetime64 expects."""
+    return iso[:-6] if iso.endswith("+00:00") else iso.rstrip("Z")
+
+
+@dataclass(frozen=True)
+class TimeBins:
+    """
+    Integer time slots of resolution_seconds from begin to end inclusive,
+    shared by the Observer grid, WindowAnalyser and SkyPlot.
+
+    A time belongs to the slot it falls in (floor), so samples that drift by
+    microseconds or arrive several times per slot land on the same slot.
+
+    :param begin: UTC window start (start of slot 0).
+    :param end: UTC window end, which falls in the last slot.
+    :param resolution_seconds: Slot length, e.g. 0.1, 1 or 10.
+    """
+    begin: datetime
+    end: datetime
+    resolution_seconds: float = DEFAULT_RESOLUTION_SECONDS
+
+    def __post_init__(self):
+        if self.resolution_seconds <= 0:
+            raise ValueError(f"resolution_seconds must be greater than 0, provided: {self.resolution_seconds}")
+
+    @classmethod
+    def for_window(cls, time_begin: str, time_end: str,
+                   resolution_seconds: float = DEFAULT_RESOLUTION_SECONDS) -> "TimeBins":
+        return cls(_utc(time_begin), _utc(time_end), resolution_seconds)
+
+    @property
+    def _resolution_us(self) -> int:
+        return round(self.resolution_seconds * 1e6)
+
+    @property
+    def n_slots(self) -> int:
+        return self.slot_of(self.end) + 1
+
+    @property
+    def n_steps(self) -> int:
+        """Grid samples from begin up to (excluding) end, one per slot start."""
+        return math.ceil((self.end - self.begin) / timedelta(microseconds=self._resolution_us))
+
+    def slot_of(self, t: datetime) -> int:
+        return (t - self.begin) // timedelta(microseconds=self._resolution_us)
+
+    def slot_start(self, slot: int) -> datetime:
+        return self.begin + timedelta(microseconds=int(slot) * self._resolution_us)
+
+    def slots_from_iso(self, iso_times) -> np.ndarray:
+        """Slot of each ISO UTC timestamp (may fall outside 0..n_slots-1)."""
+        times = np.array([_naive_iso(t) for t in iso_times], dtype="datetime64[us]")
+        begin = np.datetime64(self.begin.replace(tzinfo=None), "us")
+        return np.floor_divide((times - begin).astype(np.int64), self._resolution_us)
+
+    def slots_from_epochs(self, epochs) -> np.ndarray:
+        """Slot of each unix timestamp in seconds, rounded to the microsecond like slots_from_iso."""
+        offsets_us = np.rint((np.asarray(epochs, dtype=float) - self.begin.timestamp()) * 1e6).astype(np.int64)
+        return np.floor_divide(offsets_us, self._resolution_us)
+
+
+def strongest_per_slot(results: list[dict], bins: TimeBins) -> list[dict]:
+    """
+    One row per satellite per slot, keeping the highest-gain sample, in the
+    original order. Samples repeated within a slot add nothing at the
+    analysis resolution, so this is what results and CSV exports keep.
+    """
+    if not results:
+        return results
+    slots = bins.slots_from_iso([r["time_utc"] for r in results])
+    names: dict[str, int] = {}
+    sat_ids = np.fromiter((names.setdefault(r.get("satellite", ""), len(names)) for r in results),
+                          dtype=np.int64, count=len(results))
+    gains = np.fromiter((r.get("gain_percent", np.nan) for r in results), dtype=float, count=len(results))
+    order = np.lexsort((-np.nan_to_num(gains, nan=-np.inf), sat_ids, slots))
+    first = np.ones(len(order), dtype=bool)
+    first[1:] = (np.diff(slots[order]) != 0) | (np.diff(sat_ids[order]) != 0)
+    return [results[i] for i in np.sort(order[first])]
+
+
+def track_index(observer, seconds) -> np.ndarray:
+    """
+    Index into an Observer's target track for second offsets from the window
+    start. Observers without a resolution (test stand-ins) are on the 1-second grid.
+    """
+    resolution = getattr(observer, "resolution_seconds", DEFAULT_RESOLUTION_SECONDS)
+    idx = np.floor(np.asarray(seconds, dtype=float) / resolution + 1e-9).astype(int)
+    return np.clip(idx, 0, len(observer.target_alts) - 1)
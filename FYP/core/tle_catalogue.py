@@ -0,0 +1,391 @@
+import hashlib
+import logging
+import os
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Callable
+
+import numpy as np
+from sgp4.api import Satrec, SatrecArray, jday
+
+from core.paths import get_data_dir
+
+log = logging.getLogger(__name__)
+
+#alpha-5 NORAD numbers replace the leading digit with a letter (I and O unused)
+ALPHA5_LETTERS = "ABCDEFGHJKLMNPQRSTUVWXYZ"
+
+#element sets further than this from the observation window are treated as stale
+MAX_ELEMENT_AGE_DAYS = 14.0
+#selected catalogues (and quarantine files) kept on disk, least recently used removed first
+MAX_CATALOGUE_FILES = 16
+#files used more recently than this are never removed, as another run or process may still be reading them
+CATALOGUE_GRACE_SECONDS = 3600
+
+#callbacks notified with (tle_file, CatalogueChangeSet) whenever a catalogue file is replaced
+_change_listeners: list[Callable[[str, "CatalogueChangeSet"], None]] = []
+
+
+def read_tle_file(tle_file: str) -> list[tuple[str, str, str]]:
+    """
+    Read a 3-line TLE file into (name, line1, line2) tuples.
+
+    Lines that do not form a valid name/line1/line2 triple are skipped, so
+    stray blank lines or truncated entries do not shift the rest of the file.
+
+    :param tle_file: Path to the TLE file.
+    :returns: List of (name, line1, line2) tuples in file order.
+    """
+    with open(tle_file, encoding="utf-8", errors="replace") as f:
+        raw = [line.rstrip() for line in f]
+    entries = []
+    i = 0
+    while i <= len(raw) - 3:
+        name, l1, l2 = raw[i].strip(), raw[i + 1].strip(), raw[i + 2].strip()
+        if l1.startswith("1 ") and l2.startswith("2 "):
+            entries.append((name, l1, l2))
+            i += 3
+        else:
+            i += 1
+    return entries
+
+
+def parse_norad_id(line1: str) -> int:
+    """NORAD catalogue number from TLE line 1, including alpha-5 numbers."""
+    field = line1[2:7].strip()
+    if field[:1].isalpha():
+        return (ALPHA5_LETTERS.index(field[0].upper()) + 10) * 10000 + int(field[1:])
+    return int(field)
+
+
+def parse_epoch(line1: str) -> datetime:
+    """Element set epoch from TLE line 1 as a UTC datetime."""
+    epoch = line1[18:32].strip()
+    year = int(epoch[:2])
+    year += 2000 if year < 57 else 1900
+    return datetime(year, 1, 1, tzinfo=timezone.utc) + timedelta(days=float(epoch[2:]) - 1)
+
+
+@dataclass(frozen=True)
+class TLERecord:
+    name: str
+    line1: str
+    line2: str
+    norad_id: int
+    epoch: datetime
+    group: str = ""
+
+    @classmethod
+    def from_lines(cls, name: str, line1: str, line2: str, group: str = "") -> "TLERecord":
+        return cls(name, line1, line2, parse_norad_id(line1), parse_epoch(line1), group)
+
+
+class TLECatalogue:
+    """
+    In-memory TLE store indexed by NORAD catalogue number.
+
+    Any number of TLE files (one per TLEGroup, or a gp_history dump) can be
+    added; every element set is kept until select() picks, per satellite, the
+    one whose epoch is closest to the observation window. Overlapping groups
+    and repeated epochs therefore collapse to one entry per satellite, which
+    avoids propagating the same object twice and the spurious jumps between
+    epochs that duplicate entries produce.
+    """
+    def __init__(self):
+        self._records: dict[int, list[TLERecord]] = {}
+        self.files: list[str] = []
+        self.loaded = 0
+        self.skipped = 0
+
+    @classmethod
+    def from_files(cls, tle_files: list[str]) -> "TLECatalogue":
+        catalogue = cls()
+        for tle_file in tle_files:
+            catalogue.add_file(tle_file)
+        return catalogue
+
+    def add_file(self, tle_file: str, group: str | None = None) -> int:
+        """
+        Add every element set in a TLE file.
+
+        :param tle_file: Path to a 3-line TLE file.
+        :param group: Group label stored on the records; defaults to the file stem.
+        :returns: Number of element sets added.
+        """
+        group = group if group is not None else Path(tle_file).stem
+        added = 0
+        for name, l1, l2 in read_tle_file(tle_file):
+            try:
+                record = TLERecord.from_lines(name, l1, l2, group)
+            except ValueError:
+                self.skipped += 1
+                continue
+            self._records.setdefault(record.norad_id, []).append(record)
+            added += 1
+        self.files.append(str(tle_file))
+        self.loaded += added
+        return added
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def __contains__(self, norad_id: int) -> bool:
+        return norad_id in self._records
+
+    @property
+    def duplicates(self) -> int:
+        """Element sets that select() drops."""
+        return self.loaded - len(self._records)
+
+    def norad_ids(self) -> list[int]:
+        return sorted(self._records)
+
+    def element_sets(self, norad_id: int) -> list[TLERecord]:
+        """Every loaded element set for one satellite, oldest epoch first."""
+        return sorted(self._records[norad_id], key=lambda record: record.epoch)
+
+    def get(self, norad_id: int, target: datetime) -> TLERecord:
+        """Element set for one satellite whose epoch is closest to target."""
+        return min(self._records[norad_id], key=lambda record: abs(record.epoch - target))
+
+    def select(self, target: datetime) -> list[TLERecord]:
+        """One element set per satellite, epoch closest to target, ordered by NORAD number."""
+        return [self.get(norad_id, target) for norad_id in self.norad_ids()]
+
+    def write(self, path: Path, target: datetime) -> Path:
+        """Write the selected element sets as a 3-line TLE file."""
+        return write_records(path, self.select(target))
+
+    def prune(self, time_begin: datetime, time_end: datetime,
+              max_age_days: float = MAX_ELEMENT_AGE_DAYS) -> "PruneResult":
+        """
+        Split the selected element sets into those worth propagating and
+        those that are stale or decayed for this window.
+
+        An element set is stale when its epoch is more than max_age_days from
+        either end of the window, and decayed when SGP4 reports an error (e.g.
+        the orbit has decayed) at the start, centre or end of the window.
+        """
+        records = self.select(time_begin + (time_end - time_begin) / 2)
+        result = PruneResult(max_age_days=max_age_days)
+        if not records:
+            return result
+        limit = timedelta(days=max_age_days)
+        times = [time_begin, time_begin + (time_end - time_begin) / 2, time_end]
+        jd, fr = np.array([
+            jday(t.year, t.month, t.day, t.hour, t.minute, t.second + t.microsecond * 1e-6) for t in times
+        ]).T
+        satrecs = SatrecArray([Satrec.twoline2rv(r.line1, r.line2) for r in records])
+        err, _, _ = satrecs.sgp4(np.ascontiguousarray(jd), np.ascontiguousarray(fr))
+        failed = (err != 0).any(axis=1)
+        for record, decayed in zip(records, failed):
+            if decayed:
+                result.decayed.append(record)
+            elif max(abs(time_begin - record.epoch), abs(time_end - record.epoch)) > limit:
+                result.stale.append(record)
+            else:
+                result.kept.append(record)
+        return result
+
+    def summary(self) -> str:
+        return (
+            f"TLE catalogue: {self.loaded} element sets from {len(self.files)} file(s), "
+            f"{len(self)} unique satellites ({self.duplicates} duplicates dropped)"
+        )
+
+
+@dataclass
+class PruneResult:
+    """Outcome of TLECatalogue.prune(): element sets kept, and those left out by reason."""
+    max_age_days: float = MAX_ELEMENT_AGE_DAYS
+    kept: list[TLERecord] = field(default_factory=list)
+    stale: list[TLERecord] = field(default_factory=list)
+    decayed: list[TLERecord] = field(default_factory=list)
+
+    @property
+    def pruned(self) -> list[TLERecord]:
+        return self.stale + self.decayed
+
+    def summary(self) -> str:
+        return (
+            f"Element pruning: kept {len(self.kept)}, left out {len(self.stale)} stale "
+            f"(epoch more than {self.max_age_days:g} days from the window) and {len(self.decayed)} decayed"
+        )
+
+
+@dataclass
+class CatalogueChangeSet:
+    """NORAD numbers that differ between two versions of a catalogue."""
+    added: set[int] = field(default_factory=set)
+    removed: set[int] = field(default_factory=set)
+    updated: set[int] = field(default_factory=set)   # present in both with a different epoch
+
+    @classmethod
+    def between(cls, old: dict[int, float], new: dict[int, float]) -> "CatalogueChangeSet":
+        """Diff two fingerprints (see fingerprint())."""
+        both = old.keys() & new.keys()
+        return cls(
+            added=set(new.keys() - old.keys()),
+            removed=set(old.keys() - new.keys()),
+            updated={norad_id for norad_id in both if old[norad_id] != new[norad_id]},
+        )
+
+    @property
+    def affected(self) -> set[int]:
+        return self.added | self.removed | self.updated
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.removed or self.updated)
+
+    def summary(self) -> str:
+        return f"{len(self.added)} added, {len(self.removed)} removed, {len(self.updated)} updated"
+
+
+def fingerprint(entries: list[tuple[str, str, str]]) -> dict[int, float]:
+    """
+    NORAD number -> epoch (unix seconds) for a list of TLE entries. Where a
+    number repeats, the latest epoch wins.
+    """
+    out = {}
+    for _, l1, _ in entries:
+        try:
+            norad_id, epoch = parse_norad_id(l1), parse_epoch(l1).timestamp()
+        except ValueError:
+            continue
+        out[norad_id] = max(epoch, out.get(norad_id, epoch))
+    return out
+
+
+def diff_files(old_file: str, new_file: str) -> CatalogueChangeSet:
+    return CatalogueChangeSet.between(fingerprint(read_tle_file(old_file)), fingerprint(read_tle_file(new_file)))
+
+
+def subscribe_changes(listener: Callable[[str, CatalogueChangeSet], None]):
+    """Register a callback for catalogue replacements, e.g. to invalidate derived caches."""
+    _change_listeners.append(listener)
+
+
+def publish_changes(tle_file: str, changes: CatalogueChangeSet):
+    log.info(f"Catalogue {Path(tle_file).name} changed: {changes.summary()}")
+    for listener in list(_change_listeners):
+        try:
+            listener(str(tle_file), changes)
+        except Exception as e:
+            log.warning(f"Catalogue change listener failed: {e}")
+
+
+def write_records(path: Path, records: list[TLERecord]) -> Path:
+    """Write element sets as a 3-line TLE file, replacing path atomically."""
+    path = Path(path)
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        for record in records:
+            f.write(f"{record.name}\n{record.line1}\n{record.line2}\n")
+    tmp.replace(path)
+    return path
+
+
+def catalogue_dir() -> Path:
+    path = get_data_dir() / "catalogue"
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def records_digest(records: list[TLERecord]) -> str:
+    """Short content hash of a set of element sets, independent of their order."""
+    digest = hashlib.sha1()
+    for line in sorted(f"{r.name}\n{r.line1}\n{r.line2}\n" for r in records):
+        digest.update(line.encode())
+    return digest.hexdigest()[:12]
+
+
+def _store_records(directory: Path, stem: str, records: list[TLERecord]) -> Path:
+    """
+    Records written to directory as <stem>_<content digest>.tle, reusing an
+    identical file, then the least recently used files beyond
+    MAX_CATALOGUE_FILES removed, except those used within
+    CATALOGUE_GRACE_SECONDS.
+    """
+    path = directory / f"{stem}_{records_digest(records)}.tle"
+    if not path.exists():
+        write_records(path, records)
+    #explicit timestamp: writes in quick succession can share a coarse file system mtime
+    now = time.time_ns()
+    os.utime(path, ns=(now, now))
+    files = sorted(directory.glob("*.tle"), key=lambda p: p.stat().st_mtime_ns, reverse=True)
+    cutoff = now - CATALOGUE_GRACE_SECONDS * 1_000_000_000
+    for old in files[MAX_CATALOGUE_FILES:]:
+        if old != path and old.stat().st_mtime_ns < cutoff:
+            old.unlink(missing_ok=True)
+    return path
+
+
+def window_centre(time_begin: str, time_end: str) -> datetime:
+    begin = datetime.fromisoformat(time_begin).replace(tzinfo=timezone.utc)
+    end = datetime.fromisoformat(time_end).replace(tzinfo=timezone.utc)
+    return begin + (end - begin) / 2
+
+
+def catalogue_for_run(tle_files: list[str], time_begin: str, time_end: str,
+                      stale_policy: str = "keep", max_age_days: float = MAX_ELEMENT_AGE_DAYS,
+                      band: tuple[float, float] | None = None) -> str:
+    """
+    Merge, deduplicate, prune and band-filter TLE files for one observation window.
+
+    Returns the original path when a single file has no duplicates and
+    nothing is removed; otherwise writes the selected element sets to
+    data/catalogue, named by the first input file and a hash of the selected
+    element sets, so any run (or window) selecting the same element sets
+    reuses the same file. Under the quarantine policy the pruned element sets
+    are written to data/catalogue/quarantine as well. Each directory keeps
+    the MAX_CATALOGUE_FILES most recently used files, plus any used within
+    the last CATALOGUE_GRACE_SECONDS.
+
+    :param tle_files: TLE files to merge.
+    :param time_begin: ISO UTC window start.
+    :param time_end: ISO UTC window end.
+    :param stale_policy: StalePolicy value for stale or decayed element sets.
+    :raises RuntimeError: If pruning leaves no element sets to propagate.
+    :param max_age_days: Largest epoch distance from the window that is not stale.
+    :param band: Optional (frequency_hz, bandwidth_mhz) observing band; satellites
+        whose known downlinks (see core.transmitter_db) miss it are left out.
+    :returns: Path of the TLE file to hand to the propagation stage.
+    """
+    from enums.stale_policy import StalePolicy
+
+    policy = StalePolicy(stale_policy)
+    catalogue = TLECatalogue.from_files(tle_files)
+    log.info(catalogue.summary())
+    target = window_centre(time_begin, time_end)
+    records = catalogue.select(target)
+    pruning = None
+    if policy != StalePolicy.KEEP:
+        begin = datetime.fromisoformat(time_begin).replace(tzinfo=timezone.utc)
+        end = datetime.fromisoformat(time_end).replace(tzinfo=timezone.utc)
+        pruning = catalogue.prune(begin, end, max_age_days)
+        records = pruning.kept
+        log.info(pruning.summary())
+        if not records and pruning.pruned:
+            #an empty file would only fail later inside the propagator without saying why
+            raise RuntimeError(
+                f"Element pruning left no satellites: {len(pruning.stale)} stale (epoch more than "
+                f"{max_age_days:g} days from the window) and {len(pruning.decayed)} decayed. "
+                f"Refresh the catalogue, move the window nearer its epochs or use stale_policy=\"keep\"."
+            )
+    if band is not None:
+        from core.transmitter_db import TransmitterDatabase
+        records, stats = TransmitterDatabase.load().filter(records, *band)
+        log.info(stats.summary())
+    if len(tle_files) == 1 and len(records) == catalogue.loaded:
+        return str(tle_files[0])
+
+    stem = Path(tle_files[0]).stem
+    path = _store_records(catalogue_dir(), stem, records)
+    if policy == StalePolicy.QUARANTINE and pruning.pruned:
+        quarantine = catalogue_dir() / "quarantine"
+        quarantine.mkdir(exist_ok=True)
+        pruned = _store_records(quarantine, stem, pruning.pruned)
+        log.info(f"Quarantined {len(pruning.pruned)} element sets to {pruned}")
+    return str(path)
@@ -1,19 +1,22 @@
 from PyQt6.QtCore import QThread, pyqtSignal
-from core.sopp_runner import SOPPRunner
+from core.run_config import tle_groups
+from core.tle_refresh import TLERefreshManager
 import logging
 
 log = logging.getLogger(__name__)
 
 class TLELoaderThread(QThread):
     status = pyqtSignal(str)
-    finished = pyqtSignal(str)
+    finished = pyqtSignal(list)
 
-    def __init__(self, group: str):
+    def __init__(self, data_type: str, source: str | None = None):
         super().__init__()
-        self.group = group
+        self.groups = tle_groups(data_type) #one TLEGroup, or several joined with commas
+        self.source = source
 
     def run(self):
-        self.status.emit(f"Checking TLE catalogue: {self.group}...")
-        filename = SOPPRunner.select_data(self.group)
+        self.status.emit(f"Checking TLE catalogue: {', '.join(self.groups)}...")
+        #one manager for every group, so missing groups are fetched concurrently
+        filenames = TLERefreshManager(source=self.source).ensure(self.groups)
         self.status.emit("TLE catalogue ready.")
-        self.finished.emit(filename)
\ No newline at end of file
+        self.finished.emit(filenames)
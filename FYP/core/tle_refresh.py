@@ -0,0 +1,207 @@
+import json
+import logging
+import os
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Optional
+
+from core.paths import get_data_dir
+from core.tle_catalogue import CatalogueChangeSet, fingerprint, publish_changes, read_tle_file
+from enums.tle_group import TLEGroup
+
+log = logging.getLogger(__name__)
+
+CELESTRAK_URL = "https://celestrak.org/NORAD/elements/gp.php?GROUP={group}&FORMAT=tle"
+MAX_AGE_DAYS = 7.0
+MAX_WORKERS = 4
+TIMEOUT_SECONDS = 30
+
+
+@dataclass
+class RefreshResult:
+    group: str
+    path: str
+    status: str               # "updated", "not_modified", "fresh" or "failed"
+    error: Optional[str] = None
+    changes: Optional[CatalogueChangeSet] = None   # set when an existing cache was replaced
+
+
+class TLERefreshManager:
+    """
+    Keeps the local TLE catalogue files up to date.
+
+    Each group is cached as data/<group>.tle with a <group>.tle.json sidecar
+    recording the ETag/Last-Modified of the last download and when the source
+    was last checked. Refreshes send conditional requests, so an unchanged
+    catalogue costs a 304 rather than a full download, and several groups are
+    refreshed concurrently on a thread pool. Downloads are validated and
+    written to a temporary file before an atomic os.replace, so a failed or
+    interrupted refresh never leaves a truncated catalogue behind.
+
+    The source is CelesTrak by default. It may instead be any URL template
+    containing ``{group}`` (e.g. a local HTTP stand-in) or a local mirror
+    directory holding <group>.tle files, for sites without internet access.
+
+    :param source: None for CelesTrak, a URL template, or a mirror directory.
+    :param data_dir: Cache directory; defaults to the app data directory.
+    :param max_age_days: Age after which a cached catalogue is re-checked.
+    :param max_workers: Concurrent refreshes.
+    """
+    def __init__(self, source: str | None = None, data_dir: Path | None = None,
+                 max_age_days: float = MAX_AGE_DAYS, max_workers: int = MAX_WORKERS):
+        self.source = source or CELESTRAK_URL
+        self.data_dir = Path(data_dir) if data_dir is not None else get_data_dir()
+        self.data_dir.mkdir(parents=True, exist_ok=True)
+        self.max_age_days = max_age_days
+        self.max_workers = max_workers
+        self._background: Optional[threading.Thread] = None
+
+    @property
+    def is_mirror(self) -> bool:
+        return "://" not in self.source
+
+    def path(self, group: TLEGroup | str) -> Path:
+        return self.data_dir / f"{group}.tle"
+
+    def _meta_path(self, group) -> Path:
+        return self.data_dir / f"{group}.tle.json"
+
+    def _read_meta(self, group) -> dict:
+        try:
+            return json.loads(self._meta_path(group).read_text())
+        except (OSError, ValueError):
+            return {}
+
+    def _write_meta(self, group, meta: dict):
+        self._atomic_write(self._meta_path(group), json.dumps(meta, indent=2).encode())
+
+    @staticmethod
+    def _atomic_write(path: Path, data: bytes, validate: bool = False):
+        tmp = path.with_name(f".{path.name}.{threading.get_ident()}.tmp")
+        tmp.write_bytes(data)
+        try:
+            #an error page or empty body must not replace a working catalogue
+            if validate and not read_tle_file(str(tmp)):
+                raise ValueError("response contains no TLE entries")
+            os.replace(tmp, path)
+        finally:
+            tmp.unlink(missing_ok=True)
+
+    def age_days(self, group) -> float:
+        """Days since the source was last checked (or the file written), inf if never cached."""
+        path = self.path(group)
+        if not path.exists():
+            return float("inf")
+        checked = self._read_meta(group).get("checked", path.stat().st_mtime)
+        return (time.time() - checked) / 86400.0
+
+    def is_stale(self, group) -> bool:
+        return self.age_days(group) >= self.max_age_days
+
+    # --- refresh ---
+
+    def refresh(self, group: TLEGroup | str, force: bool = False) -> RefreshResult:
+        """Refresh one group if stale (or forced). Never raises; failures are reported in the result."""
+        path = self.path(group)
+        if not force and not self.is_stale(group):
+            return RefreshResult(str(group), str(path), "fresh")
+        try:
+            meta = self._read_meta(group) if path.exists() else {}
+            fetch = self._fetch_mirror if self.is_mirror else self._fetch_http
+            data, meta = fetch(group, meta)
+            changes = None
+            if data is not None:
+                previous = fingerprint(read_tle_file(str(path))) if path.exists() else None
+                self._atomic_write(path, data, validate=True)
+                if previous is not None:
+                    changes = CatalogueChangeSet.between(previous, fingerprint(read_tle_file(str(path))))
+            meta["checked"] = time.time()
+            self._write_meta(group, meta)
+            status = "not_modified" if data is None else "updated"
+            log.info(f"TLE catalogue '{group}': {status.replace('_', ' ')}")
+            if changes:
+                publish_changes(str(path), changes)
+            return RefreshResult(str(group), str(path), status, changes=changes)
+        except Exception as e:
+            log.warning(f"TLE refresh failed for '{group}': {e}")
+            return RefreshResult(str(group), str(path), "failed", str(e))
+
+    def _fetch_http(self, group, meta: dict) -> tuple[bytes | None, dict]:
+        request = urllib.request.Request(self.source.format(group=group), headers={"User-Agent": "ClearSkyRFI"})
+        if meta.get("etag"):
+            request.add_header("If-None-Match", meta["etag"])
+        if meta.get("last_modified"):
+            request.add_header("If-Modified-Since", meta["last_modified"])
+        try:
+            with urllib.request.urlopen(request, timeout=TIMEOUT_SECONDS) as response:
+                data = response.read()
+                headers = response.headers
+        except urllib.error.HTTPError as e:
+            if e.code == 304:
+                return None, meta
+            raise
+        meta = {"etag": headers.get("ETag"), "last_modified": headers.get("Last-Modified")}
+        return data, meta
+
+    def _fetch_mirror(self, group, meta: dict) -> tuple[bytes | None, dict]:
+        source = Path(self.source) / f"{group}.tle"
+        mtime = source.stat().st_mtime_ns
+        if meta.get("mirror_mtime") == mtime:
+            return None, meta
+        return source.read_bytes(), {"mirror_mtime": mtime}
+
+    def refresh_all(self, groups: list, force: bool = False) -> list[RefreshResult]:
+        """Refresh several groups concurrently, results in input order."""
+        if not groups:
+            return []
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(groups))) as pool:
+            return list(pool.map(lambda group: self.refresh(group, force), groups))
+
+    def refresh_in_background(self, groups: list,
+                              callback: Callable[[list[RefreshResult]], None] | None = None) -> threading.Thread:
+        """Start refresh_all on a daemon thread; callback receives the results."""
+        def work():
+            results = self.refresh_all(groups)
+            if callback is not None:
+                callback(results)
+        self._background = threading.Thread(target=work, name="tle-refresh", daemon=True)
+        self._background.start()
+        return self._background
+
+    # --- startup ---
+
+    def ensure(self, groups: list) -> list[str]:
+        """
+        Return a usable catalogue path for every group.
+
+        Groups with a cached file return immediately, stale ones being
+        refreshed in the background; only groups with no cache at all are
+        fetched before returning.
+
+        :raises RuntimeError: If a group has no cache and cannot be fetched.
+        """
+        missing = [group for group in groups if not self.path(group).exists()]
+        for result in self.refresh_all(missing):
+            if result.status == "failed":
+                raise RuntimeError(
+                    f"TLE download failed and no cached file exists for '{result.group}'.\n"
+                    f"Please check your internet connection or manually place a TLE file at:\n{result.path}"
+                )
+        stale = [group for group in groups if group not in missing and self.is_stale(group)]
+        if stale:
+            log.info(f"Using cached TLEs; refreshing {', '.join(map(str, stale))} in the background")
+            self.refresh_in_background(stale)
+        else:
+            log.info("TLE catalogue up to date.")
+        return [str(self.path(group)) for group in groups]
+
+    def wait(self, timeout: float | None = None):
+        """Block until a background refresh started by ensure() finishes."""
+        if self._background is not None:
+            self._background.join(timeout)
+
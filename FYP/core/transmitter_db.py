@@ -0,0 +1,106 @@
+import json
+import logging
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from core.paths import get_asset_path
+
+log = logging.getLogger(__name__)
+
+
+def transmitter_db_path() -> Path:
+    #shipped with the application (bundled by PyInstaller), not written to the user's data directory
+    return Path(get_asset_path("data/transmitters.json"))
+
+
+@dataclass(frozen=True)
+class TransmitterEntry:
+    name: str
+    downlink_mhz: tuple[tuple[float, float], ...]
+    match: tuple[str, ...] = ()
+
+    def overlaps(self, low_mhz: float, high_mhz: float) -> bool:
+        return any(lo <= high_mhz and hi >= low_mhz for lo, hi in self.downlink_mhz)
+
+
+@dataclass
+class BandFilterStats:
+    kept_known: int = 0
+    kept_unknown: int = 0
+    removed: dict[str, int] = field(default_factory=dict)   # constellation -> satellites removed
+
+    def summary(self) -> str:
+        removed = sum(self.removed.values())
+        detail = ", ".join(f"{name} {count}" for name, count in sorted(self.removed.items(), key=lambda kv: -kv[1]))
+        return (
+            f"Band filter: removed {removed} satellites with no downlink in the observing band"
+            f"{f' ({detail})' if detail else ''}; kept {self.kept_known} known and {self.kept_unknown} unknown"
+        )
+
+
+class TransmitterDatabase:
+    """
+    Local satellite downlink-band database read from data/transmitters.json.
+
+    Entries are keyed either by NORAD catalogue number (``satellites``) or by
+    constellation (``constellations``, matched case-insensitively against the
+    TLE name). A NORAD entry takes precedence over a constellation match.
+    Satellites found in neither are unknown and are never filtered out.
+
+    :param constellations: Constellation entries, checked in order.
+    :param satellites: NORAD number -> entry.
+    """
+    def __init__(self, constellations: list[TransmitterEntry], satellites: dict[int, TransmitterEntry]):
+        self.constellations = constellations
+        self.satellites = satellites
+
+    @classmethod
+    def load(cls, path: Path | None = None) -> "TransmitterDatabase":
+        path = Path(path) if path is not None else transmitter_db_path()
+        try:
+            raw = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, json.JSONDecodeError) as e:
+            raise RuntimeError(f"Could not read transmitter database {path}: {e}") from e
+        bands = lambda entry: tuple((float(lo), float(hi)) for lo, hi in entry["downlink_mhz"])
+        constellations = [
+            TransmitterEntry(entry["name"], bands(entry), tuple(m.upper() for m in entry["match"]))
+            for entry in raw.get("constellations", [])
+        ]
+        satellites = {
+            int(norad_id): TransmitterEntry(entry.get("name", str(norad_id)), bands(entry))
+            for norad_id, entry in raw.get("satellites", {}).items()
+        }
+        return cls(constellations, satellites)
+
+    def lookup(self, name: str, norad_id: int | None = None) -> TransmitterEntry | None:
+        if norad_id is not None and norad_id in self.satellites:
+            return self.satellites[norad_id]
+        upper = name.upper()
+        for entry in self.constellations:
+            if any(pattern in upper for pattern in entry.match):
+                return entry
+        return None
+
+    def filter(self, records: list, frequency_hz: float, bandwidth_mhz: float) -> tuple[list, BandFilterStats]:
+        """
+        Drop records whose known downlink bands all miss the observing band
+        frequency_hz +/- bandwidth_mhz / 2.
+
+        :param records: Objects with ``name`` and ``norad_id`` (e.g. TLERecord).
+        :returns: Tuple of (kept records in input order, BandFilterStats).
+        """
+        centre = frequency_hz / 1e6
+        low, high = centre - bandwidth_mhz / 2, centre + bandwidth_mhz / 2
+        stats = BandFilterStats()
+        kept = []
+        for record in records:
+            entry = self.lookup(record.name, record.norad_id)
+            if entry is None:
+                stats.kept_unknown += 1
+                kept.append(record)
+            elif entry.overlaps(low, high):
+                stats.kept_known += 1
+                kept.append(record)
+            else:
+                stats.removed[entry.name] = stats.removed.get(entry.name, 0) + 1
+        return kept, stats
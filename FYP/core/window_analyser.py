@@ -1,18 +1,30 @@
+import heapq
+from bisect import bisect_left, bisect_right
 from dataclasses import dataclass, field
 from datetime import datetime, timedelta, timezone
 
+import numpy as np
+
+from core.time_bins import DEFAULT_RESOLUTION_SECONDS, TimeBins
+
+
+def span_seconds(delta: timedelta) -> float:
+    """Length of delta in seconds; whole seconds stay ints so 1-second output is unchanged."""
+    seconds = delta.total_seconds()
+    return int(seconds) if seconds.is_integer() else round(seconds, 6)
+
 
 @dataclass
 class CleanStretch:
     start: datetime
     end: datetime
-    duration_seconds: int
+    duration_seconds: float
 
 
 @dataclass
 class LinkedGroup:
     stretches: list[CleanStretch] = field(default_factory=list)
-    gaps_seconds: list[int] = field(default_factory=list)
+    gaps_seconds: list[float] = field(default_factory=list)
 
     @property
     def start(self) -> datetime:
@@ -23,105 +35,427 @@ class LinkedGroup:
         return self.stretches[-1].end
 
     @property
-    def total_clean_seconds(self) -> int:
+    def total_clean_seconds(self) -> float:
         return sum(s.duration_seconds for s in self.stretches)
 
     @property
-    def total_span_seconds(self) -> int:
-        return int((self.end - self.start).total_seconds())
+    def total_span_seconds(self) -> float:
+        return span_seconds(self.end - self.start)
 
     @property
-    def max_gap_seconds(self) -> int:
+    def max_gap_seconds(self) -> float:
         return max(self.gaps_seconds) if self.gaps_seconds else 0
 
 
+def run_bounds(mask: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """First and last index (inclusive) of every run of True in a boolean mask."""
+    edges = np.diff(np.concatenate(([0], mask.view(np.int8), [0])))
+    return np.flatnonzero(edges == 1), np.flatnonzero(edges == -1) - 1
+
+
+@dataclass
+class ToleranceStep:
+    """Linked-group outcome for every gap tolerance from gap_tolerance_seconds up to the next step."""
+    gap_tolerance_seconds: float
+    groups: int
+    best_clean_seconds: float
+    best_span_seconds: float
+
+
 class WindowAnalyser:
-    def __init__(self, results, time_begin: str, time_end: str):
-        self.flagged = {
-            datetime.fromisoformat(r['time_utc']).replace(tzinfo=timezone.utc)
-            for r in results
-        }
-        self.time_begin = datetime.fromisoformat(time_begin).replace(tzinfo=timezone.utc)
-        self.time_end = datetime.fromisoformat(time_end).replace(tzinfo=timezone.utc)
+    """
+    Clean-time analysis of flagged interference points over a window.
+
+    Flagged times are binned at ingest into integer slots (core.time_bins,
+    one second by default) and held as a NumPy boolean occupancy array with
+    one entry per slot from time_begin to time_end inclusive, so clean
+    stretches and interference blocks fall out of a vectorised run-length
+    encoding rather than sorting and walking timestamps.
+
+    Alongside it the analyser keeps per-slot columns (``hit_count`` of
+    distinct satellites, ``max_gain`` and ``sum_gain``) and the flagged rows themselves as
+    columns of (slot, satellite index, gain), so ``filtered()`` can apply
+    other clean criteria without re-running the checker.
+
+    :param results: Flagged rows with an ISO ``time_utc`` (InterferenceChecker output).
+    :param time_begin: ISO UTC window start.
+    :param time_end: ISO UTC window end.
+    :param resolution_seconds: Slot length, e.g. 0.1, 1 or 10.
+    :param sample_seconds: Cadence of the propagated samples. When it is
+        longer than the resolution each sample flags every slot up to the
+        next sample, so sub-second slots do not read as clean between samples.
+    """
+    def __init__(self, results, time_begin: str, time_end: str,
+                 resolution_seconds: float = DEFAULT_RESOLUTION_SECONDS, sample_seconds: float | None = None):
+        self.bins = TimeBins.for_window(time_begin, time_end, resolution_seconds)
+        self.time_begin, self.time_end = self.bins.begin, self.bins.end
+        self.resolution_seconds = resolution_seconds
+        self.sample_seconds = sample_seconds or resolution_seconds
+        self.sample_slots = max(1, round(self.sample_seconds / resolution_seconds))
+        n = self.bins.n_slots
+        self.occupancy = np.zeros(n, dtype=bool)
+        self.hit_count = np.zeros(n, dtype=np.int32)
+        self.max_gain = np.zeros(n, dtype=np.float32)
+        self.sum_gain = np.zeros(n, dtype=np.float64)
+        self.satellite_names: list[str] = []
+        self._satellite_ids: dict[str, int] = {}
+        self._row_chunks: list[tuple[np.ndarray, np.ndarray, np.ndarray]] = []
+        self._hit_pairs = np.zeros(0, dtype=np.int64)   # sorted (slot << 32 | satellite index) already in hit_count
+        self._ordered = None
+        if len(results):
+            self._ingest(results)
+
+    @classmethod
+    def for_run(cls, results, run_config) -> "WindowAnalyser":
+        """Analyser over a RunConfig's window at its analysis resolution and sample cadence."""
+        return cls(results, run_config.time_begin, run_config.time_end,
+                   run_config.time_resolution_seconds, run_config.sample_seconds())
+
+    @classmethod
+    def from_epochs(cls, epochs, time_begin: str, time_end: str, gains=None,
+                    resolution_seconds: float = DEFAULT_RESOLUTION_SECONDS) -> "WindowAnalyser":
+        """
+        Analyser from an array of flagged unix timestamps in seconds, without per-row parsing.
+
+        :param gains: Optional gain_percent per timestamp. Without it gains are
+            unknown (NaN) and gain thresholds in filtered() keep those slots flagged.
+        """
+        analyser = WindowAnalyser([], time_begin, time_end, resolution_seconds)
+        offsets = analyser.bins.slots_from_epochs(epochs)
+        gains = np.full(len(offsets), np.nan) if gains is None else np.asarray(gains, dtype=float)
+        analyser._accumulate(offsets, np.full(len(offsets), analyser._satellite_id(""), dtype=np.int32), gains)
+        return analyser
+
+    def _satellite_id(self, name: str) -> int:
+        if name not in self._satellite_ids:
+            self._satellite_ids[name] = len(self.satellite_names)
+            self.satellite_names.append(name)
+        return self._satellite_ids[name]
+
+    def _ingest(self, results) -> np.ndarray:
+        slots = self.bins.slots_from_iso([r['time_utc'] for r in results])
+        sat_ids = np.fromiter((self._satellite_id(r.get('satellite', '')) for r in results),
+                              dtype=np.int32, count=len(results))
+        gains = np.fromiter((r.get('gain_percent', np.nan) for r in results), dtype=float, count=len(results))
+        return self._accumulate(slots, sat_ids, gains)
+
+    def _accumulate(self, offsets: np.ndarray, sat_ids: np.ndarray, gains: np.ndarray) -> np.ndarray:
+        """Add rows touching the window to the per-slot columns; returns the slots they flag."""
+        n, span = len(self.occupancy), self.sample_slots
+        inside = (offsets > -span) & (offsets < n)
+        offsets, sat_ids, gains = offsets[inside], sat_ids[inside], gains[inside]
+        self._row_chunks.append((offsets, sat_ids, gains))
+        if span > 1:
+            offsets = (offsets[:, None] + np.arange(span)).ravel()
+            sat_ids, gains = np.repeat(sat_ids, span), np.repeat(gains, span)
+            inside = (offsets >= 0) & (offsets < n)
+            offsets, sat_ids, gains = offsets[inside], sat_ids[inside], gains[inside]
+        self.occupancy[offsets] = True
+        #a satellite sampled several times in one slot, in this call or an earlier chunk, is still one satellite
+        pairs = np.unique((offsets.astype(np.int64) << 32) | sat_ids.astype(np.int64))
+        if len(self._hit_pairs):
+            pairs = np.setdiff1d(pairs, self._hit_pairs, assume_unique=True)
+            self._hit_pairs = np.union1d(self._hit_pairs, pairs)
+        else:
+            self._hit_pairs = pairs
+        np.add.at(self.hit_count, pairs >> 32, 1)
+        with np.errstate(invalid="ignore"):   # rows without a gain carry NaN through
+            np.maximum.at(self.max_gain, offsets, gains.astype(np.float32))
+            np.add.at(self.sum_gain, offsets, gains)
+        self._ordered = None
+        return offsets
+
+    @property
+    def rows(self) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Flagged rows as (first slot, index into satellite_names, gain_percent) columns."""
+        if len(self._row_chunks) != 1:
+            columns = zip(*self._row_chunks) if self._row_chunks else ([np.zeros(0, np.int64)], [np.zeros(0, np.int32)], [np.zeros(0)])
+            self._row_chunks = [tuple(np.concatenate(c) for c in columns)]
+        return self._row_chunks[0]
+
+    def filtered(self, max_gain_percent: float | None = None, max_satellites: int | None = None,
+                 exclude: tuple[str, ...] = ()) -> "WindowAnalyser":
+        """
+        Analyser over the same window with a different clean criterion, from
+        vectorised masks over the per-second columns.
+
+        A slot is clean when every criterion given holds; with none given,
+        any remaining hit flags it, as in the original analysis.
+
+        :param max_gain_percent: Clean while the strongest hit is below this gain.
+        :param max_satellites: Clean while at most this many satellites are flagged at once.
+        :param exclude: Satellite name fragments (e.g. constellation names,
+            case-insensitive) whose hits are ignored.
+        """
+        offsets, sat_ids, gains = self.rows
+        if exclude:
+            patterns = [p.upper() for p in exclude]
+            excluded = np.array([any(p in name.upper() for p in patterns) for name in self.satellite_names], dtype=bool)
+            keep = ~excluded[sat_ids]
+            offsets, sat_ids, gains = offsets[keep], sat_ids[keep], gains[keep]
+
+        analyser = WindowAnalyser([], self.time_begin.replace(tzinfo=None).isoformat(),
+                                  self.time_end.replace(tzinfo=None).isoformat(),
+                                  self.resolution_seconds, self.sample_seconds)
+        analyser.satellite_names = list(self.satellite_names)
+        analyser._satellite_ids = dict(self._satellite_ids)
+        analyser._accumulate(offsets, sat_ids, gains)
+        if max_gain_percent is not None or max_satellites is not None:
+            violated = np.zeros(len(analyser.occupancy), dtype=bool)
+            if max_gain_percent is not None:
+                violated |= ~(analyser.max_gain < max_gain_percent)   # unknown (NaN) gains stay flagged
+            if max_satellites is not None:
+                violated |= analyser.hit_count > max_satellites
+            analyser.occupancy &= violated
+        return analyser
+
+    @property
+    def flagged(self) -> set[datetime]:
+        """Start of each flagged slot as a UTC datetime."""
+        return {self.bins.slot_start(i) for i in np.flatnonzero(self.occupancy)}
+
+    def slot_time(self, offset: int) -> datetime:
+        """Start of a slot; the last slot reports time_end so stretches reach the window end."""
+        if offset == len(self.occupancy) - 1:
+            return self.time_end
+        return self.bins.slot_start(offset)
+
+    def interference_blocks(self) -> list[tuple[datetime, datetime]]:
+        """Contiguous flagged spans (start of first and last flagged slot), in time order."""
+        starts, ends = run_bounds(self.occupancy)
+        return [(self.slot_time(a), self.slot_time(b)) for a, b in zip(starts, ends)]
+
+    def stretch_for_slots(self, a: int, b: int) -> CleanStretch:
+        """CleanStretch from the start of slot a to the start of slot b."""
+        start, end = self.slot_time(a), self.slot_time(b)
+        return CleanStretch(start=start, end=end, duration_seconds=span_seconds(end - start))
+
+    def _clean_bounds(self):
+        """Inclusive (first, last) offsets of each clean run, in time order."""
+        return zip(*run_bounds(~self.occupancy))
 
     def clean_stretches(self) -> list[CleanStretch]:
-        if not self.flagged:
-            duration = int((self.time_end - self.time_begin).total_seconds())
-            return [CleanStretch(start=self.time_begin, end=self.time_end, duration_seconds=duration)]
-
-        # Merge flagged timestamps into contiguous interference blocks
-        sorted_flagged = sorted(self.flagged)
-        blocks: list[tuple[datetime, datetime]] = []
-        block_start = block_end = sorted_flagged[0]
-        for t in sorted_flagged[1:]:
-            if t - block_end <= timedelta(seconds=1):
-                block_end = t
-            else:
-                blocks.append((block_start, block_end))
-                block_start = block_end = t
-        blocks.append((block_start, block_end))
-
-        # Clean stretches are the gaps before, between, and after interference blocks
-        gap_candidates = [
-            (self.time_begin,                          blocks[0][0] - timedelta(seconds=1)),
-            *((blocks[i][1] + timedelta(seconds=1),    blocks[i + 1][0] - timedelta(seconds=1))
-              for i in range(len(blocks) - 1)),
-            (blocks[-1][1] + timedelta(seconds=1),     self.time_end),
-        ]
-        stretches = [
-            CleanStretch(start=start, end=end,
-                         duration_seconds=int((end - start).total_seconds()))
-            for start, end in gap_candidates
-            if start <= end
-        ]
-
-        return sorted(stretches, key=lambda s: s.duration_seconds, reverse=True)
+        return sorted(self._ordered_stretches()[0], key=lambda s: s.duration_seconds, reverse=True)
 
-    def linked_groups(self, gap_tolerance_seconds: int = 30) -> list[LinkedGroup]:
-        stretches = sorted(self.clean_stretches(), key=lambda s: s.start)
+    def top_stretches(self, k: int, min_duration_seconds: int = 0) -> list[CleanStretch]:
+        """The k longest clean stretches of at least min_duration_seconds, longest first, by heap selection."""
+        candidates = (s for s in self._ordered_stretches()[0] if s.duration_seconds >= min_duration_seconds)
+        return heapq.nlargest(k, candidates, key=lambda s: s.duration_seconds)
+
+    def _ordered_stretches(self) -> tuple[list[CleanStretch], np.ndarray]:
+        """Clean stretches in time order and the gaps between neighbours, computed once per flag set."""
+        if self._ordered is None:
+            stretches = [self.stretch_for_slots(int(a), int(b)) for a, b in self._clean_bounds()]
+            gaps = np.array([span_seconds(b.start - a.end) for a, b in zip(stretches, stretches[1:])],
+                            dtype=np.int64 if float(self.resolution_seconds).is_integer() else float)
+            self._ordered = (stretches, gaps)
+        return self._ordered
+
+    def _groups_in_order(self, gap_tolerance_seconds: int):
+        stretches, gaps = self._ordered_stretches()
         if not stretches:
-            return []
+            return
+        #groups break wherever the gap to the next stretch exceeds the tolerance
+        cuts = (np.flatnonzero(gaps > gap_tolerance_seconds) + 1).tolist()
+        for a, b in zip([0] + cuts, cuts + [len(stretches)]):
+            yield LinkedGroup(stretches=stretches[a:b], gaps_seconds=gaps[a:b - 1].tolist())
 
-        groups = []
-        current_group = LinkedGroup(stretches=[stretches[0]])
+    def linked_groups(self, gap_tolerance_seconds: int = 30) -> list[LinkedGroup]:
+        return sorted(self._groups_in_order(gap_tolerance_seconds), key=lambda g: g.total_clean_seconds, reverse=True)
 
-        for i in range(1, len(stretches)):
-            prev = current_group.stretches[-1]
-            curr = stretches[i]
-            gap = int((curr.start - prev.end).total_seconds())
+    def top_linked_groups(self, k: int, gap_tolerance_seconds: int = 30, min_clean_seconds: int = 0) -> list[LinkedGroup]:
+        """The k linked groups with the most clean time (at least min_clean_seconds), by heap selection."""
+        candidates = (g for g in self._groups_in_order(gap_tolerance_seconds) if g.total_clean_seconds >= min_clean_seconds)
+        return heapq.nlargest(k, candidates, key=lambda g: g.total_clean_seconds)
 
-            if gap <= gap_tolerance_seconds:
-                current_group.stretches.append(curr)
-                current_group.gaps_seconds.append(gap)
-            else:
-                groups.append(current_group)
-                current_group = LinkedGroup(stretches=[curr])
+    def tolerance_curve(self) -> list[ToleranceStep]:
+        """
+        Usable time against gap tolerance in one pass.
 
-        groups.append(current_group)
-        return sorted(groups, key=lambda g: g.total_clean_seconds, reverse=True)
+        Raising the tolerance only ever merges neighbouring groups, so the
+        groups for every tolerance form a dendrogram over the gaps. Adjacent
+        stretches are unioned in ascending gap order while tracking the
+        largest group's clean time, and a step is recorded at each distinct gap.
 
-    def clean_stretches_summary(self, gap_tolerance_seconds: int = 30) -> str:
-        stretches = self.clean_stretches()
-        lines = ["=== Clean Stretches ==="]
+        :returns: A ToleranceStep for 0 s followed by one per distinct gap, ascending.
+        """
+        stretches, gaps = self._ordered_stretches()
         if not stretches:
+            return []
+        parent = list(range(len(stretches)))
+        clean = [s.duration_seconds for s in stretches]
+        last = list(range(len(stretches)))   # root -> index of the group's last stretch
+
+        def find(i: int) -> int:
+            while parent[i] != i:
+                parent[i] = parent[parent[i]]
+                i = parent[i]
+            return i
+
+        def span(root: int) -> float:
+            return span_seconds(stretches[last[root]].end - stretches[root].start)
+
+        #roots are always a group's first stretch, since merges join a group to its right neighbour
+        best = max(range(len(stretches)), key=lambda i: clean[i])
+        steps = [ToleranceStep(0, len(stretches), clean[best], span(best))]
+        order = np.argsort(gaps, kind="stable")
+        for k, i in enumerate(order.tolist()):
+            left, right = find(i), find(i + 1)
+            parent[right] = left
+            clean[left] += clean[right]
+            last[left] = last[right]
+            if clean[left] >= clean[best]:
+                best = left
+            if k + 1 == len(order) or gaps[order[k + 1]] != gaps[i]:
+                step = ToleranceStep(gaps[i].item(), len(stretches) - (k + 1), clean[best], span(best))
+                if step.gap_tolerance_seconds == 0:
+                    steps[0] = step
+                else:
+                    steps.append(step)
+        return steps
+
+    def tolerance_curve_summary(self) -> str:
+        lines = ["=== Usable Time vs Gap Tolerance ==="]
+        steps = self.tolerance_curve()
+        if not steps:
             lines.append("  No clean stretches found.")
-        else:
-            for i, s in enumerate(stretches, 1):
-                lines.append(f"  {i}. {s.start.strftime('%H:%M:%S')} - "
-                            f"{s.end.strftime('%H:%M:%S')}  "
-                            f"({s.duration_seconds}s)")
+        for step in steps:
+            lines.append(f"  >= {step.gap_tolerance_seconds}s: best group clean {step.best_clean_seconds}s "
+                         f"(span {step.best_span_seconds}s, {step.groups} groups)")
         return "\n".join(lines)
 
-    def linked_groups_summary(self, gap_tolerance_seconds: int = 30) -> str:
-        groups = self.linked_groups(gap_tolerance_seconds)
-        lines = [f"=== Linked Groups (gap tolerance: {gap_tolerance_seconds}s) ==="]
-        if not groups:
-            lines.append("  No groups found.")
+    def clean_stretches_summary(self, gap_tolerance_seconds: int = 30, limit: int | None = None,
+                                min_duration_seconds: int = 0) -> str:
+        """
+        :param limit: Show only the longest ``limit`` stretches, followed by a count of the rest.
+        :param min_duration_seconds: Leave out stretches shorter than this.
+        """
+        return "\n".join(self.iter_clean_stretches_summary(limit, min_duration_seconds))
+
+    def iter_clean_stretches_summary(self, limit: int | None = None, min_duration_seconds: int = 0):
+        """Lines of clean_stretches_summary, generated without sorting stretches beyond the limit."""
+        yield "=== Clean Stretches ==="
+        total = sum(1 for s in self._ordered_stretches()[0] if s.duration_seconds >= min_duration_seconds)
+        if limit is None:
+            stretches = [s for s in self.clean_stretches() if s.duration_seconds >= min_duration_seconds]
         else:
-            for i, g in enumerate(groups, 1):
-                gap_str = f", gaps: {g.gaps_seconds}" if g.gaps_seconds else ""
-                lines.append(f"  Group {i}: {g.start.strftime('%H:%M:%S')} - "
-                            f"{g.end.strftime('%H:%M:%S')}  "
-                            f"(clean: {g.total_clean_seconds}s, "
-                            f"span: {g.total_span_seconds}s{gap_str})")
-        return "\n".join(lines)
\ No newline at end of file
+            stretches = self.top_stretches(limit, min_duration_seconds)
+        if not stretches:
+            yield "  No clean stretches found."
+        for i, s in enumerate(stretches, 1):
+            yield (f"  {i}. {s.start.strftime('%H:%M:%S')} - "
+                   f"{s.end.strftime('%H:%M:%S')}  "
+                   f"({s.duration_seconds}s)")
+        if total > len(stretches):
+            yield f"  ... and {total - len(stretches)} shorter stretches"
+
+    def linked_groups_summary(self, gap_tolerance_seconds: int = 30, limit: int | None = None,
+                              min_clean_seconds: int = 0) -> str:
+        """
+        :param limit: Show only the ``limit`` groups with the most clean time, followed by a count of the rest.
+        :param min_clean_seconds: Leave out groups with less clean time than this.
+        """
+        return "\n".join(self.iter_linked_groups_summary(gap_tolerance_seconds, limit, min_clean_seconds))
+
+    def iter_linked_groups_summary(self, gap_tolerance_seconds: int = 30, limit: int | None = None,
+                                   min_clean_seconds: int = 0):
+        """Lines of linked_groups_summary, generated without sorting groups beyond the limit."""
+        yield f"=== Linked Groups (gap tolerance: {gap_tolerance_seconds}s) ==="
+        if limit is None:
+            groups = [g for g in self.linked_groups(gap_tolerance_seconds) if g.total_clean_seconds >= min_clean_seconds]
+            total = len(groups)
+        else:
+            groups = self.top_linked_groups(limit, gap_tolerance_seconds, min_clean_seconds)
+            total = sum(1 for g in self._groups_in_order(gap_tolerance_seconds) if g.total_clean_seconds >= min_clean_seconds)
+        if not groups:
+            yield "  No groups found."
+        for i, g in enumerate(groups, 1):
+            gap_str = f", gaps: {g.gaps_seconds}" if g.gaps_seconds else ""
+            yield (f"  Group {i}: {g.start.strftime('%H:%M:%S')} - "
+                   f"{g.end.strftime('%H:%M:%S')}  "
+                   f"(clean: {g.total_clean_seconds}s, "
+                   f"span: {g.total_span_seconds}s{gap_str})")
+        if total > len(groups):
+            yield f"  ... and {total - len(groups)} smaller groups"
+
+def _merge_interval(starts: list[int], ends: list[int], a: int, b: int):
+    """Insert the inclusive interval a..b into sorted disjoint intervals, merging overlapping or adjacent ones."""
+    i = bisect_left(ends, a - 1)
+    j = bisect_right(starts, b + 1)
+    if i < j:
+        a, b = min(a, starts[i]), max(b, ends[j - 1])
+    starts[i:j] = [a]
+    ends[i:j] = [b]
+
+
+class IncrementalWindowAnalyser(WindowAnalyser):
+    """
+    WindowAnalyser that is fed flagged results in chunks, in any order.
+
+    Flagged seconds are kept both in the occupancy bitmap and as sorted,
+    disjoint flagged intervals that each chunk is merged into, so clean
+    stretches (the gaps between intervals) and linked groups can be read at
+    any point. Until every chunk is in they are provisional: later chunks can
+    only split or shorten them. Time spans known to be fully processed can be
+    passed with a chunk and are tracked in ``covered_fraction``.
+
+    :param time_begin: ISO UTC window start.
+    :param time_end: ISO UTC window end.
+    """
+    def __init__(self, time_begin: str, time_end: str,
+                 resolution_seconds: float = DEFAULT_RESOLUTION_SECONDS, sample_seconds: float | None = None):
+        super().__init__([], time_begin, time_end, resolution_seconds, sample_seconds)
+        self.flagged_starts: list[int] = []
+        self.flagged_ends: list[int] = []
+        self._covered_starts: list[int] = []
+        self._covered_ends: list[int] = []
+        self.chunks = 0
+
+    def add(self, results, covered: tuple[str, str] | None = None):
+        """
+        Merge one chunk of flagged rows.
+
+        :param results: Flagged rows with an ISO ``time_utc``.
+        :param covered: Optional ISO (begin, end) span, end inclusive, whose
+            results are now complete.
+        """
+        self.chunks += 1
+        offsets = np.unique(self._ingest(results))
+        if len(offsets):
+            breaks = np.flatnonzero(np.diff(offsets) > 1)
+            for a, b in zip(offsets[np.concatenate(([0], breaks + 1))], offsets[np.concatenate((breaks, [len(offsets) - 1]))]):
+                _merge_interval(self.flagged_starts, self.flagged_ends, int(a), int(b))
+        if covered is not None:
+            a, b = (self.bins.slot_of(datetime.fromisoformat(t).replace(tzinfo=timezone.utc)) for t in covered)
+            _merge_interval(self._covered_starts, self._covered_ends, max(a, 0), min(b, len(self.occupancy) - 1))
+
+    @classmethod
+    def for_run(cls, run_config) -> "IncrementalWindowAnalyser":
+        return cls(run_config.time_begin, run_config.time_end,
+                   run_config.time_resolution_seconds, run_config.sample_seconds())
+
+    @property
+    def covered_fraction(self) -> float:
+        covered = sum(b - a + 1 for a, b in zip(self._covered_starts, self._covered_ends))
+        return covered / len(self.occupancy)
+
+    def interference_blocks(self) -> list[tuple[datetime, datetime]]:
+        return [(self.slot_time(a), self.slot_time(b)) for a, b in zip(self.flagged_starts, self.flagged_ends)]
+
+    def _clean_bounds(self):
+        bounds = zip([0] + [b + 1 for b in self.flagged_ends],
+                     [a - 1 for a in self.flagged_starts] + [len(self.occupancy) - 1])
+        return ((a, b) for a, b in bounds if a <= b)
+
+    def snapshot(self) -> "IncrementalWindowAnalyser":
+        """Independent copy, safe to hand to another thread while chunks keep arriving."""
+        copy = IncrementalWindowAnalyser.__new__(IncrementalWindowAnalyser)
+        copy.__dict__.update(self.__dict__)
+        for column in ("occupancy", "hit_count", "max_gain", "sum_gain"):
+            setattr(copy, column, getattr(self, column).copy())
+        #row chunks and hit pairs are never modified in place, only appended to or replaced
+        copy._row_chunks = list(self._row_chunks)
+        copy.satellite_names, copy._satellite_ids = list(self.satellite_names), dict(self._satellite_ids)
+        copy.flagged_starts, copy.flagged_ends = list(self.flagged_starts), list(self.flagged_ends)
+        copy._covered_starts, copy._covered_ends = list(self._covered_starts), list(self._covered_ends)
+        return copy
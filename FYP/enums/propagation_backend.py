@@ -0,0 +1,5 @@
+from enum import StrEnum
+
+class PropagationBackend(StrEnum):
+    SOPP = "sopp"       # delegate to Sopp.get_satellites_crossing_main_beam()
+    NATIVE = "native"   # in-tree vectorised SGP4 (core.native_propagator)
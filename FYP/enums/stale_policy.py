@@ -0,0 +1,6 @@
+from enum import StrEnum
+
+class StalePolicy(StrEnum):
+    KEEP = "keep"               # propagate every element set regardless of age
+    DROP = "drop"               # leave stale/decayed element sets out of the run
+    QUARANTINE = "quarantine"   # leave them out and write them to data/catalogue/quarantine for inspection
@@ -1,3 +1,4 @@
+import argparse
 import csv
 from pathlib import Path
 from datetime import datetime
@@ -5,8 +6,12 @@ from core.run_config import RunConfig
 from models.beam_model import BeamModel
 from core.observer import Observer
 from core.checker import InterferenceChecker
-from core.sopp_runner import SOPPRunner
+from core.tle_refresh import TLERefreshManager
+from core.runner_factory import create_runner
+from core.result_cache import cached_run
+from core.tle_catalogue import catalogue_for_run
 from visualisation.sky_plot import SkyPlot
+from core.time_bins import strongest_per_slot
 from core.window_analyser import WindowAnalyser
 from config import TIME_BEGIN, TIME_END, GAP_TOLERANCE_SECONDS
 from config import (
@@ -15,7 +20,8 @@ from config import (
     RA_HOURS, DEC_DEGREES,
     TIME_BEGIN, TIME_END,
     GAP_TOLERANCE_SECONDS, GAIN_CUTOFF_PERCENT,
-    DATA_TYPE
+    DATA_TYPE, PROPAGATION_BACKEND, TLE_SOURCE,
+    CAMPAIGN_NIGHT_START_UTC, CAMPAIGN_NIGHT_HOURS, CAMPAIGN_MIN_ALTITUDE_DEG,
 )
 
 import logging
@@ -36,26 +42,55 @@ def save_animation(beam_model, observer, results, output_dir, timestamp):
     plot = SkyPlot(beam_model, observer, results)
     plot.animate(save_path=str(plot_filename))
 
+def config_run_config() -> RunConfig:
+    """RunConfig built from config.py, as the CLI uses."""
+    return RunConfig(
+        latitude=LATITUDE,
+        longitude=LONGITUDE,
+        elevation_m=ELEVATION_M,
+        dish_diameter_m=DISH_DIAMETER_M,
+        frequency_hz=FREQUENCY_HZ,
+        ra_hours=RA_HOURS,
+        dec_degrees=DEC_DEGREES,
+        time_begin=TIME_BEGIN,
+        time_end=TIME_END,
+        gap_tolerance_seconds=GAP_TOLERANCE_SECONDS,
+        gain_cutoff_percent=GAIN_CUTOFF_PERCENT,
+        data_type=DATA_TYPE,
+        propagation_backend=PROPAGATION_BACKEND,
+    )
+
+def run_campaign(date_begin: str, date_end: str, run_config: RunConfig = None):
+    """
+    Evaluate every night from date_begin to date_end (ISO dates, inclusive)
+    with the nightly window from config.py and log the ranked nights.
+    Rerunning the same campaign resumes from its progress file.
+    """
+    from core.campaign_planner import CampaignPlanner, NightlyWindow
+
+    run_config = run_config or config_run_config()
+    tle_files = TLERefreshManager(source=TLE_SOURCE).ensure(run_config.tle_groups())
+    #each night prunes for its own window, so groups are only merged here
+    tle_file = catalogue_for_run(tle_files, f"{date_begin}T00:00:00", f"{date_end}T23:59:59", "keep")
+    window = NightlyWindow(CAMPAIGN_NIGHT_START_UTC, CAMPAIGN_NIGHT_HOURS, CAMPAIGN_MIN_ALTITUDE_DEG)
+    planner = CampaignPlanner(run_config, tle_file, date_begin, date_end, window)
+    log.info(f"Campaign progress is saved to {planner.progress_path}")
+    campaign = planner.run(on_night=lambda night, done, total: log.info(f"Night {night.night} done ({done}/{total})"))
+    log.info(campaign.table())
+    return campaign
+
 def main(run_config: RunConfig = None):
     if run_config is None:
         #CLI constructs from config.py
-        run_config = RunConfig(
-            latitude=LATITUDE,
-            longitude=LONGITUDE,
-            elevation_m=ELEVATION_M,
-            dish_diameter_m=DISH_DIAMETER_M,
-            frequency_hz=FREQUENCY_HZ,
-            ra_hours=RA_HOURS,
-            dec_degrees=DEC_DEGREES,
-            time_begin=TIME_BEGIN,
-            time_end=TIME_END,
-            gap_tolerance_seconds=GAP_TOLERANCE_SECONDS,
-            gain_cutoff_percent=GAIN_CUTOFF_PERCENT,
-            data_type=DATA_TYPE,
-        )
-        
+        run_config = config_run_config()
+
+
     #initialise core components
-    tle_file = SOPPRunner.select_data(run_config.data_type)
+    tle_files = TLERefreshManager(source=TLE_SOURCE).ensure(run_config.tle_groups())
+    tle_file = catalogue_for_run(
+        tle_files, run_config.time_begin, run_config.time_end,
+        run_config.stale_policy, run_config.max_element_age_days, run_config.observing_band(),
+    )
     beam_model = BeamModel(
         dish_diameter_m=run_config.dish_diameter_m,
         frequency_hz=run_config.frequency_hz,
@@ -71,22 +106,25 @@ def main(run_config: RunConfig = None):
         dec_degrees=run_config.dec_degrees,
         time_begin=run_config.time_begin,
         time_end=run_config.time_end,
+        resolution_seconds=run_config.time_resolution_seconds,
     )
     
     log.debug(f"Prefilter radius: {beam_model.prefilter_radius_deg:.4f} degrees")
 
-    #run SOPP
-    runner = SOPPRunner(beam_model, run_config, tle_file)
-    interference_events = runner.run()
-    log.info(f"SOPP returned {len(interference_events)} events")
+    #run propagation (SOPP or native backend)
+    runner = create_runner(beam_model, run_config, tle_file, observer)
+    interference_events = cached_run(runner)
+    log.info(f"{run_config.propagation_backend} backend returned {len(interference_events)} events")
 
     #run Airy check
     checker = InterferenceChecker(beam_model, observer)
     results = checker.check(interference_events)
     log.info(f"Airy check flagged {len(results)} position points")
 
-    analyser = WindowAnalyser(results, run_config.time_begin, run_config.time_end)
+    analyser = WindowAnalyser.for_run(results, run_config)
+    results = strongest_per_slot(results, analyser.bins)
     log.info(analyser.clean_stretches_summary(gap_tolerance_seconds=run_config.gap_tolerance_seconds))
+    log.info(analyser.tolerance_curve_summary())
     #write CSV
     output_dir = Path("outputs")
     output_dir.mkdir(exist_ok=True)
@@ -108,6 +146,13 @@ def main(run_config: RunConfig = None):
     return beam_model, observer, results, output_dir, timestamp
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Satellite RFI window analysis using the settings in config.py.")
+    parser.add_argument("--campaign", nargs=2, metavar=("DATE_BEGIN", "DATE_END"),
+                        help="rank every night between two ISO dates (inclusive) instead of analysing one window")
+    args = parser.parse_args()
+    if args.campaign:
+        run_campaign(*args.campaign)
+        raise SystemExit
     beam_model, observer, results, output_dir, timestamp = main()
     animate = input("Would you like to save the animation? (y/n): ").strip().lower() == 'y'
     if animate:     
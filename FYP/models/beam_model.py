@@ -112,4 +112,20 @@ class BeamModel:
         gain = self.airy_gain(theta_deg)
         if gain >= self.threshold:
             return gain * 100
-        return None
\ No newline at end of file
+        return None
+
+    def interference_gains(self, theta_deg: np.ndarray) -> np.ndarray:
+        """
+        Vectorised interference_gain(): gain percentages for an array of
+        offsets, NaN where the gain is below the interference cutoff.
+
+        :param theta_deg: Angular separations from boresight in degrees.
+        :returns: Array of gain percentages matching theta_deg.
+        """
+        theta_deg = np.asarray(theta_deg, dtype=float)
+        if self.bypass or self.wavelength == 0:
+            return np.full(theta_deg.shape, 100.0)
+        x = np.pi * self.diameter * np.sin(np.radians(theta_deg)) / self.wavelength
+        with np.errstate(divide='ignore', invalid='ignore'):
+            gain = np.where(np.isclose(x, 0), 1.0, (2 * j1(x) / x) ** 2)
+        return np.where(gain >= self.threshold, gain * 100, np.nan)
@@ -0,0 +1,78 @@
+import pytest
+from datetime import datetime, timedelta, timezone
+import numpy as np
+from conftest import StaticObserver, make_run_config, static_observer
+from core.batch_runner import BatchRunner, run_batch, write_batches
+from core.observer import TargetTrack
+from core.tle_catalogue import read_tle_file
+from core.window_analyser import WindowAnalyser
+
+TIME_BEGIN = "2026-04-06T19:00:00"
+TIME_END = "2026-04-06T19:10:00"
+
+
+# --- Helpers ---
+
+def make_config():
+    return make_run_config(time_end=TIME_END, propagation_backend="native", result_cache=False)
+
+key = lambda row: (row["time_utc"], row["satellite"])
+
+
+# --- Batching ---
+
+def test_write_batches_partitions_catalogue(tle_subset, tmp_path):
+    batches = write_batches(tle_subset, 64, tmp_path)
+    assert [count for _, count in batches] == [64, 64, 64, 8]
+    joined = [entry for path, _ in batches for entry in read_tle_file(path)]
+    assert joined == read_tle_file(tle_subset)
+
+def test_invalid_batch_size():
+    with pytest.raises(ValueError):
+        BatchRunner(make_config(), "unused.tle", batch_size=0)
+
+def test_in_flight_cap_is_honoured():
+    runner = BatchRunner(make_config(), "unused.tle", max_workers=4, max_in_flight=1)
+    assert runner.max_in_flight == 1
+
+def test_invalid_in_flight_cap():
+    with pytest.raises(ValueError):
+        BatchRunner(make_config(), "unused.tle", max_in_flight=0)
+
+def test_target_track_nearest_sample():
+    observer = StaticObserver(0.0, 180.0, 5)
+    observer.target_alts = np.arange(5.0)
+    track = TargetTrack.of(observer, TIME_BEGIN, "2026-04-06T19:00:05")
+    begin = datetime.fromisoformat(TIME_BEGIN)
+    assert track.get_target_position(begin + timedelta(seconds=1.4))[0] == 1.0
+    assert track.get_target_position(begin + timedelta(seconds=1.5))[0] == 1.0
+    assert track.get_target_position((begin + timedelta(seconds=2.6)).replace(tzinfo=timezone.utc))[0] == 3.0
+    assert track.get_target_position(begin + timedelta(seconds=60))[0] == 4.0
+
+
+# --- End to end ---
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_batched_run_matches_single_pass(tle_subset, workers):
+    config = make_config()
+    single = run_batch(config, tle_subset, 0, 200, static_observer(config)).results
+    assert single
+
+    runner = BatchRunner(
+        config, tle_subset, batch_size=30, max_workers=workers, max_in_flight=2,
+        observer_factory=static_observer,
+    )
+    results, analyser = runner.run()
+    assert sorted(map(key, results)) == sorted(map(key, single))
+    assert runner.peak_in_flight <= 2
+    expected = WindowAnalyser(single, TIME_BEGIN, TIME_END).clean_stretches()
+    assert analyser.clean_stretches() == expected
+
+def test_observer_built_once_per_run(tle_subset):
+    built = []
+    def factory(run_config):
+        built.append(run_config)
+        return static_observer(run_config)
+
+    BatchRunner(make_config(), tle_subset, batch_size=50, max_workers=2, observer_factory=factory).run()
+    assert len(built) == 1
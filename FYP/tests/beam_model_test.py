@@ -81,4 +81,12 @@ def test_interference_gain_bypass_returns_100_at_boresight(bypass_beam):
 
 def test_interference_gain_within_prefilter_not_none(standard_beam):
     # just inside the prefilter radius should return a value
-    assert standard_beam.interference_gain(standard_beam.prefilter_radius_deg * 0.5) is not None
\ No newline at end of file
+    assert standard_beam.interference_gain(standard_beam.prefilter_radius_deg * 0.5) is not None
+
+def test_interference_gains_matches_scalar(standard_beam):
+    thetas = np.array([0.0, 0.5, standard_beam.fwhm_deg, standard_beam.prefilter_radius_deg * 0.9,
+                       standard_beam.prefilter_radius_deg + 1.0])
+    gains = standard_beam.interference_gains(thetas)
+    for theta, gain in zip(thetas, gains):
+        expected = standard_beam.interference_gain(theta)
+        assert np.isnan(gain) if expected is None else gain == pytest.approx(expected)
@@ -0,0 +1,95 @@
+import pytest
+from conftest import make_run_config, static_observer, write_tle_subset
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from core.campaign_planner import (
+    CampaignBlock, CampaignPlanner, CampaignResult, NightlyWindow, NightResult, plan_nights, target_altitude_deg,
+)
+
+SHORT_NIGHT = NightlyWindow(start_utc="19:00", hours=1 / 6, min_minutes=5)
+
+
+# --- Helpers ---
+
+def make_config(**changes):
+    return make_run_config(propagation_backend="native", result_cache=False, stale_policy="keep", **changes)
+
+def night_result(night, best, clean):
+    block = CampaignBlock(f"{night}T19:00:00", f"{night}T19:05:00", best, best)
+    return NightResult(night, f"{night}T19:00:00", f"{night}T19:10:00", 0, clean, [block] if best else [])
+
+
+# --- Planning ---
+
+def test_fixed_nightly_window_runs_past_midnight():
+    nights = plan_nights(make_config(), "2026-04-06", "2026-04-08", NightlyWindow(start_utc="22:00", hours=4))
+    assert [n.night for n in nights] == ["2026-04-06", "2026-04-07", "2026-04-08"]
+    assert (nights[0].time_begin, nights[0].time_end) == ("2026-04-06T22:00:00", "2026-04-07T02:00:00")
+
+def test_altitude_window_follows_sidereal_time():
+    config = make_config(azimuth_deg=None, altitude_deg=None, ra_hours=19.983, dec_degrees=40.733)
+    window = NightlyWindow(start_utc="00:00", hours=24, min_altitude_deg=30)
+    nights = plan_nights(config, "2026-04-06", "2026-04-07", window)
+    assert len(nights) == 2
+    begins = [datetime.fromisoformat(n.time_begin) for n in nights]
+    #a fixed RA/Dec rises about 3m56s earlier each day
+    assert abs((begins[1] - begins[0]) - timedelta(minutes=1436)) <= timedelta(minutes=1)
+
+    times = [datetime.fromisoformat(nights[0].time_begin).replace(tzinfo=timezone.utc)]
+    assert target_altitude_deg(config, times)[0] == pytest.approx(30, abs=0.5)
+
+def test_target_never_high_enough_skips_nights():
+    config = make_config(azimuth_deg=None, altitude_deg=None, ra_hours=6.0, dec_degrees=-60.0)
+    assert plan_nights(config, "2026-04-06", "2026-04-07", NightlyWindow(min_altitude_deg=30)) == []
+    with pytest.raises(ValueError):
+        plan_nights(config, "2026-04-07", "2026-04-06", NightlyWindow())
+
+
+# --- Ranking ---
+
+def test_ranked_table_orders_by_best_block():
+    campaign = CampaignResult([night_result("2026-04-06", 120, 500), night_result("2026-04-07", 300, 400),
+                               night_result("2026-04-08", 0, 0)], planned=4)
+    assert [n.night for n in campaign.ranked()] == ["2026-04-07", "2026-04-06", "2026-04-08"]
+    assert campaign.best_blocks(1)[0][0] == "2026-04-07"
+    table = campaign.table(limit=2)
+    assert "3 of 4 evaluated" in table and "... and 1 lower-ranked nights" in table
+
+
+# --- End to end ---
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_campaign_runs_and_resumes(tle_subset, tmp_path, workers):
+    progress = tmp_path / "campaign.jsonl"
+    planner = CampaignPlanner(make_config(), tle_subset, "2026-04-06", "2026-04-07", SHORT_NIGHT,
+                              progress_path=progress, max_workers=workers, observer_factory=static_observer)
+    first = planner.run()
+    assert [n.night for n in first.nights] == ["2026-04-06", "2026-04-07"]
+    assert all(n.blocks and n.clean_seconds <= 600 for n in first.nights)
+
+    #an interrupted write leaves a torn line, which is ignored on resume
+    with open(progress, "a") as f:
+        f.write('{"key": "')
+    seen = []
+    extended = CampaignPlanner(make_config(), tle_subset, "2026-04-06", "2026-04-08", SHORT_NIGHT,
+                               progress_path=progress, max_workers=workers, observer_factory=static_observer)
+    resumed = extended.run(on_night=lambda result, done, total: seen.append((result.night, done, total)))
+    assert seen == [("2026-04-08", 3, 3)]
+    assert resumed.nights[:2] == first.nights
+
+def test_changed_settings_do_not_resume(tle_subset, tmp_path):
+    progress = tmp_path / "campaign.jsonl"
+    args = (tle_subset, "2026-04-06", "2026-04-06", SHORT_NIGHT)
+    CampaignPlanner(make_config(), *args, progress_path=progress, observer_factory=static_observer).run()
+    changed = CampaignPlanner(make_config(gain_cutoff_percent=10.0), *args, progress_path=progress,
+                              observer_factory=static_observer)
+    assert changed.completed() == {}
+
+def test_fingerprint_follows_catalogue_contents(tle_subset, tmp_path):
+    copy = tmp_path / "copy.tle"
+    copy.write_text(Path(tle_subset).read_text())
+    args = ("2026-04-06", "2026-04-06", SHORT_NIGHT)
+    key = CampaignPlanner(make_config(), tle_subset, *args).key
+    assert CampaignPlanner(make_config(), str(copy), *args).key == key
+    write_tle_subset(Path(tle_subset), 20)
+    assert CampaignPlanner(make_config(), tle_subset, *args).key != key
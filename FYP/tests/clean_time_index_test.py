@@ -0,0 +1,76 @@
+import numpy as np
+import pytest
+from datetime import datetime, timedelta, timezone
+from core.clean_time_index import CleanTimeIndex
+
+# --- Helpers ---
+
+TIME_BEGIN = "2026-01-01T10:00:00"
+TIME_END   = "2026-01-01T10:10:00"
+
+def dt(time_str: str) -> datetime:
+    return datetime.fromisoformat(f"2026-01-01T{time_str}").replace(tzinfo=timezone.utc)
+
+def rows(satellite: str, first: str, seconds: int, gain: float = 50.0) -> list[dict]:
+    start = dt(first)
+    return [{"time_utc": (start + timedelta(seconds=s)).isoformat(), "satellite": satellite, "gain_percent": gain + s}
+            for s in range(seconds)]
+
+@pytest.fixture
+def index():
+    #SAT-A 10:01:00-10:01:09, SAT-B 10:01:05-10:01:24 and 10:06:00-10:06:02
+    results = rows("SAT-A", "10:01:00", 10) + rows("SAT-B", "10:01:05", 20, 10.0) + rows("SAT-B", "10:06:00", 3)
+    return CleanTimeIndex.from_results(results, TIME_BEGIN, TIME_END)
+
+
+# --- Clean-time queries ---
+
+def test_point_and_range(index):
+    assert index.is_clean("2026-01-01T10:00:59")
+    assert not index.is_clean(dt("10:01:20"))
+    assert index.is_range_clean("2026-01-01T10:02:00", "2026-01-01T10:05:59")
+    assert not index.is_range_clean("2026-01-01T10:02:00", "2026-01-01T10:06:00")
+    assert index.stretch_at(dt("10:03:00")).start == dt("10:01:25")
+    assert index.stretch_at(dt("10:01:00")) is None
+
+def test_next_clean(index):
+    assert index.next_clean(dt("10:03:00"), 120).start == dt("10:03:00")
+    assert index.next_clean(dt("10:05:00"), 120).start == dt("10:06:03")
+    assert index.next_clean(dt("10:05:00"), 230).end == dt("10:10:00")
+    assert index.next_clean(dt("10:05:00"), 600) is None
+
+def test_next_clean_matches_linear_scan():
+    rng = np.random.default_rng(7)
+    flagged = np.flatnonzero(rng.random(601) < 0.3)
+    results = [{"time_utc": (dt("10:00:00") + timedelta(seconds=int(o))).isoformat(), "satellite": "X", "gain_percent": 1.0}
+               for o in flagged]
+    index = CleanTimeIndex.from_results(results, TIME_BEGIN, TIME_END)
+    stretches = sorted(index.analyser.clean_stretches(), key=lambda s: s.start)
+    for after in range(0, 600, 17):
+        t = dt("10:00:00") + timedelta(seconds=after)
+        for need in (0, 3, 8):
+            expected = next(((max(s.start, t), s.end) for s in stretches
+                             if s.end >= t and (s.end - max(s.start, t)).total_seconds() >= need), None)
+            got = index.next_clean(t, need)
+            assert (got.start, got.end) == expected if got else expected is None
+
+def test_outside_window_raises(index):
+    with pytest.raises(ValueError):
+        index.is_clean("2026-01-01T09:59:59")
+
+
+# --- Interference queries ---
+
+def test_interferers_at_sorted_by_gain(index):
+    assert index.interferers_at(dt("10:01:06")) == [("SAT-A", 56.0), ("SAT-B", 11.0)]
+    assert index.interferers_at(dt("10:00:00")) == []
+
+def test_interferers_between_and_per_satellite(index):
+    hits = index.interferers_between(dt("10:01:20"), dt("10:06:00"))
+    assert [(h.satellite, h.start, h.end) for h in hits] == [
+        ("SAT-B", dt("10:01:05"), dt("10:01:24")),
+        ("SAT-B", dt("10:06:00"), dt("10:06:02")),
+    ]
+    assert hits[0].peak_gain_percent == 29.0
+    assert len(index.intervals_for("SAT-B")) == 2
+    assert index.intervals_for("SAT-Z") == []
@@ -0,0 +1,106 @@
+import threading
+from collections import namedtuple
+import numpy as np
+import pytest
+from conftest import SITE, make_run_config, write_tle_subset
+from datetime import date, datetime, timezone
+import core.ephemeris_store as ephemeris_store
+import core.sky_track as sky_track
+from core.ephemeris_store import EphemerisStore, ephemeris_views
+from core.sky_track import SkyTrack, sky_track_for
+
+DAY = date(2026, 4, 6)
+DiskUsage = namedtuple("DiskUsage", "total used free", defaults=(0, 0, 0))
+
+
+# --- Helpers ---
+
+@pytest.fixture(autouse=True)
+def store_dir(tmp_path, monkeypatch):
+    path = tmp_path / "ephemeris"
+    path.mkdir()
+    monkeypatch.setattr(ephemeris_store, "ephemeris_dir", lambda: path)
+    monkeypatch.setattr(sky_track, "_last", None)
+    return path
+
+def utc(hour, minute=0, day=6):
+    return datetime(2026, 4, day, hour, minute, tzinfo=timezone.utc)
+
+def make_config(time_begin="2026-04-06T19:00:00", time_end="2026-04-06T19:10:00"):
+    return make_run_config(time_begin=time_begin, time_end=time_end, ephemeris_store=True, result_cache=False)
+
+
+# --- Store ---
+
+def test_view_is_memmap_slice_filled_lazily(tmp_path):
+    store = EphemerisStore.open(write_tle_subset(tmp_path / "a.tle", 20), *SITE, DAY)
+    view = store.view(utc(19), utc(19, 10))
+    assert view.shape == (20, 600, 3)
+    assert isinstance(view, np.memmap) and view.dtype == np.float32
+    assert np.allclose(np.linalg.norm(view, axis=-1), 1.0, atol=1e-5)
+    assert store.filled.tolist() == [h == 19 for h in range(24)]
+
+def test_reopen_does_not_propagate(tmp_path, monkeypatch):
+    tle = write_tle_subset(tmp_path / "a.tle", 20)
+    first = EphemerisStore.open(tle, *SITE, DAY).view(utc(19), utc(19, 10)).copy()
+    monkeypatch.setattr(ephemeris_store, "SatrecArray", lambda *a: pytest.fail("re-propagated"))
+    again = EphemerisStore.open(tle, *SITE, DAY)
+    assert np.array_equal(again.view(utc(19), utc(19, 10)), first)
+    assert again.satellite_index(again.names[3]) == 3
+    assert again.satellite_index(int(again.norad_ids[3])) == 3
+
+def test_new_catalogue_version_replaces_store(tmp_path, store_dir):
+    tle = tmp_path / "a.tle"
+    old = EphemerisStore.open(write_tle_subset(tle, 20), *SITE, DAY).path
+    new = EphemerisStore.open(write_tle_subset(tle, 21), *SITE, DAY)
+    assert len(new) == 21
+    assert not old.exists()
+    assert [p.name for p in store_dir.iterdir()] == [new.path.name]
+
+def test_other_catalogue_store_is_kept(tmp_path, store_dir):
+    first = EphemerisStore.open(write_tle_subset(tmp_path / "a.tle", 5), *SITE, DAY)
+    second = EphemerisStore.open(write_tle_subset(tmp_path / "b.tle", 6), *SITE, DAY)
+    assert first.path.exists() and second.path.exists()
+
+def test_open_refuses_without_disk_space(tmp_path, store_dir, monkeypatch):
+    monkeypatch.setattr(ephemeris_store.shutil, "disk_usage", lambda path: DiskUsage(free=1000))
+    with pytest.raises(RuntimeError, match="GB free"):
+        EphemerisStore.open(write_tle_subset(tmp_path / "a.tle", 5), *SITE, DAY)
+    assert not list(store_dir.iterdir())
+
+def test_concurrent_fills_propagate_each_block_once(tmp_path, monkeypatch):
+    tle = write_tle_subset(tmp_path / "a.tle", 5)
+    stores = [EphemerisStore.open(tle, *SITE, DAY) for _ in range(4)]
+    filled = []
+    fill = EphemerisStore._fill
+    monkeypatch.setattr(EphemerisStore, "_fill", lambda self, blocks: (filled.extend(blocks), fill(self, blocks)))
+    threads = [threading.Thread(target=s.view, args=(utc(19), utc(20, 30))) for s in stores]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert sorted(filled) == [19, 20]
+    assert stores[0].filled.tolist() == [h in (19, 20) for h in range(24)]
+
+def test_views_span_day_boundary(tmp_path):
+    views = ephemeris_views(write_tle_subset(tmp_path / "a.tle", 5), *SITE, utc(23, 55), utc(0, 5, day=7))
+    assert [store.day for store, _ in views] == [DAY, date(2026, 4, 7)]
+    assert [view.shape[1] for _, view in views] == [300, 300]
+
+
+# --- Sky tracks ---
+
+def test_sky_track_from_store_matches_propagation(tmp_path):
+    tle = write_tle_subset(tmp_path / "a.tle", 40)
+    built = SkyTrack.build(make_config(), tle)
+    stored = sky_track_for(make_config(), tle)
+    assert np.array_equal(stored.sat_idx, built.sat_idx)
+    assert np.array_equal(stored.offsets, built.offsets)
+    assert np.allclose(stored.alt_deg, built.alt_deg, atol=1e-3)
+
+def test_sky_track_propagates_when_store_does_not_fit(tmp_path, store_dir, monkeypatch):
+    tle = write_tle_subset(tmp_path / "a.tle", 10)
+    monkeypatch.setattr(ephemeris_store.shutil, "disk_usage", lambda path: DiskUsage(free=1000))
+    track = sky_track_for(make_config(), tle)
+    assert np.array_equal(track.offsets, SkyTrack.build(make_config(), tle).offsets)
+    assert not list(store_dir.iterdir())
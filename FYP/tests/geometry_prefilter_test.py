@@ -0,0 +1,87 @@
+from collections import OrderedDict
+import pytest
+from conftest import make_run_config
+from skyfield.api import EarthSatellite, load, wgs84
+from core import geometry_prefilter
+from core.geometry_prefilter import GeometryPrefilter
+
+GEO_SAT = (
+    "ABS-6",
+    "1 25924U 99053A   26096.21711700 -.00000118  00000+0  00000+0 0  9999",
+    "2 25924   0.0509  90.2111 0003015 307.1165  34.3298  1.00271926 97119",
+)
+LOW_INCLINATION_SAT = (
+    "NUSTAR",
+    "1 38358U 12031A   26096.25002315  .00003715  00000+0  18025-3 0  9999",
+    "2 38358   6.0256 213.4692 0006998 120.9862 290.6116 15.08113094  1306",
+)
+TIME_END = "2026-04-06T20:00:00"
+
+
+# --- Helpers ---
+
+def write_tle(tmp_path, *sats):
+    path = tmp_path / "sats.tle"
+    path.write_text("".join(f"{n}\n{l1}\n{l2}\n" for n, l1, l2 in sats))
+    return str(path)
+
+def make_config(latitude, alt, az):
+    return make_run_config(latitude=latitude, time_end=TIME_END, altitude_deg=alt, azimuth_deg=az)
+
+def geo_altaz(latitude):
+    ts = load.timescale()
+    sat = EarthSatellite(GEO_SAT[1], GEO_SAT[2], GEO_SAT[0], ts)
+    alt, az, _ = (sat - wgs84.latlon(latitude, -121.4, elevation_m=986)).at(ts.utc(2026, 4, 6, 19, 30)).altaz()
+    return alt.degrees, az.degrees
+
+
+# --- Tests ---
+
+def test_geo_far_from_pointing_is_pruned(tmp_path):
+    alt, az = geo_altaz(40.8)
+    tle = write_tle(tmp_path, GEO_SAT)
+    result = GeometryPrefilter(make_config(40.8, 30.0, (az + 180) % 360), tle, radius_deg=5.0).run()
+    assert result.survivors == 0
+    assert result.pruned["sky_track"] == 1
+
+def test_geo_at_pointing_is_kept(tmp_path):
+    alt, az = geo_altaz(40.8)
+    tle = write_tle(tmp_path, GEO_SAT)
+    result = GeometryPrefilter(make_config(40.8, alt, az), tle, radius_deg=1.0).run()
+    assert result.survivors == 1
+    assert 25924 in result.satellite_numbers
+
+def test_low_inclination_pruned_at_high_latitude(tmp_path):
+    tle = write_tle(tmp_path, LOW_INCLINATION_SAT)
+    result = GeometryPrefilter(make_config(60.0, 45.0, 180.0), tle, radius_deg=5.0).run()
+    assert result.pruned["inclination"] == 1
+
+def test_low_inclination_kept_near_equator(tmp_path):
+    tle = write_tle(tmp_path, LOW_INCLINATION_SAT)
+    result = GeometryPrefilter(make_config(5.0, 45.0, 180.0), tle, radius_deg=5.0).run()
+    assert result.survivors == 1
+
+def test_tracking_without_observer_skips_sky_track(tmp_path):
+    tle = write_tle(tmp_path, GEO_SAT)
+    config = make_config(40.8, 45.0, 180.0)
+    config.azimuth_deg = config.altitude_deg = None
+    config.ra_hours, config.dec_degrees = 19.98, 40.73
+    result = GeometryPrefilter(config, tle, radius_deg=5.0).run()
+    assert result.survivors == 1
+    assert result.pruned["sky_track"] == 0
+
+def test_summary_lists_reasons(tmp_path):
+    tle = write_tle(tmp_path, GEO_SAT, LOW_INCLINATION_SAT)
+    result = GeometryPrefilter(make_config(60.0, 45.0, 180.0), tle, radius_deg=5.0).run()
+    summary = result.summary()
+    for reason in ("decayed", "inclination", "sky_track"):
+        assert reason in summary
+
+def test_result_cache_is_bounded(tmp_path, monkeypatch):
+    monkeypatch.setattr(geometry_prefilter, "MAX_CACHED_RESULTS", 2)
+    monkeypatch.setattr(geometry_prefilter, "_cache", OrderedDict())
+    tle = write_tle(tmp_path, LOW_INCLINATION_SAT)
+    for az in (0.0, 90.0, 180.0):
+        GeometryPrefilter(make_config(40.8, 45.0, az), tle, radius_deg=5.0).run()
+    pointings = [key[6] for key in geometry_prefilter._cache]
+    assert pointings == [(45.0, 90.0), (45.0, 180.0)]
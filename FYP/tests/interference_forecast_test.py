@@ -0,0 +1,88 @@
+import numpy as np
+import pytest
+from sgp4.api import Satrec
+from conftest import make_run_config, static_observer
+from core.checker import InterferenceChecker
+from core.interference_forecast import AlongTrackErrorModel, ForecastResult, InterferenceForecast
+from core.native_propagator import NativePropagator, read_tle_file, teme_to_enu, time_grid
+from core.propagation_service import PropagationService
+from core.sharded_runner import make_beam_model
+from core.window_analyser import WindowAnalyser
+
+TIME_BEGIN = "2026-04-06T19:00:00"
+TIME_END = "2026-04-06T19:20:00"
+TLE_COUNT = 500
+
+
+# --- Helpers ---
+
+@pytest.fixture
+def config():
+    return make_run_config(time_end=TIME_END, propagation_backend="native", result_cache=False, stale_policy="keep")
+
+def forecast(config, tle_file, **options):
+    return InterferenceForecast(make_beam_model(config), config, tle_file, static_observer(config), **options).run()
+
+
+# --- Error model ---
+
+def test_error_grows_with_element_age():
+    model = AlongTrackErrorModel(base_km=1.0, km_per_day=2.0, km_per_day2=0.5)
+    assert model.sigma_km([0, -2, 4]).tolist() == [1.0, 7.0, 17.0]
+
+
+# --- Forecast ---
+
+def test_exact_elements_match_nominal_check(config, tle_subset):
+    beam_model, observer = make_beam_model(config), static_observer(config)
+    results = InterferenceChecker(beam_model, observer).check(NativePropagator(beam_model, config, tle_subset, observer).run())
+    nominal = WindowAnalyser(results, TIME_BEGIN, TIME_END).occupancy[:-1]
+    exact = forecast(config, tle_subset, error_model=AlongTrackErrorModel(0, 0, 0), realizations=1)
+    assert nominal.any()
+    assert np.array_equal(exact.probability > 0, nominal)
+    assert set(exact.probability) <= {0.0, 1.0}
+
+def test_prediction_error_spreads_probability(config, tle_subset):
+    loose = AlongTrackErrorModel(base_km=50.0, km_per_day=0.0)
+    first = forecast(config, tle_subset, error_model=loose, realizations=100, seed=3)
+    again = forecast(config, tle_subset, error_model=loose, realizations=100, seed=3)
+    assert np.array_equal(first.probability, again.probability)
+    uncertain = (first.probability > 0) & (first.probability < 1)
+    assert uncertain.any()
+    assert (first.expected_interferers >= first.probability - 1e-12).all()
+    assert (first.probability >= 0.05).sum() >= (first.probability >= 0.95).sum()
+    assert "P >= 50%" in first.summary()
+
+def test_realizations_shift_satellite_not_earth(config, tle_subset, monkeypatch):
+    import core.interference_forecast as interference_forecast
+    thetas = []
+    def recording(r, theta, *frame):
+        thetas.append(theta)
+        return teme_to_enu(r, theta, *frame)
+    monkeypatch.setattr(interference_forecast, "teme_to_enu", recording)
+
+    engine = InterferenceForecast(make_beam_model(config), config, tle_subset, static_observer(config), realizations=4)
+    satrec = Satrec.twoline2rv(*read_tle_file(tle_subset)[0][1:])
+    seconds, _ = engine._realize(satrec, np.array([300]), sigma=30.0)
+    nominal = time_grid(engine.begin, seconds)[2]
+    assert np.array_equal(thetas[-1].reshape(4, len(seconds)), np.tile(nominal, (4, 1)))
+
+def test_analyser_thresholds_probability():
+    probability = np.zeros(600)
+    probability[100:160] = 0.3
+    probability[120:140] = 0.9
+    result = ForecastResult("2026-04-06T19:00:00", "2026-04-06T19:10:00", probability, probability)
+    assert result.analyser(0.5).occupancy.sum() == 20
+    assert result.analyser(0.2).occupancy.sum() == 60
+    with pytest.raises(ValueError):
+        result.analyser(0)
+
+def test_invalid_realizations(config, tle_subset):
+    with pytest.raises(ValueError):
+        InterferenceForecast(make_beam_model(config), config, tle_subset, None, realizations=0)
+
+def test_service_forecast_reuses_intermediates(config, tle_subset):
+    service = PropagationService(observer_factory=static_observer)
+    result = service.forecast(config, tle_subset, realizations=20)
+    assert len(result.probability) == 1200
+    assert result.realizations == 20
@@ -0,0 +1,126 @@
+import pytest
+from conftest import ACTIVE_TLE, make_run_config
+import numpy as np
+from sgp4.api import Satrec
+from skyfield.api import EarthSatellite, load, wgs84
+from core.native_propagator import NativePropagator, read_tle_file, altaz_to_enu, max_angular_rate_deg
+from core.runner_factory import create_runner
+from core.sopp_runner import SOPPRunner
+from models.beam_model import BeamModel
+
+TIME_BEGIN = "2026-04-06T19:00:00"
+TIME_END = "2026-04-06T19:05:00"
+TLE_COUNT = 40
+
+
+# --- Helpers ---
+
+def skyfield_altaz(tle_file, index, seconds):
+    name, l1, l2 = read_tle_file(tle_file)[index]
+    ts = load.timescale()
+    sat = EarthSatellite(l1, l2, name, ts)
+    site = wgs84.latlon(40.8, -121.4, elevation_m=986)
+    alt, az, _ = (sat - site).at(ts.utc(2026, 4, 6, 19, 0, seconds)).altaz()
+    return alt.degrees, az.degrees
+
+def make_config(alt, az, backend="native"):
+    return make_run_config(time_end=TIME_END, altitude_deg=alt, azimuth_deg=az, propagation_backend=backend)
+
+def pointing_at_satellite(tle_file):
+    # point at whichever subset satellite is highest 60s into the window
+    best = max(range(40), key=lambda i: skyfield_altaz(tle_file, i, 60)[0])
+    return skyfield_altaz(tle_file, best, 60)
+
+
+# --- Tests ---
+
+def test_read_tle_file_skips_malformed_lines(tmp_path):
+    lines = ACTIVE_TLE.read_text().splitlines()[:6]
+    path = tmp_path / "bad.tle"
+    path.write_text("\n".join(["", lines[0], lines[1], lines[2], "garbage", *lines[3:]]) + "\n")
+    entries = read_tle_file(str(path))
+    assert len(entries) == 2
+    assert entries[1][1].startswith("1 ")
+
+def test_positions_match_skyfield(tle_subset):
+    alt, az = pointing_at_satellite(tle_subset)
+    beam = BeamModel(dish_diameter_m=20.0, frequency_hz=135e6)
+    propagator = NativePropagator(beam, make_config(alt, az), tle_subset, observer=None)
+    events = propagator.run()
+    assert events
+    for event in events:
+        index = [n for n, _, _ in read_tle_file(tle_subset)].index(event.satellite.name)
+        for pt in event.positions[::10]:
+            offset = (pt.time - propagator.begin).total_seconds()
+            sky_alt, sky_az = skyfield_altaz(tle_subset, index, offset)
+            assert pt.position.altitude == pytest.approx(sky_alt, abs=1e-6)
+            assert pt.position.azimuth == pytest.approx(sky_az, abs=1e-6)
+
+def test_events_are_contiguous_and_inside_cone(tle_subset):
+    alt, az = pointing_at_satellite(tle_subset)
+    beam = BeamModel(dish_diameter_m=20.0, frequency_hz=135e6)
+    events = NativePropagator(beam, make_config(alt, az), tle_subset, observer=None).run()
+    target = altaz_to_enu(alt, az)
+    for event in events:
+        times = [pt.time for pt in event.positions]
+        assert all((b - a).total_seconds() == 1 for a, b in zip(times, times[1:]))
+        for pt in event.positions:
+            sat = altaz_to_enu(pt.position.altitude, pt.position.azimuth)
+            sep = np.degrees(np.arccos(np.clip(sat @ target, -1, 1)))
+            assert sep <= beam.prefilter_radius_deg + 1e-9
+            assert pt.position.altitude >= 0
+
+def test_empty_catalogue_raises(tmp_path):
+    path = tmp_path / "empty.tle"
+    path.write_text("")
+    beam = BeamModel(dish_diameter_m=20.0, frequency_hz=135e6)
+    with pytest.raises(RuntimeError):
+        NativePropagator(beam, make_config(45.0, 180.0), str(path), observer=None).run()
+
+def test_factory_selects_backend(tle_subset):
+    beam = BeamModel(dish_diameter_m=20.0, frequency_hz=135e6)
+    native = create_runner(beam, make_config(45.0, 180.0, "native"), tle_subset, observer=None)
+    sopp = create_runner(beam, make_config(45.0, 180.0, "sopp"), tle_subset, observer=None)
+    assert isinstance(native, NativePropagator)
+    assert isinstance(sopp, SOPPRunner)
+
+def test_factory_rejects_unknown_backend(tle_subset):
+    beam = BeamModel(dish_diameter_m=20.0, frequency_hz=135e6)
+    with pytest.raises(ValueError):
+        create_runner(beam, make_config(45.0, 180.0, "bogus"), tle_subset, observer=None)
+
+
+# --- coarse-to-fine ---
+
+@pytest.mark.parametrize("step", [30, 60])
+def test_coarse_to_fine_matches_full_resolution(tle_subset, step):
+    alt, az = pointing_at_satellite(tle_subset)
+    beam = BeamModel(dish_diameter_m=20.0, frequency_hz=135e6)
+    full_config = make_config(alt, az)
+    coarse_config = make_config(alt, az)
+    coarse_config.coarse_step_seconds = step
+    full = NativePropagator(beam, full_config, tle_subset, observer=None).run()
+    coarse = NativePropagator(beam, coarse_config, tle_subset, observer=None).run()
+    assert full
+    as_rows = lambda events: [
+        (e.satellite.name, pt.time, pt.position.altitude, pt.position.azimuth)
+        for e in events for pt in e.positions
+    ]
+    assert as_rows(full) == as_rows(coarse)
+
+def test_screen_drops_far_satellites(tle_subset):
+    beam = BeamModel(dish_diameter_m=20.0, frequency_hz=135e6)
+    propagator = NativePropagator(beam, make_config(45.0, 180.0), tle_subset, observer=None)
+    satrecs = [Satrec.twoline2rv(l1, l2) for _, l1, l2 in read_tle_file(tle_subset)]
+    windows = propagator.screen(satrecs, 60)
+    assert len(windows) < len(satrecs)
+    assert all(np.all(np.diff(w) > 0) for w in windows.values())
+
+def test_angular_rate_bound_is_positive(tle_subset):
+    beam = BeamModel(dish_diameter_m=20.0, frequency_hz=135e6)
+    propagator = NativePropagator(beam, make_config(45.0, 180.0), tle_subset, observer=None)
+    satrecs = [Satrec.twoline2rv(l1, l2) for _, l1, l2 in read_tle_file(tle_subset)]
+    rates = max_angular_rate_deg(satrecs, np.linalg.norm(propagator._site))
+    assert np.all(rates > 0)
+    # even GEO moves ~0.004 deg/s relative to a tracked target; the bound must exceed that
+    assert np.all(rates[np.isfinite(rates)] > 0.004)
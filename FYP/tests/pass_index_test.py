@@ -0,0 +1,155 @@
+import pytest
+from conftest import ACTIVE_TLE, SITE, make_run_config
+import numpy as np
+from datetime import date, datetime, timezone
+from pathlib import Path
+from skyfield.api import EarthSatellite, load, wgs84
+import core.pass_index as pass_index
+from core.pass_index import PassIndex, above_horizon_windows, SECONDS_PER_DAY
+from core.native_propagator import NativePropagator, read_tle_file
+from models.beam_model import BeamModel
+
+GEO_SAT = (
+    "ABS-6",
+    "1 25924U 99053A   26096.21711700 -.00000118  00000+0  00000+0 0  9999",
+    "2 25924   0.0509  90.2111 0003015 307.1165  34.3298  1.00271926 97119",
+)
+DAY = date(2026, 4, 6)
+TLE_COUNT = 12
+
+
+# --- Helpers ---
+
+@pytest.fixture(autouse=True)
+def index_dir(tmp_path, monkeypatch):
+    path = tmp_path / "pass_index"
+    path.mkdir()
+    monkeypatch.setattr(pass_index, "pass_index_dir", lambda: path)
+    return path
+
+def skyfield_up(tle_file, index):
+    name, l1, l2 = read_tle_file(tle_file)[index]
+    ts = load.timescale()
+    sat = EarthSatellite(l1, l2, name, ts)
+    site = wgs84.latlon(*SITE[:2], elevation_m=SITE[2])
+    t = ts.utc(DAY.year, DAY.month, DAY.day, 0, 0, np.arange(SECONDS_PER_DAY + 1))
+    return (sat - site).at(t).altaz()[0].degrees >= 0
+
+def index_up(index, sat):
+    up = np.zeros(SECONDS_PER_DAY + 1, dtype=bool)
+    rows = index.sat_index == sat
+    for rise, set_ in zip(index.rise[rows], index.set[rows]):
+        up[rise:set_ + 1] = True
+    return up
+
+def make_config(alt, az, time_begin, time_end):
+    return make_run_config(time_begin=time_begin, time_end=time_end, altitude_deg=alt, azimuth_deg=az,
+                           propagation_backend="native", geometry_prefilter=False)
+
+
+# --- Tests ---
+
+def test_intervals_match_skyfield_to_the_second(tle_subset):
+    index = PassIndex.build(tle_subset, *SITE, DAY)
+    assert len(index) > 0
+    for sat in range(len(read_tle_file(tle_subset))):
+        assert np.array_equal(index_up(index, sat), skyfield_up(tle_subset, sat))
+
+def test_culmination_lies_inside_its_pass(tle_subset):
+    index = PassIndex.build(tle_subset, *SITE, DAY)
+    assert np.all(index.rise <= index.culminate)
+    assert np.all(index.culminate <= index.set)
+    assert np.all(index.max_alt >= 0)
+
+def test_up_at_matches_interval_scan(tle_subset):
+    index = PassIndex.build(tle_subset, *SITE, DAY)
+    for second in range(0, SECONDS_PER_DAY, 997):
+        t = index.day_start.replace(hour=second // 3600, minute=second // 60 % 60, second=second % 60)
+        expected = np.unique(index.sat_index[(index.rise <= second) & (index.set >= second)])
+        assert np.array_equal(index.up_at(t), expected)
+
+def test_geo_is_up_all_day(tmp_path):
+    path = tmp_path / "geo.tle"
+    path.write_text("".join(f"{line}\n" for line in GEO_SAT))
+    # ABS-6 sits near 159E
+    index = PassIndex.build(str(path), 35.0, 150.0, 0, DAY)
+    assert len(index) == 1
+    assert (index.rise[0], index.set[0]) == (0, SECONDS_PER_DAY)
+    assert list(index.up_at(datetime(2026, 4, 6, 12, tzinfo=timezone.utc))) == [0]
+
+def test_index_is_persisted_and_reused(tle_subset, index_dir, monkeypatch):
+    built = PassIndex.load_or_build(tle_subset, *SITE, DAY)
+    assert len(list(index_dir.glob("*.npz"))) == 1
+    monkeypatch.setattr(PassIndex, "build", classmethod(lambda *a: pytest.fail("rebuilt cached index")))
+    loaded = PassIndex.load_or_build(tle_subset, *SITE, DAY)
+    assert np.array_equal(loaded.rise, built.rise)
+    assert np.array_equal(loaded.sat_index, built.sat_index)
+    assert loaded.day == DAY
+
+def test_windows_stitch_across_midnight(tle_subset):
+    begin = datetime(2026, 4, 6, 23, 55, tzinfo=timezone.utc)
+    windows = above_horizon_windows(tle_subset, *SITE, begin, 600)
+    for sat, offsets in windows.items():
+        assert np.all(np.diff(offsets) > 0)
+        assert offsets.min() >= 0 and offsets.max() < 600
+    assert any(offsets.max() >= 300 for offsets in windows.values())
+
+@pytest.mark.parametrize("step", [0, 30])
+def test_native_backend_with_pass_index_matches_full_propagation(tle_subset, step):
+    beam = BeamModel(dish_diameter_m=20.0, frequency_hz=135e6)
+    rows = []
+    for use_index in (False, True):
+        config = make_config(45.0, 180.0, "2026-04-06T00:00:00", "2026-04-06T03:00:00")
+        config.coarse_step_seconds = step
+        config.use_pass_index = use_index
+        events = NativePropagator(beam, config, tle_subset, observer=None).run()
+        rows.append([(e.satellite.name, pt.time, pt.position.altitude) for e in events for pt in e.positions])
+    assert rows[0]
+    assert rows[0] == rows[1]
+
+
+# --- Incremental updates ---
+
+def bump_epoch(entry, days=0.5):
+    name, l1, l2 = entry
+    epoch = float(l1[20:32]) + days
+    return name, f"{l1[:20]}{epoch:012.8f}{l1[32:]}", l2
+
+def test_update_repredicts_only_changed_satellites(tmp_path, monkeypatch):
+    entries = read_tle_file(str(ACTIVE_TLE))[:14]
+    old = tmp_path / "old.tle"
+    new = tmp_path / "new.tle"
+    old.write_text("".join(f"{n}\n{a}\n{b}\n" for n, a, b in entries[:12]))
+    changed = entries[1:3] + [bump_epoch(entries[3])] + entries[4:12] + entries[12:14]
+    new.write_text("".join(f"{n}\n{a}\n{b}\n" for n, a, b in changed))
+    expected = PassIndex.build(str(new), *SITE, DAY)
+
+    previous = PassIndex.build(str(old), *SITE, DAY)
+    predicted = []
+    original = PassIndex._predict.__func__
+    def spy(cls, entries, positions, *args):
+        predicted.extend(positions)
+        return original(cls, entries, positions, *args)
+    monkeypatch.setattr(PassIndex, "_predict", classmethod(spy))
+    updated = previous.update(str(new), *SITE)
+
+    # one removed (entries[0]), one updated (entries[3]), two added (entries[12:14])
+    assert sorted(predicted) == [2, 11, 12]
+    as_rows = lambda index: sorted(zip(index.sat_index, index.rise, index.culminate, index.set))
+    assert as_rows(updated) == as_rows(expected)
+
+def test_load_or_build_updates_previous_index_and_removes_it(tle_subset, index_dir, tmp_path):
+    PassIndex.load_or_build(tle_subset, *SITE, DAY)
+    entries = read_tle_file(tle_subset)
+    Path(tle_subset).write_text("".join(f"{n}\n{a}\n{b}\n" for n, a, b in [bump_epoch(entries[0])] + entries[1:]))
+    index = PassIndex.load_or_build(tle_subset, *SITE, DAY)
+    assert len(list(index_dir.glob("*.npz"))) == 1
+    assert index.norad_ids is not None and len(index.norad_ids) == len(entries)
+
+def test_other_catalogue_index_is_kept(tle_subset, index_dir, tmp_path):
+    other = tmp_path / "weather.tle"
+    other.write_text("".join(f"{n}\n{a}\n{b}\n" for n, a, b in read_tle_file(tle_subset)[:4]))
+    PassIndex.load_or_build(tle_subset, *SITE, DAY)
+    PassIndex.load_or_build(str(other), *SITE, DAY)
+    assert len(list(index_dir.glob("subset_*.npz"))) == 1
+    assert len(list(index_dir.glob("weather_*.npz"))) == 1
@@ -0,0 +1,97 @@
+import pytest
+from conftest import make_run_config, static_observer, write_tle_subset
+from pathlib import Path
+from core.checker import InterferenceChecker
+from core.propagation_service import PropagationService
+from core.sopp_runner import SOPPRunner
+from core.tle_catalogue import read_tle_file
+from models.beam_model import BeamModel
+
+
+# --- Helpers ---
+
+TLE_COUNT = 60
+
+def make_config(**overrides):
+    return make_run_config(**{"time_end": "2026-04-06T19:05:00", "concurrency_level": 1, "result_cache": False,
+                              "stale_policy": "keep", **overrides})
+
+
+# --- Warm runs ---
+
+def test_second_run_reuses_intermediates(tle_subset):
+    service = PropagationService(observer_factory=static_observer)
+    cold = service.run(make_config(), tle_subset)
+    assert not cold.timing.warm
+    partly = service.rerun(altitude_deg=30.0, azimuth_deg=90.0)
+    assert partly.timing.reused == {"beam", "catalogue", "satellites"}
+    assert partly.timing.built == {"observer"}
+    assert not partly.timing.warm and "Partly warm run" in partly.timing.summary()
+    warm = service.rerun()
+    assert warm.timing.warm and "Warm run" in warm.timing.summary()
+    assert service.timings == [cold.timing, partly.timing, warm.timing]
+
+def test_identical_prune_for_another_window_reuses_satellites(tle_subset, tmp_path, monkeypatch):
+    import core.tle_catalogue as tle_catalogue
+    monkeypatch.setattr(tle_catalogue, "catalogue_dir", lambda: tmp_path)
+    #a repeated element set makes the catalogue stage write a deduplicated copy
+    lines = Path(tle_subset).read_text().splitlines()
+    Path(tle_subset).write_text("\n".join(lines + lines[:3]) + "\n")
+    service = PropagationService(observer_factory=static_observer)
+    first = service.run(make_config(), tle_subset)
+    later = service.rerun(time_begin="2026-04-06T19:01:00", time_end="2026-04-06T19:06:00")
+    assert "catalogue" in first.timing.built and "catalogue" in later.timing.built
+    assert "satellites" in later.timing.reused
+
+def test_evicted_catalogue_file_is_rebuilt(tle_subset, tmp_path, monkeypatch):
+    import core.tle_catalogue as tle_catalogue
+    monkeypatch.setattr(tle_catalogue, "catalogue_dir", lambda: tmp_path)
+    lines = Path(tle_subset).read_text().splitlines()
+    Path(tle_subset).write_text("\n".join(lines + lines[:3]) + "\n")
+    service = PropagationService(observer_factory=static_observer)
+    service.run(make_config(), tle_subset)
+    [written] = tmp_path.glob("subset_*.tle")
+    written.unlink()
+    again = service.rerun()
+    assert "catalogue" in again.timing.built
+    assert written.exists()
+
+def test_warm_results_match_fresh_runner(tle_subset):
+    service = PropagationService(observer_factory=static_observer)
+    service.run(make_config(), tle_subset)
+    warm = service.rerun(altitude_deg=30.0, azimuth_deg=90.0)
+
+    config = make_config(altitude_deg=30.0, azimuth_deg=90.0)
+    beam = BeamModel(dish_diameter_m=20.0, frequency_hz=135e6)
+    observer = static_observer(config)
+    fresh = InterferenceChecker(beam, observer).check(SOPPRunner(beam, config, tle_subset, observer).run())
+    key = lambda row: (row["time_utc"], row["satellite"], row["gain_percent"])
+    assert sorted(map(key, warm.results)) == sorted(map(key, fresh))
+
+def test_changed_tle_file_is_reparsed(tle_subset):
+    service = PropagationService(observer_factory=static_observer)
+    service.run(make_config(), tle_subset)
+    write_tle_subset(Path(tle_subset), 30)
+    again = service.rerun()
+    assert "satellites" not in again.timing.reused
+    assert "catalogue" not in again.timing.reused
+
+def test_several_tle_files_are_merged(tle_subset, tmp_path, monkeypatch):
+    import core.tle_catalogue as tle_catalogue
+    monkeypatch.setattr(tle_catalogue, "catalogue_dir", lambda: tmp_path)
+    #two groups sharing ten satellites, as overlapping TLEGroup files do
+    lines = Path(tle_subset).read_text().splitlines()
+    first, second = tmp_path / "first.tle", tmp_path / "second.tle"
+    first.write_text("\n".join(lines[:3 * 35]) + "\n")
+    second.write_text("\n".join(lines[3 * 25:]) + "\n")
+
+    service = PropagationService(observer_factory=static_observer)
+    output = service.run(make_config(), [str(first), str(second)])
+    assert service.last_tle_files == [str(first), str(second)]
+    catalogue = service.catalogue(make_config(), [str(first), str(second)], output.timing)
+    assert sorted(read_tle_file(catalogue)) == sorted(read_tle_file(tle_subset))
+    assert "catalogue" in output.timing.reused
+
+def test_rerun_requires_previous_run():
+    with pytest.raises(RuntimeError):
+        PropagationService().rerun(altitude_deg=10.0)
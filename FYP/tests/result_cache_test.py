@@ -0,0 +1,134 @@
+import os
+import time
+import pytest
+from conftest import make_run_config
+from pathlib import Path
+from core.native_propagator import NativePropagator
+from core.sharded_runner import make_beam_model
+from core.result_cache import ResultCache, cached_run, propagation_key, search_radius_deg
+from models.beam_model import BeamModel
+
+TLE_COUNT = 20
+BEAM = BeamModel(dish_diameter_m=20.0, frequency_hz=135e6)
+
+
+# --- Helpers ---
+
+@pytest.fixture
+def cache(tmp_path):
+    return ResultCache(directory=tmp_path / "cache")
+
+class CountingRunner:
+    def __init__(self, run_config, tle_file, beam_model=BEAM):
+        self.run_config = run_config
+        self.tle_file = tle_file
+        self.beam_model = beam_model
+        self.calls = 0
+
+    def run(self):
+        self.calls += 1
+        return [("event", self.calls)]
+
+def make_config(**overrides):
+    return make_run_config(**{"time_end": "2026-04-06T19:05:00", "altitude_deg": 45.0, **overrides})
+
+
+# --- Keys ---
+
+def test_key_ignores_post_propagation_settings(tle_subset):
+    base = propagation_key(CountingRunner(make_config(), tle_subset))
+    assert base == propagation_key(CountingRunner(make_config(gap_tolerance_seconds=5), tle_subset))
+    assert base == propagation_key(CountingRunner(make_config(gain_cutoff_percent=10.0), tle_subset))
+
+@pytest.mark.parametrize("override", [
+    {"altitude_deg": 50.0}, {"latitude": 41.0}, {"time_end": "2026-04-06T19:06:00"},
+    {"propagation_backend": "native"}, {"bypass_airy": True},
+])
+def test_key_changes_with_inputs(tle_subset, override):
+    assert propagation_key(CountingRunner(make_config(), tle_subset)) != \
+        propagation_key(CountingRunner(make_config(**override), tle_subset))
+
+def test_key_changes_with_tle_content(tle_subset):
+    before = propagation_key(CountingRunner(make_config(), tle_subset))
+    Path(tle_subset).write_text("\n".join(Path(tle_subset).read_text().splitlines()[:30]) + "\n")
+    assert propagation_key(CountingRunner(make_config(), tle_subset)) != before
+
+
+def test_radius_follows_cutoff_and_bypass(tle_subset):
+    bypass = make_config(bypass_airy=True)
+    assert search_radius_deg(CountingRunner(bypass, tle_subset, make_beam_model(bypass))) == 1.5
+    assert search_radius_deg(CountingRunner(make_config(), tle_subset)) == pytest.approx(BEAM.prefilter_radius_deg)
+
+
+# --- Cache ---
+
+def test_cached_run_reuses_result(tle_subset, cache):
+    runner = CountingRunner(make_config(), tle_subset)
+    first = cached_run(runner, cache)
+    second = cached_run(runner, cache)
+    assert first == second
+    assert runner.calls == 1
+    assert (cache.hits, cache.misses) == (1, 1)
+    assert "1 hits, 1 misses" in cache.stats()
+
+def test_gain_cutoff_change_hits_cache(tle_subset, cache):
+    def runner(cutoff):
+        beam = BeamModel(dish_diameter_m=20.0, frequency_hz=135e6, gain_cutoff_percent=cutoff)
+        return CountingRunner(make_config(gain_cutoff_percent=cutoff), tle_subset, beam)
+
+    first = runner(3.0)
+    cached_run(first, cache)
+    narrower = runner(5.0)
+    assert cached_run(narrower, cache) == [("event", 1)]
+    assert narrower.calls == 0
+
+    #a wider cone cannot be served by the narrower entry, and replaces it
+    wider = runner(1.0)
+    cached_run(wider, cache)
+    assert wider.calls == 1
+    assert len(list(cache.directory.glob("*.pkl"))) == 1
+    again = runner(3.0)
+    cached_run(again, cache)
+    assert again.calls == 0
+
+def test_bypass_entry_does_not_serve_airy_run(tle_subset, cache):
+    #a manual beamwidth of 1.5x the Airy radius propagates to 0.75x it, which does not cover the Airy run
+    def runner(**overrides):
+        config = make_config(manual_beamwidth_deg=1.5 * BEAM.prefilter_radius_deg, **overrides)
+        return CountingRunner(config, tle_subset, make_beam_model(config))
+
+    bypass, airy = runner(bypass_airy=True), runner()
+    assert bypass.beam_model.prefilter_radius_deg < airy.beam_model.prefilter_radius_deg
+    cached_run(bypass, cache)
+    cached_run(airy, cache)
+    assert (bypass.calls, airy.calls) == (1, 1)
+    assert cache.hits == 0
+
+def test_cached_run_disabled(tle_subset, cache):
+    runner = CountingRunner(make_config(result_cache=False), tle_subset)
+    cached_run(runner, cache)
+    cached_run(runner, cache)
+    assert runner.calls == 2
+
+def test_lru_eviction(tmp_path):
+    cache = ResultCache(directory=tmp_path / "cache", max_mb=1.0)
+    blob = b"x" * 400_000
+    for key in ("a", "b"):
+        cache.put(key, blob)
+    past = time.time() - 60
+    os.utime(cache._path("a"), (past, past))
+    os.utime(cache._path("b"), (past - 10, past - 10))
+    assert cache.get("b") == blob          # refreshes b, leaving a least recently used
+    cache.put("c", blob)
+    assert cache.get("a") is None
+    assert cache.get("b") == blob
+    assert cache.evictions == 1
+    assert cache.size_bytes() <= cache.max_bytes
+
+def test_native_events_round_trip(tle_subset, cache):
+    runner = NativePropagator(BEAM, make_config(propagation_backend="native"), tle_subset, observer=None)
+    fresh = cached_run(runner, cache)
+    cached = cached_run(runner, cache)
+    as_rows = lambda events: [(e.satellite.name, pt.time, pt.position.altitude) for e in events for pt in e.positions]
+    assert as_rows(fresh) == as_rows(cached)
+    assert cache.hits == 1
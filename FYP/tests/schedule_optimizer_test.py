@@ -0,0 +1,100 @@
+import numpy as np
+import pytest
+from functools import lru_cache
+from core.schedule_optimizer import ScheduleOptimizer, slew_matrix
+from core.time_bins import TimeBins
+from core.window_analyser import WindowAnalyser
+
+TIME_BEGIN = "2026-01-01T10:00:00"
+
+
+# --- Helpers ---
+
+def bins_for(n_seconds):
+    return TimeBins.for_window(TIME_BEGIN, f"2026-01-01T10:00:{n_seconds - 1:02d}")
+
+def brute_force(clean, slew, dwell):
+    """Best clean total over every sequence of blocks, by exhaustive search."""
+    n_slots, n = clean.shape
+
+    @lru_cache(maxsize=None)
+    def best(free, prev):
+        value = 0
+        for j in range(n):
+            first = free + (slew[prev][j] if prev >= 0 else 0)
+            for s in range(first, n_slots):
+                for e in range(s + dwell - 1, n_slots):
+                    value = max(value, int(clean[s:e + 1, j].sum()) + best(e + 1, j))
+        return value
+    return best(0, -1)
+
+def mask(pattern):
+    return np.array([c == "#" for c in pattern])
+
+
+# --- Optimisation ---
+
+def test_switches_to_whichever_target_is_clean():
+    bins = bins_for(12)
+    masks = {"A": mask("######......"), "B": mask("......######")}
+    schedule = ScheduleOptimizer(masks, bins).optimise()
+    assert schedule.clean_seconds == 12
+    assert [(b.target, b.clean_seconds) for b in schedule.blocks] == [("A", 6), ("B", 6)]
+    assert schedule.blocks[1].start.second == 6
+
+def test_slew_time_is_spent_off_source():
+    bins = bins_for(12)
+    masks = {"A": mask("######......"), "B": mask("......######")}
+    schedule = ScheduleOptimizer(masks, bins, slew_seconds=2).optimise()
+    assert schedule.clean_seconds == 10
+    first, second = schedule.blocks
+    assert (second.start - first.end).total_seconds() >= 2
+
+def test_min_dwell_skips_short_clean_blocks():
+    bins = bins_for(12)
+    masks = {"A": mask("##.#########"), "B": mask("##..........")}
+    assert ScheduleOptimizer(masks, bins, min_dwell_seconds=0).optimise().clean_seconds == 11
+    schedule = ScheduleOptimizer(masks, bins, slew_seconds=1, min_dwell_seconds=4).optimise()
+    assert [b.target for b in schedule.blocks] == ["A"]
+
+@pytest.mark.parametrize("seed", range(6))
+def test_matches_exhaustive_search(seed):
+    rng = np.random.default_rng(seed)
+    n_slots, n = 10, 3
+    clean = rng.random((n_slots, n)) > 0.45
+    slew = rng.integers(0, 3, (n, n))
+    np.fill_diagonal(slew, 0)
+    dwell = int(rng.integers(1, 4))
+    schedule = ScheduleOptimizer({f"T{j}": clean[:, j] for j in range(n)}, bins_for(n_slots),
+                                 slew_seconds=slew, min_dwell_seconds=dwell).optimise()
+    assert schedule.clean_seconds == brute_force(clean, tuple(map(tuple, slew)), dwell)
+
+def test_nothing_clean_gives_empty_schedule():
+    bins = bins_for(10)
+    schedule = ScheduleOptimizer({"A": np.zeros(10, dtype=bool)}, bins).optimise()
+    assert schedule.blocks == [] and "No target" in schedule.summary()
+
+
+# --- Construction ---
+
+def test_from_analysers_applies_visibility():
+    end = "2026-01-01T10:00:09"
+    analysers = {
+        "A": WindowAnalyser([{"time_utc": "2026-01-01T10:00:05+00:00"}], TIME_BEGIN, end),
+        "B": WindowAnalyser([], TIME_BEGIN, end),
+    }
+    visible = {"B": mask("###.......")}
+    schedule = ScheduleOptimizer.from_analysers(analysers, visible=visible).optimise()
+    assert schedule.clean_seconds == 9
+
+def test_mismatched_masks_raise():
+    with pytest.raises(ValueError):
+        ScheduleOptimizer({"A": np.ones(5, dtype=bool)}, bins_for(10))
+    with pytest.raises(ValueError):
+        ScheduleOptimizer({"A": np.ones(10, dtype=bool)}, bins_for(10), slew_seconds=-1)
+
+def test_slew_matrix_from_separation():
+    slew = slew_matrix([0.0, 6.0, 0.0], [0.0, 0.0, 45.0], deg_per_second=1.0, settle_seconds=5)
+    assert slew[0, 1] == pytest.approx(95.0)
+    assert slew[0, 2] == pytest.approx(50.0)
+    assert np.diag(slew).tolist() == [0.0, 0.0, 0.0]
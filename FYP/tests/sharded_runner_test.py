@@ -0,0 +1,81 @@
+import pytest
+from conftest import make_run_config, static_observer
+from datetime import datetime, timedelta, timezone
+from core.sharded_runner import ShardedRunner, plan_shards, run_shard
+from core.window_analyser import IncrementalWindowAnalyser, WindowAnalyser
+
+TIME_BEGIN = "2026-04-06T19:00:00"
+TIME_END = "2026-04-06T19:20:00"
+
+
+# --- Helpers ---
+
+def make_config():
+    return make_run_config(time_end=TIME_END, propagation_backend="native", result_cache=False)
+
+def utc(minute, second=0):
+    return datetime(2026, 4, 6, 19, minute, second, tzinfo=timezone.utc)
+
+
+# --- Planning ---
+
+def test_plan_shards_covers_window_with_overlap():
+    shards = plan_shards(TIME_BEGIN, TIME_END, shard_seconds=420, overlap_seconds=30)
+    assert [s.own_begin for s in shards] == [utc(0), utc(7), utc(14)]
+    assert shards[-1].own_end == utc(20)
+    assert shards[0].begin == utc(0) and shards[0].end == utc(7, 30)
+    assert shards[1].begin == utc(6, 30)
+    assert all(a.own_end == b.own_begin for a, b in zip(shards, shards[1:]))
+
+def test_every_second_including_window_end_has_one_owner():
+    shards = plan_shards(TIME_BEGIN, TIME_END, shard_seconds=420, overlap_seconds=30)
+    for second in range(0, 20 * 60 + 1, 30):
+        t = utc(0) + timedelta(seconds=second)
+        assert sum(s.owns(t) for s in shards) == 1, t
+    #a hit at exactly time_end is reported, as the unsharded analyser's last slot includes it
+    assert shards[-1].owns(utc(20))
+    assert not shards[-1].owns(utc(20, 1))
+
+def test_invalid_shard_length():
+    with pytest.raises(ValueError):
+        ShardedRunner(make_config(), "unused.tle", shard_seconds=0)
+
+
+# --- End to end ---
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_sharded_run_matches_single_pass(tle_subset, workers):
+    config = make_config()
+    whole = plan_shards(TIME_BEGIN, TIME_END, shard_seconds=10**6)[0]
+    single = run_shard(config, tle_subset, whole, observer_factory=static_observer)
+    assert single.results
+
+    sharded = ShardedRunner(
+        config, tle_subset, shard_seconds=300, overlap_seconds=30,
+        max_workers=workers, observer_factory=static_observer,
+    ).run()
+    key = lambda row: (row["time_utc"], row["satellite"])
+    got, want = sorted(sharded.results, key=key), sorted(single.results, key=key)
+    assert [key(r) for r in got] == [key(r) for r in want]
+    # shard-relative time grids differ in the last bits of the Julian date fraction
+    assert [r["gain_percent"] for r in got] == pytest.approx([r["gain_percent"] for r in want], abs=1e-6)
+
+    expected = WindowAnalyser(single.results, TIME_BEGIN, TIME_END).clean_stretches()
+    assert sorted(sharded.analyser.clean_stretches(), key=lambda s: s.start) == sorted(expected, key=lambda s: s.start)
+    assert len(sharded.shards) == 4
+
+def test_sharded_run_streams_chunks_to_incremental_analyser(tle_subset):
+    analyser = IncrementalWindowAnalyser(TIME_BEGIN, TIME_END)
+    progress = []
+
+    def on_chunk(results, covered, done, total):
+        analyser.add(results, covered)
+        progress.append((done, total, analyser.covered_fraction))
+
+    sharded = ShardedRunner(
+        make_config(), tle_subset, shard_seconds=300, overlap_seconds=30,
+        max_workers=1, observer_factory=static_observer,
+    ).run(on_chunk)
+    assert [(done, total) for done, total, _ in progress] == [(1, 4), (2, 4), (3, 4), (4, 4)]
+    assert progress[-1][2] == 1.0
+    assert analyser.clean_stretches() == sharded.analyser.clean_stretches()
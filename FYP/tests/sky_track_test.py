@@ -0,0 +1,64 @@
+import numpy as np
+import pytest
+from conftest import make_run_config, static_observer
+import core.sky_track as sky_track
+from core.checker import InterferenceChecker
+from core.native_propagator import NativePropagator
+from core.result_cache import ResultCache
+from core.sky_track import SkyTrack, sky_track_for
+from models.beam_model import BeamModel
+
+BEAM = BeamModel(dish_diameter_m=20.0, frequency_hz=135e6)
+POINTINGS = [(60.0, 180.0), (30.0, 90.0), (75.0, 300.0)]
+
+
+# --- Helpers ---
+
+@pytest.fixture(autouse=True)
+def no_memo(monkeypatch):
+    monkeypatch.setattr(sky_track, "_last", None)
+
+def make_config(alt=60.0, az=180.0):
+    return make_run_config(altitude_deg=alt, azimuth_deg=az, propagation_backend="native", geometry_prefilter=False)
+
+key = lambda row: (row["time_utc"], row["satellite"])
+
+
+# --- Checking ---
+
+def test_pointings_match_full_pipeline(tle_subset):
+    track = SkyTrack.build(make_config(), tle_subset)
+    observers = {f"{alt}/{az}": static_observer(make_config(alt, az)) for alt, az in POINTINGS}
+    checked = track.check_pointings(BEAM, observers)
+    assert any(checked.values())
+    for (alt, az), name in zip(POINTINGS, observers):
+        observer = observers[name]
+        events = NativePropagator(BEAM, make_config(alt, az), tle_subset, observer).run()
+        expected = sorted(InterferenceChecker(BEAM, observer).check(events), key=key)
+        got = sorted(checked[name], key=key)
+        assert [key(r) for r in got] == [key(r) for r in expected]
+        assert [r["gain_percent"] for r in got] == pytest.approx([r["gain_percent"] for r in expected])
+
+def test_track_keeps_only_above_horizon(tle_subset):
+    track = SkyTrack.build(make_config(), tle_subset)
+    assert len(track) and (track.alt_deg >= 0).all()
+    assert track.offsets.max() < track.n_steps
+
+
+# --- Reuse ---
+
+def test_sky_track_for_reuses_cached_track(tle_subset, tmp_path, monkeypatch):
+    cache = ResultCache(directory=tmp_path / "cache")
+    first = sky_track_for(make_config(), tle_subset, cache)
+    monkeypatch.setattr(sky_track, "_last", None)
+    monkeypatch.setattr(SkyTrack, "build", classmethod(lambda cls, *a, **k: pytest.fail("rebuilt")))
+    second = sky_track_for(make_config(alt=30.0, az=90.0), tle_subset, cache)
+    assert cache.hits == 1
+    assert np.array_equal(first.alt_deg, second.alt_deg)
+    assert sky_track_for(make_config(), tle_subset, cache) is second
+
+def test_oversized_track_is_not_cached(tle_subset, tmp_path):
+    cache = ResultCache(directory=tmp_path / "cache", max_mb=0.1)
+    track = sky_track_for(make_config(), tle_subset, cache)
+    assert track.nbytes > cache.max_bytes // 2
+    assert not list((tmp_path / "cache").iterdir())
@@ -51,6 +51,15 @@ def test_ready_when_all_set(state, observatory, tracking_target):
     assert state.is_ready()
 
 
+def test_ready_with_several_tle_files(state, observatory, tracking_target):
+    state.set_tle_files(["data/starlink.tle", "data/oneweb.tle"])
+    state.observatory = observatory
+    state.target = tracking_target
+    state.window = ("2026-01-01T10:00:00", "2026-01-01T10:10:00", 30)
+    assert state.is_ready()
+    assert state.tle_file == "data/starlink.tle"
+
+
 # --- build_run_config ---
 
 def test_build_run_config_tracking(state, observatory, tracking_target):
@@ -99,4 +108,16 @@ def test_build_run_config_bypass(state, tracking_target):
     state.window = ("2026-01-01T10:00:00", "2026-01-01T10:10:00", 30)
     config = state.build_run_config()
     assert config.bypass_airy == True
-    assert config.manual_beamwidth_deg == 5.0
\ No newline at end of file
+    assert config.manual_beamwidth_deg == 5.0
+
+# --- set_window ---
+
+def test_gap_change_regroups_last_results(state):
+    state.window = ("2026-01-01T10:00:00", "2026-01-01T10:10:00", 30)
+    state._on_analysis_done(None, None, [], None, "ts", None)
+    emitted = []
+    state.analysis_complete.connect(emitted.append)
+    state.set_window(("2026-01-01T10:00:00", "2026-01-01T10:10:00", 60))
+    state.set_window(("2026-01-01T11:00:00", "2026-01-01T11:10:00", 60))
+    assert len(emitted) == 1
+    assert state.window[2] == 60
@@ -0,0 +1,81 @@
+import numpy as np
+import pytest
+from dataclasses import replace
+from datetime import timedelta
+from types import SimpleNamespace
+from core.run_config import RunConfig
+from core.time_bins import TimeBins, strongest_per_slot, track_index
+from core.window_analyser import WindowAnalyser
+
+TIME_BEGIN = "2026-01-01T10:00:00"
+TIME_END   = "2026-01-01T10:00:10"
+
+
+# --- TimeBins ---
+
+@pytest.mark.parametrize("resolution, n_slots, n_steps", [(0.1, 101, 100), (1.0, 11, 10), (10.0, 2, 1)])
+def test_slot_counts(resolution, n_slots, n_steps):
+    bins = TimeBins.for_window(TIME_BEGIN, TIME_END, resolution)
+    assert (bins.n_slots, bins.n_steps) == (n_slots, n_steps)
+
+def test_microsecond_drift_lands_in_same_slot():
+    bins = TimeBins.for_window(TIME_BEGIN, TIME_END, 1.0)
+    slots = bins.slots_from_iso(["2026-01-01T10:00:02.999999+00:00", "2026-01-01T10:00:02+00:00",
+                                 "2026-01-01T10:00:02.000001Z", "2026-01-01T10:00:03.000001"])
+    assert slots.tolist() == [2, 2, 2, 3]
+
+def test_sub_second_slots_and_starts():
+    bins = TimeBins.for_window(TIME_BEGIN, TIME_END, 0.1)
+    assert bins.slots_from_iso(["2026-01-01T10:00:01.25+00:00"]).tolist() == [12]
+    assert bins.slots_from_epochs([bins.begin.timestamp() + 1.3]).tolist() == [13]
+    assert bins.slot_start(12) - bins.begin == timedelta(seconds=1.2)
+
+def test_invalid_resolution_raises():
+    with pytest.raises(ValueError):
+        TimeBins.for_window(TIME_BEGIN, TIME_END, 0)
+
+def test_track_index_scales_and_clips():
+    observer = SimpleNamespace(resolution_seconds=0.5, target_alts=np.zeros(20))
+    assert track_index(observer, [0, 1.0, 2.4, 100]).tolist() == [0, 2, 4, 19]
+    assert track_index(SimpleNamespace(target_alts=np.zeros(20)), [3]).tolist() == [3]
+
+
+# --- Sample cadence ---
+
+def test_one_second_samples_leave_no_false_gaps_at_sub_second_resolution():
+    times = [f"2026-01-01T10:00:0{s}+00:00" for s in range(2, 6)]
+    analyser = WindowAnalyser([{"time_utc": t} for t in times], TIME_BEGIN, TIME_END,
+                              resolution_seconds=0.1, sample_seconds=1.0)
+    assert analyser.sample_slots == 10
+    assert analyser.occupancy[20:60].all()
+    assert not analyser.occupancy[60] and not analyser.occupancy[19]
+    assert sorted(s.duration_seconds for s in analyser.clean_stretches()) == [1.9, 4]
+
+def test_ten_second_resolution_merges_samples():
+    times = ["2026-01-01T10:00:01+00:00", "2026-01-01T10:00:07+00:00"]
+    analyser = WindowAnalyser([{"time_utc": t} for t in times], TIME_BEGIN, TIME_END, resolution_seconds=10.0)
+    assert analyser.occupancy.tolist() == [True, False]
+    assert analyser.hit_count[0] == 1
+
+def test_hit_count_counts_distinct_satellites():
+    rows = [{"time_utc": f"2026-01-01T10:00:0{s}+00:00", "satellite": name}
+            for s, name in [(1, "A"), (4, "A"), (7, "A"), (8, "B")]]
+    analyser = WindowAnalyser(rows, TIME_BEGIN, TIME_END, resolution_seconds=10.0)
+    assert analyser.hit_count[0] == 2
+    assert analyser.filtered(max_satellites=2).occupancy.tolist() == [False, False]
+    assert analyser.filtered(max_satellites=1).occupancy.tolist() == [True, False]
+
+def test_strongest_per_slot_keeps_one_row_per_satellite():
+    rows = [{"time_utc": f"2026-01-01T10:00:0{s}+00:00", "satellite": name, "gain_percent": gain}
+            for s, name, gain in [(1, "A", 5.0), (4, "A", 9.0), (7, "B", 1.0), (8, "A", 2.0)]]
+    bins = TimeBins.for_window(TIME_BEGIN, TIME_END, 10.0)
+    assert strongest_per_slot(rows, bins) == [rows[1], rows[2]]
+    assert strongest_per_slot(rows, TimeBins.for_window(TIME_BEGIN, TIME_END)) == rows
+
+def test_run_config_sample_seconds():
+    rc = RunConfig(latitude=40.8, longitude=-121.4, elevation_m=986, dish_diameter_m=20.0, frequency_hz=135e6,
+                   time_begin=TIME_BEGIN, time_end=TIME_END, ra_hours=19.983, dec_degrees=40.733,
+                   time_resolution_seconds=0.1)
+    assert rc.sample_seconds() == 1.0
+    assert replace(rc, time_resolution_seconds=10.0).sample_seconds() == 10.0
+    assert replace(rc, time_resolution_seconds=10.0, propagation_backend="native").sample_seconds() == 1.0
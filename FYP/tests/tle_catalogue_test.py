@@ -0,0 +1,177 @@
+import pytest
+from datetime import datetime, timezone
+from pathlib import Path
+import core.tle_catalogue as tle_catalogue
+from core.tle_catalogue import (
+    CatalogueChangeSet, TLECatalogue, TLERecord, catalogue_for_run, diff_files,
+    parse_epoch, parse_norad_id, publish_changes, read_tle_file, subscribe_changes,
+)
+
+ACTIVE_TLE = Path(__file__).resolve().parent.parent / "data" / "active.tle"
+LINE2 = "2 25924   0.0509  90.2111 0003015 307.1165  34.3298  1.00271926 97119"
+#perigee below the surface: SGP4 reports the orbit as decayed
+DECAYED_LINE2 = "2 25924  51.6000  90.2111 0003015 307.1165  34.3298 17.50000000 97119"
+
+
+# --- Helpers ---
+
+@pytest.fixture(autouse=True)
+def catalogue_dir(tmp_path, monkeypatch):
+    path = tmp_path / "catalogue"
+    path.mkdir()
+    monkeypatch.setattr(tle_catalogue, "catalogue_dir", lambda: path)
+    return path
+
+def line1(norad="25924", epoch="26096.21711700"):
+    return f"1 {norad}U 99053A   {epoch} -.00000118  00000+0  00000+0 0  9999"
+
+def write_tle(path, entries):
+    path.write_text("".join(f"{name}\n{l1}\n{l2}\n" for name, l1, l2 in entries))
+    return str(path)
+
+def utc(*args):
+    return datetime(*args, tzinfo=timezone.utc)
+
+
+# --- Parsing ---
+
+def test_parse_norad_id_numeric_and_alpha5():
+    assert parse_norad_id(line1("25924")) == 25924
+    assert parse_norad_id(line1("A0001")) == 100001
+    assert parse_norad_id(line1("Z9999")) == 339999
+
+def test_parse_epoch():
+    assert parse_epoch(line1(epoch="26001.50000000")) == utc(2026, 1, 1, 12)
+    assert parse_epoch(line1(epoch="99365.00000000")).year == 1999
+
+def test_record_from_lines():
+    record = TLERecord.from_lines("ABS-6", line1(), LINE2, group="geo")
+    assert record.norad_id == 25924
+    assert record.group == "geo"
+
+
+# --- Catalogue ---
+
+def test_keeps_epoch_closest_to_target(tmp_path):
+    path = write_tle(tmp_path / "history.tle", [
+        ("SAT", line1(epoch="26020.00000000"), LINE2),
+        ("SAT", line1(epoch="26021.50000000"), LINE2),
+        ("SAT", line1(epoch="26023.00000000"), LINE2),
+    ])
+    catalogue = TLECatalogue.from_files([path])
+    assert len(catalogue) == 1
+    assert catalogue.duplicates == 2
+    selected = catalogue.select(utc(2026, 1, 21, 13, 6))
+    assert [r.epoch for r in selected] == [utc(2026, 1, 21, 12)]
+
+def test_overlapping_groups_merge_by_norad_id(tmp_path):
+    entries = read_tle_file(str(ACTIVE_TLE))[:10]
+    a = write_tle(tmp_path / "a.tle", entries[:6])
+    b = write_tle(tmp_path / "b.tle", entries[4:])
+    catalogue = TLECatalogue.from_files([a, b])
+    assert catalogue.loaded == 12
+    assert len(catalogue) == 10
+    assert {r.group for r in catalogue.element_sets(parse_norad_id(entries[5][1]))} == {"a", "b"}
+
+def test_write_round_trips(tmp_path):
+    entries = read_tle_file(str(ACTIVE_TLE))[:5]
+    catalogue = TLECatalogue.from_files([write_tle(tmp_path / "in.tle", entries)])
+    out = catalogue.write(tmp_path / "out.tle", utc(2026, 4, 6))
+    assert sorted(read_tle_file(str(out))) == sorted(entries)
+
+
+# --- Run integration ---
+
+def test_catalogue_for_run_passes_clean_file_through(tmp_path):
+    path = write_tle(tmp_path / "clean.tle", read_tle_file(str(ACTIVE_TLE))[:5])
+    assert catalogue_for_run([path], "2026-04-06T19:00:00", "2026-04-06T19:10:00") == path
+
+def test_catalogue_for_run_writes_and_reuses_deduplicated_file(tmp_path, catalogue_dir):
+    entries = read_tle_file(str(ACTIVE_TLE))[:5]
+    a = write_tle(tmp_path / "a.tle", entries)
+    b = write_tle(tmp_path / "b.tle", entries[:2])
+    first = catalogue_for_run([a, b], "2026-04-06T19:00:00", "2026-04-06T19:10:00")
+    second = catalogue_for_run([a, b], "2026-04-06T19:00:00", "2026-04-06T19:10:00")
+    assert first == second
+    assert Path(first).parent == catalogue_dir
+    assert len(read_tle_file(first)) == 5
+
+def test_catalogue_for_run_shares_file_across_windows(tmp_path, catalogue_dir):
+    entries = read_tle_file(str(ACTIVE_TLE))[:5]
+    path = write_tle(tmp_path / "a.tle", entries + entries[:1])
+    first = catalogue_for_run([path], "2026-04-06T19:00:00", "2026-04-06T19:10:00")
+    later = catalogue_for_run([path], "2026-04-06T21:00:00", "2026-04-06T21:10:00")
+    assert first == later
+    assert Path(first).name.startswith("a_")
+
+def test_catalogue_files_are_evicted_least_recently_used(tmp_path, catalogue_dir, monkeypatch):
+    monkeypatch.setattr(tle_catalogue, "MAX_CATALOGUE_FILES", 2)
+    monkeypatch.setattr(tle_catalogue, "CATALOGUE_GRACE_SECONDS", 0)
+    entries = read_tle_file(str(ACTIVE_TLE))[:6]
+    paths = []
+    for n in range(3, 6):
+        path = write_tle(tmp_path / f"a{n}.tle", entries[:n] + entries[:1])
+        paths.append(catalogue_for_run([path], "2026-04-06T19:00:00", "2026-04-06T19:10:00"))
+    assert sorted(p.name for p in catalogue_dir.glob("*.tle")) == sorted(Path(p).name for p in paths[1:])
+
+
+def test_recently_used_catalogue_files_are_not_evicted(tmp_path, catalogue_dir, monkeypatch):
+    monkeypatch.setattr(tle_catalogue, "MAX_CATALOGUE_FILES", 1)
+    entries = read_tle_file(str(ACTIVE_TLE))[:6]
+    paths = []
+    for n in range(3, 6):
+        path = write_tle(tmp_path / f"a{n}.tle", entries[:n] + entries[:1])
+        paths.append(catalogue_for_run([path], "2026-04-06T19:00:00", "2026-04-06T19:10:00"))
+    assert all(Path(p).exists() for p in paths)
+
+# --- Pruning ---
+
+def test_prune_splits_stale_and_decayed(tmp_path):
+    path = write_tle(tmp_path / "mixed.tle", [
+        ("FRESH", line1("00001", "26096.00000000"), LINE2),
+        ("STALE", line1("00002", "26060.00000000"), LINE2),
+        ("DECAYED", line1("00003", "26096.00000000"), DECAYED_LINE2),
+    ])
+    pruning = TLECatalogue.from_files([path]).prune(utc(2026, 4, 6, 19), utc(2026, 4, 6, 20), max_age_days=14)
+    assert [r.name for r in pruning.kept] == ["FRESH"]
+    assert [r.name for r in pruning.stale] == ["STALE"]
+    assert [r.name for r in pruning.decayed] == ["DECAYED"]
+    assert "kept 1, left out 1 stale" in pruning.summary()
+
+def test_catalogue_for_run_quarantines_pruned(tmp_path, catalogue_dir):
+    path = write_tle(tmp_path / "mixed.tle", [
+        ("FRESH", line1("00001", "26096.00000000"), LINE2),
+        ("STALE", line1("00002", "26060.00000000"), LINE2),
+    ])
+    assert catalogue_for_run([path], "2026-04-06T19:00:00", "2026-04-06T20:00:00", "keep") == path
+    pruned = catalogue_for_run([path], "2026-04-06T19:00:00", "2026-04-06T20:00:00", "quarantine")
+    assert [name for name, _, _ in read_tle_file(pruned)] == ["FRESH"]
+    quarantined = list((catalogue_dir / "quarantine").iterdir())
+    assert [name for name, _, _ in read_tle_file(str(quarantined[0]))] == ["STALE"]
+
+
+def test_catalogue_for_run_refuses_to_prune_everything(tmp_path, catalogue_dir):
+    path = write_tle(tmp_path / "old.tle", [("STALE", line1("00002", "26060.00000000"), LINE2)])
+    with pytest.raises(RuntimeError, match="1 stale"):
+        catalogue_for_run([path], "2026-04-06T19:00:00", "2026-04-06T20:00:00", "drop")
+    assert not list(catalogue_dir.glob("*.tle"))
+
+# --- Change sets ---
+
+def test_change_set_between_fingerprints():
+    changes = CatalogueChangeSet.between({1: 10.0, 2: 20.0, 3: 30.0}, {2: 20.0, 3: 31.0, 4: 40.0})
+    assert (changes.added, changes.removed, changes.updated) == ({4}, {1}, {3})
+    assert changes.affected == {1, 3, 4}
+    assert not CatalogueChangeSet.between({1: 10.0}, {1: 10.0})
+
+def test_diff_files_detects_epoch_change(tmp_path):
+    old = write_tle(tmp_path / "old.tle", [("SAT", line1(epoch="26020.00000000"), LINE2)])
+    new = write_tle(tmp_path / "new.tle", [("SAT", line1(epoch="26021.00000000"), LINE2)])
+    assert diff_files(old, new).updated == {25924}
+
+def test_publish_notifies_listeners(monkeypatch):
+    seen = []
+    monkeypatch.setattr(tle_catalogue, "_change_listeners", [])
+    subscribe_changes(lambda path, changes: seen.append((path, changes.affected)))
+    publish_changes("active.tle", CatalogueChangeSet(added={5}))
+    assert seen == [("active.tle", {5})]
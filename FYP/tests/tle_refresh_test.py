@@ -0,0 +1,145 @@
+import os
+import threading
+import time
+import pytest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from core.tle_refresh import TLERefreshManager
+
+ACTIVE_TLE = Path(__file__).resolve().parent.parent / "data" / "active.tle"
+CATALOGUE = "\n".join(ACTIVE_TLE.read_text().splitlines()[:9]).encode() + b"\n"
+
+
+# --- Helpers ---
+
+class StandIn(BaseHTTPRequestHandler):
+    """Minimal CelesTrak stand-in serving CATALOGUE with an ETag."""
+    etag = '"v1"'
+    body = CATALOGUE
+    requests = []
+
+    def do_GET(self):
+        type(self).requests.append((self.path, dict(self.headers)))
+        if self.headers.get("If-None-Match") == self.etag:
+            self.send_response(304)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("ETag", self.etag)
+        self.send_header("Content-Length", str(len(self.body)))
+        self.end_headers()
+        self.wfile.write(self.body)
+
+    def log_message(self, *args):
+        pass
+
+@pytest.fixture
+def server():
+    StandIn.requests = []
+    StandIn.body = CATALOGUE
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), StandIn)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}/gp.php?GROUP={{group}}"
+    httpd.shutdown()
+
+def age(path: Path, days: float):
+    old = time.time() - days * 86400
+    os.utime(path, (old, old))
+
+
+# --- HTTP ---
+
+def test_download_then_conditional_not_modified(tmp_path, server):
+    manager = TLERefreshManager(source=server, data_dir=tmp_path)
+    assert manager.refresh("active").status == "updated"
+    assert manager.path("active").read_bytes() == CATALOGUE
+    assert manager.refresh("active", force=True).status == "not_modified"
+    assert StandIn.requests[-1][1].get("If-None-Match") == '"v1"'
+
+def test_fresh_cache_makes_no_request(tmp_path, server):
+    manager = TLERefreshManager(source=server, data_dir=tmp_path)
+    manager.refresh("active")
+    count = len(StandIn.requests)
+    assert manager.refresh("active").status == "fresh"
+    assert len(StandIn.requests) == count
+
+def test_refresh_all_fetches_groups_concurrently(tmp_path, server):
+    manager = TLERefreshManager(source=server, data_dir=tmp_path)
+    groups = ["active", "starlink", "oneweb", "gnss", "weather"]
+    results = manager.refresh_all(groups)
+    assert [r.group for r in results] == groups
+    assert all(r.status == "updated" for r in results)
+    assert {path.split("=")[-1] for path, _ in StandIn.requests} == set(groups)
+
+def test_invalid_response_keeps_existing_cache(tmp_path, server):
+    manager = TLERefreshManager(source=server, data_dir=tmp_path)
+    manager.refresh("active")
+    StandIn.body = b"<html>rate limited</html>"
+    StandIn.etag = '"v2"'
+    try:
+        result = manager.refresh("active", force=True)
+    finally:
+        StandIn.etag = '"v1"'
+    assert result.status == "failed"
+    assert manager.path("active").read_bytes() == CATALOGUE
+    assert not list(tmp_path.glob(".*.tmp"))
+
+
+# --- Mirror / startup ---
+
+def test_mirror_directory_source(tmp_path):
+    mirror = tmp_path / "mirror"
+    mirror.mkdir()
+    (mirror / "active.tle").write_bytes(CATALOGUE)
+    manager = TLERefreshManager(source=str(mirror), data_dir=tmp_path / "data")
+    assert manager.refresh("active").status == "updated"
+    assert manager.refresh("active", force=True).status == "not_modified"
+
+def test_ensure_returns_stale_cache_without_blocking(tmp_path):
+    manager = TLERefreshManager(source="http://127.0.0.1:9/{group}", data_dir=tmp_path)
+    manager.path("active").write_bytes(CATALOGUE)
+    age(manager.path("active"), 30)
+    start = time.perf_counter()
+    paths = manager.ensure(["active"])
+    assert time.perf_counter() - start < 0.5
+    assert paths == [str(manager.path("active"))]
+    manager.wait(timeout=10)
+    assert manager.path("active").read_bytes() == CATALOGUE
+
+def test_ensure_without_cache_raises_when_unreachable(tmp_path):
+    manager = TLERefreshManager(source=str(tmp_path / "no-mirror"), data_dir=tmp_path / "data")
+    with pytest.raises(RuntimeError):
+        manager.ensure(["active"])
+
+def test_replacing_cache_publishes_change_set(tmp_path, server, monkeypatch):
+    import core.tle_catalogue as tle_catalogue
+    seen = []
+    monkeypatch.setattr(tle_catalogue, "_change_listeners", [lambda path, changes: seen.append(changes)])
+    manager = TLERefreshManager(source=server, data_dir=tmp_path)
+    assert manager.refresh("active").changes is None
+    StandIn.body = b"\n".join(CATALOGUE.splitlines()[:6]) + b"\n"
+    StandIn.etag = '"v2"'
+    try:
+        result = manager.refresh("active", force=True)
+    finally:
+        StandIn.etag = '"v1"'
+    assert len(result.changes.removed) == 1
+    assert seen == [result.changes]
+
+def test_loader_ensures_every_group_in_one_call(monkeypatch):
+    import core.tle_loader as tle_loader
+    calls = []
+    class Recording:
+        def __init__(self, source=None):
+            self.source = source
+        def ensure(self, groups):
+            calls.append(list(groups))
+            return [f"{group}.tle" for group in groups]
+    monkeypatch.setattr(tle_loader, "TLERefreshManager", Recording)
+    loader = tle_loader.TLELoaderThread("starlink, oneweb")
+    emitted = []
+    loader.finished.connect(emitted.append)
+    loader.run()
+    assert calls == [["starlink", "oneweb"]]
+    assert emitted == [["starlink.tle", "oneweb.tle"]]
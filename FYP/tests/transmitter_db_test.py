@@ -0,0 +1,79 @@
+import json
+import pytest
+from pathlib import Path
+import core.tle_catalogue as tle_catalogue
+import core.transmitter_db as transmitter_db
+from core.tle_catalogue import TLERecord, catalogue_for_run, read_tle_file
+from core.transmitter_db import TransmitterDatabase, TransmitterEntry
+
+ACTIVE_TLE = Path(__file__).resolve().parent.parent / "data" / "active.tle"
+LINE2 = "2 25924   0.0509  90.2111 0003015 307.1165  34.3298  1.00271926 97119"
+
+
+# --- Helpers ---
+
+def line1(norad):
+    return f"1 {norad}U 99053A   26096.21711700 -.00000118  00000+0  00000+0 0  9999"
+
+def record(name, norad="25924"):
+    return TLERecord.from_lines(name, line1(norad), LINE2)
+
+@pytest.fixture
+def database(tmp_path, monkeypatch):
+    path = tmp_path / "transmitters.json"
+    path.write_text(json.dumps({
+        "constellations": [
+            {"name": "Starlink", "match": ["STARLINK"], "downlink_mhz": [[10700, 12700]]},
+            {"name": "ORBCOMM", "match": ["orbcomm"], "downlink_mhz": [[137.0, 138.0]]},
+        ],
+        "satellites": {"25924": {"name": "Special", "downlink_mhz": [[400, 401]]}},
+    }))
+    monkeypatch.setattr(transmitter_db, "transmitter_db_path", lambda: path)
+    return TransmitterDatabase.load()
+
+
+# --- Lookup ---
+
+def test_lookup_by_constellation_and_norad(database):
+    assert database.lookup("STARLINK-1008", 44714).name == "Starlink"
+    assert database.lookup("ORBCOMM FM06", 25113).name == "ORBCOMM"
+    assert database.lookup("STARLINK-1008", 25924).name == "Special"
+    assert database.lookup("ISS (ZARYA)", 25544) is None
+
+def test_band_overlap_edges():
+    entry = TransmitterEntry("X", ((137.0, 138.0),))
+    assert entry.overlaps(132.0, 137.0)
+    assert not entry.overlaps(130.0, 136.9)
+
+def test_invalid_database_raises(tmp_path):
+    (tmp_path / "bad.json").write_text("{")
+    with pytest.raises(RuntimeError):
+        TransmitterDatabase.load(tmp_path / "bad.json")
+
+
+# --- Filtering ---
+
+def test_filter_keeps_in_band_and_unknown(database):
+    records = [record("STARLINK-1", "44714"), record("ORBCOMM FM06", "25113"), record("MYSTERY", "12345")]
+    kept, stats = database.filter(records, frequency_hz=137.5e6, bandwidth_mhz=10)
+    assert [r.name for r in kept] == ["ORBCOMM FM06", "MYSTERY"]
+    assert stats.removed == {"Starlink": 1}
+    assert (stats.kept_known, stats.kept_unknown) == (1, 1)
+    assert "removed 1 satellites" in stats.summary()
+
+def test_shipped_database_removes_starlink_at_low_frequency():
+    entries = read_tle_file(str(ACTIVE_TLE))[:300]
+    records = [TLERecord.from_lines(*entry) for entry in entries]
+    kept, stats = TransmitterDatabase.load().filter(records, 135e6, 10)
+    assert stats.removed.get("Starlink", 0) == sum(r.name.startswith("STARLINK") for r in records)
+    assert not any(r.name.startswith("STARLINK") for r in kept)
+
+def test_catalogue_for_run_applies_band(database, tmp_path, monkeypatch):
+    monkeypatch.setattr(tle_catalogue, "catalogue_dir", lambda: tmp_path)
+    path = tmp_path / "in.tle"
+    path.write_text("".join(f"{r.name}\n{r.line1}\n{r.line2}\n" for r in
+                            [record("STARLINK-1", "44714"), record("ORBCOMM FM06", "25113")]))
+    window = ("2026-04-06T05:00:00", "2026-04-06T06:00:00")
+    assert catalogue_for_run([str(path)], *window, "keep") == str(path)
+    filtered = catalogue_for_run([str(path)], *window, "keep", band=(137.5e6, 10))
+    assert [name for name, _, _ in read_tle_file(filtered)] == ["ORBCOMM FM06"]
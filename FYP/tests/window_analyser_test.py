@@ -1,6 +1,7 @@
+import numpy as np
 import pytest
 from datetime import datetime, timezone, timedelta
-from core.window_analyser import WindowAnalyser, CleanStretch, LinkedGroup
+from core.window_analyser import WindowAnalyser, CleanStretch, IncrementalWindowAnalyser, LinkedGroup
 
 # --- Helpers ---
 
@@ -59,6 +60,43 @@ def test_stretch_start_end_consistency():
                s.duration_seconds == int((s.end - s.start).total_seconds()) + 1
 
 
+def reference_stretches(flagged: set[datetime], begin: datetime, end: datetime) -> list[tuple]:
+    """Timestamp-walking clean stretches, as computed before the occupancy bitmap."""
+    stretches, cursor = [], begin
+    for t in sorted(flagged):
+        if t > cursor:
+            stretches.append((cursor, t - timedelta(seconds=1)))
+        cursor = max(cursor, t + timedelta(seconds=1))
+    if cursor <= end:
+        stretches.append((cursor, end))
+    return sorted(stretches, key=lambda s: (s[1] - s[0]), reverse=True)
+
+def test_bitmap_matches_reference_walk():
+    rng = np.random.default_rng(4)
+    begin = dt("10:00:00")
+    for density in (0.01, 0.2, 0.7):
+        offsets = np.flatnonzero(rng.random(601) < density)
+        times = [(begin + timedelta(seconds=int(o))).isoformat() for o in offsets]
+        analyser = WindowAnalyser(make_results(times), TIME_BEGIN, TIME_END)
+        got = [(s.start, s.end) for s in analyser.clean_stretches()]
+        assert sorted(got) == sorted(reference_stretches(analyser.flagged, begin, dt("10:10:00")))
+
+def test_from_epochs_matches_rows():
+    begin = dt("10:00:00")
+    offsets = [5, 6, 7, 300, 301, 599, 900]   # 900 lies outside the window
+    rows = make_results([(begin + timedelta(seconds=o)).isoformat() for o in offsets])
+    epochs = [begin.timestamp() + o + 0.4 for o in offsets]
+    from_rows = WindowAnalyser(rows, TIME_BEGIN, TIME_END)
+    from_epochs = WindowAnalyser.from_epochs(epochs, TIME_BEGIN, TIME_END)
+    assert np.array_equal(from_rows.occupancy, from_epochs.occupancy)
+    assert from_epochs.occupancy.sum() == 6
+
+def test_interference_blocks():
+    rows = make_results([f"2026-01-01T10:0{m}:{s:02d}+00:00" for m, s in ((1, 0), (1, 1), (1, 2), (4, 30))])
+    blocks = WindowAnalyser(rows, TIME_BEGIN, TIME_END).interference_blocks()
+    assert blocks == [(dt("10:01:00"), dt("10:01:02")), (dt("10:04:30"), dt("10:04:30"))]
+
+
 # --- linked_groups ---
 
 def test_no_results_no_groups():
@@ -100,6 +138,163 @@ def test_group_span_gte_clean():
         assert g.total_span_seconds >= g.total_clean_seconds
 
 
+# --- per-second aggregates ---
+
+def gain_rows():
+    return [
+        {"time_utc": "2026-01-01T10:01:00", "satellite": "STARLINK-1", "gain_percent": 2.0},
+        {"time_utc": "2026-01-01T10:01:00", "satellite": "ONEWEB-7", "gain_percent": 40.0},
+        {"time_utc": "2026-01-01T10:01:01", "satellite": "STARLINK-1", "gain_percent": 3.0},
+        {"time_utc": "2026-01-01T10:02:00", "satellite": "STARLINK-2", "gain_percent": 1.0},
+    ]
+
+def test_per_second_columns():
+    analyser = WindowAnalyser(gain_rows(), TIME_BEGIN, TIME_END)
+    assert analyser.hit_count[60:62].tolist() == [2, 1]
+    assert analyser.max_gain[60] == 40.0
+    assert analyser.sum_gain[60] == pytest.approx(42.0)
+    assert analyser.rows[0].tolist() == [60, 60, 61, 120]
+
+def test_filtered_by_gain_and_satellite_count():
+    analyser = WindowAnalyser(gain_rows(), TIME_BEGIN, TIME_END)
+    assert len(analyser.filtered().interference_blocks()) == 2
+    assert analyser.filtered(max_gain_percent=2.5).interference_blocks() == [(dt("10:01:00"), dt("10:01:01"))]
+    assert analyser.filtered(max_satellites=1).interference_blocks() == [(dt("10:01:00"), dt("10:01:00"))]
+    assert analyser.filtered(max_gain_percent=50, max_satellites=5).clean_stretches()[0].duration_seconds == 600
+
+def test_filtered_excludes_constellations():
+    analyser = WindowAnalyser(gain_rows(), TIME_BEGIN, TIME_END)
+    without_starlink = analyser.filtered(exclude=("starlink",))
+    assert without_starlink.interference_blocks() == [(dt("10:01:00"), dt("10:01:00"))]
+    assert without_starlink.max_gain[60] == 40.0
+    assert analyser.filtered(exclude=("STARLINK", "ONEWEB")).interference_blocks() == []
+
+def test_unknown_gains_stay_flagged_under_gain_threshold():
+    analyser = WindowAnalyser.from_epochs([dt("10:00:05").timestamp()], TIME_BEGIN, TIME_END)
+    assert analyser.filtered(max_gain_percent=99).occupancy.sum() == 1
+
+
+# --- top-k ---
+
+def busy_analyser(seed=5):
+    rng = np.random.default_rng(seed)
+    begin = dt("10:00:00")
+    return WindowAnalyser(make_results([(begin + timedelta(seconds=int(o))).isoformat()
+                                        for o in np.flatnonzero(rng.random(601) < 0.2)]), TIME_BEGIN, TIME_END)
+
+def test_top_stretches_match_sorted_prefix():
+    analyser = busy_analyser()
+    assert analyser.top_stretches(5) == analyser.clean_stretches()[:5]
+    long_only = analyser.top_stretches(100, min_duration_seconds=6)
+    assert long_only == [s for s in analyser.clean_stretches() if s.duration_seconds >= 6]
+
+def test_top_linked_groups_match_sorted_prefix():
+    analyser = busy_analyser()
+    groups = analyser.linked_groups(4)
+    assert analyser.top_linked_groups(3, 4) == groups[:3]
+    assert all(g.total_clean_seconds >= 30 for g in analyser.top_linked_groups(50, 4, min_clean_seconds=30))
+
+def test_limited_summaries_count_the_rest():
+    analyser = busy_analyser()
+    total = len(analyser.clean_stretches())
+    lines = analyser.clean_stretches_summary(limit=3).splitlines()
+    assert len(lines) == 5
+    assert lines[-1] == f"  ... and {total - 3} shorter stretches"
+    assert analyser.clean_stretches_summary(limit=total) == analyser.clean_stretches_summary()
+    groups = analyser.linked_groups_summary(2, limit=2).splitlines()
+    assert groups[-1].endswith("smaller groups") and len(groups) == 4
+
+
+# --- tolerance_curve ---
+
+def test_linked_groups_match_sequential_walk():
+    rng = np.random.default_rng(3)
+    begin = dt("10:00:00")
+    results = make_results([(begin + timedelta(seconds=int(o))).isoformat()
+                            for o in np.flatnonzero(rng.random(601) < 0.1)])
+    analyser = WindowAnalyser(results, TIME_BEGIN, TIME_END)
+    stretches = sorted(analyser.clean_stretches(), key=lambda s: s.start)
+    for tolerance in (0, 5, 20, 60):
+        expected = [[stretches[0]]]
+        for prev, curr in zip(stretches, stretches[1:]):
+            if int((curr.start - prev.end).total_seconds()) <= tolerance:
+                expected[-1].append(curr)
+            else:
+                expected.append([curr])
+        got = analyser.linked_groups(tolerance)
+        assert sorted((g.stretches for g in got), key=lambda g: g[0].start) == expected
+
+def test_tolerance_curve_agrees_with_linked_groups():
+    flagged = ["10:01:00", "10:01:01", "10:03:00", "10:03:10", "10:03:11", "10:07:00"]
+    analyser = WindowAnalyser(make_results([f"2026-01-01T{t}" for t in flagged]), TIME_BEGIN, TIME_END)
+    curve = analyser.tolerance_curve()
+    assert [step.gap_tolerance_seconds for step in curve] == [0, 2, 3]
+    assert [step.groups for step in curve] == [5, 3, 1]
+    for step in curve:
+        groups = analyser.linked_groups(step.gap_tolerance_seconds)
+        assert len(groups) == step.groups
+        assert groups[0].total_clean_seconds == step.best_clean_seconds
+        assert groups[0].total_span_seconds == step.best_span_seconds
+    assert "Usable Time vs Gap Tolerance" in analyser.tolerance_curve_summary()
+
+def test_tolerance_curve_empty_when_fully_flagged():
+    analyser = WindowAnalyser.from_epochs(np.arange(601) + dt("10:00:00").timestamp(), TIME_BEGIN, TIME_END)
+    assert analyser.tolerance_curve() == []
+
+
+# --- IncrementalWindowAnalyser ---
+
+def test_incremental_matches_batch_in_any_chunk_order():
+    rng = np.random.default_rng(11)
+    begin = dt("10:00:00")
+    results = make_results([(begin + timedelta(seconds=int(o))).isoformat()
+                            for o in np.flatnonzero(rng.random(601) < 0.15)])
+    expected = WindowAnalyser(results, TIME_BEGIN, TIME_END)
+    order = rng.permutation(len(results))
+    incremental = IncrementalWindowAnalyser(TIME_BEGIN, TIME_END)
+    for chunk in np.array_split(order, 7):
+        incremental.add([results[i] for i in chunk])
+    assert incremental.chunks == 7
+    assert incremental.clean_stretches() == expected.clean_stretches()
+    assert incremental.interference_blocks() == expected.interference_blocks()
+    assert incremental.linked_groups_summary(20) == expected.linked_groups_summary(20)
+
+def test_incremental_merges_adjacent_chunks_and_tracks_coverage():
+    analyser = IncrementalWindowAnalyser(TIME_BEGIN, TIME_END)
+    analyser.add(make_results(["2026-01-01T10:01:00", "2026-01-01T10:01:01"]), ("2026-01-01T10:00:00", "2026-01-01T10:04:59"))
+    provisional = analyser.snapshot()
+    analyser.add(make_results(["2026-01-01T10:01:02", "2026-01-01T10:00:59"]), ("2026-01-01T10:05:00", "2026-01-01T10:10:00"))
+    assert analyser.interference_blocks() == [(dt("10:00:59"), dt("10:01:02"))]
+    assert provisional.interference_blocks() == [(dt("10:01:00"), dt("10:01:01"))]
+    assert provisional.covered_fraction == pytest.approx(300 / 601)
+    assert analyser.covered_fraction == 1.0
+
+def test_hit_count_is_distinct_across_chunks():
+    analyser = IncrementalWindowAnalyser(TIME_BEGIN, TIME_END)
+    row = {"time_utc": "2026-01-01T10:01:00", "satellite": "A", "gain_percent": 5.0}
+    analyser.add([row])
+    analyser.add([row, {**row, "time_utc": "2026-01-01T10:01:00.500000"}])
+    slot = analyser.bins.slot_of(dt("10:01:00"))
+    assert analyser.hit_count[slot] == 1
+    assert not analyser.filtered(max_satellites=1).occupancy[slot]
+    analyser.add([{**row, "satellite": "B"}])
+    assert analyser.hit_count[slot] == 2
+
+def test_snapshot_columns_do_not_follow_later_chunks():
+    analyser = IncrementalWindowAnalyser(TIME_BEGIN, TIME_END)
+    analyser.add([{"time_utc": "2026-01-01T10:01:00", "satellite": "A", "gain_percent": 5.0}])
+    provisional = analyser.snapshot()
+    analyser.add([{"time_utc": "2026-01-01T10:01:00", "satellite": "B", "gain_percent": 9.0}])
+    slot = provisional.bins.slot_of(dt("10:01:00"))
+    assert provisional.hit_count[slot] == 1
+    assert provisional.max_gain[slot] == 5.0
+    assert provisional.sum_gain[slot] == 5.0
+    assert provisional.satellite_names == ["A"]
+    assert len(provisional.rows[0]) == 1
+    assert analyser.hit_count[slot] == 2
+    assert len(analyser.rows[0]) == 2
+
+
 # --- summary methods --- 
 # Not testing string formatting in detail — fragile and low value.
 # Just checking they return strings and don't crash.
@@ -1,3 +1,4 @@
+import math
 import numpy as np
 import matplotlib
 import matplotlib.pyplot as plt
@@ -5,6 +6,7 @@ import matplotlib.animation as animation
 from collections import defaultdict
 from models.beam_model import BeamModel
 from core.observer import Observer
+from core.time_bins import strongest_per_slot
 import logging
 log = logging.getLogger(__name__)
 from core.runtime_dependencies import get_ffmpeg_path
@@ -19,8 +21,9 @@ class SkyPlot:
     - Right panel: target-centred relative view scaled to the beam prefilter
       radius, with satellites colour-mapped by gain percentage.
 
-    Frames are driven by the precomputed 1-second time array from the Observer,
-    with satellite positions sourced from the interference checker results dict.
+    Frames are driven by the Observer's precomputed time grid, one frame per
+    analysis slot (core.time_bins), with satellite positions sourced from the
+    interference checker results binned into the same slots.
     """
 
     def __init__(self, beam_model: BeamModel, observer: Observer, results: list):
@@ -48,14 +51,17 @@ class SkyPlot:
 
     def _organise_by_time(self):
         """
-        Organise results by timestamp
+        Organise results by the Observer grid slot they fall in, so samples
+        that drift by microseconds share a frame, keeping one row per
+        satellite per slot.
         """
-        self.by_time = defaultdict(list)
-        for row in self.results:
-            # normalise +00:00 to Z to match skyfield utc_iso() format
-            key = row["time_utc"].replace('+00:00', 'Z')
-            self.by_time[key].append(row)
-        self.sorted_times = [t.utc_iso() for t in self.observer.time_array]
+        bins = self.observer.bins
+        rows = strongest_per_slot(self.results, bins)
+        self.by_slot = defaultdict(list)
+        for slot, row in zip(bins.slots_from_iso([row["time_utc"] for row in rows]).tolist(), rows):
+            self.by_slot[slot].append(row)
+        places = max(0, math.ceil(-math.log10(bins.resolution_seconds)))
+        self.sorted_times = [t.utc_iso(places=places) for t in self.observer.time_array]
 
     def _prepare_target_track(self):
         """
@@ -84,7 +90,7 @@ class SkyPlot:
         """
         Render the dual-panel hemisphere animation.
 
-        Iterates over every second in the observation window. For each frame,
+        Iterates over every slot of the Observer's time grid. For each frame,
         the target marker is updated on both plots and any interfering satellites
         visible at that timestamp are drawn as scatter points coloured by gain
         percentage (plasma colormap, 0–100%).
@@ -172,17 +178,6 @@ class SkyPlot:
         annotations = []
         time_text = fig.text(0.5, 0.02, '', ha='center', fontsize=10, color='white')
 
-        #frame index lookup for target track
-        #map each result timestamp to nearest index in full time array
-        time_tt = self.observer.time_array.tt
-
-        def get_track_index(iso_time_str):
-            #parse ISO string back to skyfield tt for nearest lookup
-            from datetime import datetime, timezone
-            dt = datetime.fromisoformat(iso_time_str).replace(tzinfo=timezone.utc)
-            t = self.observer.ts.from_datetime(dt)
-            return int(np.argmin(np.abs(time_tt - t.tt)))
-        
         #----------------------------
 
         def update(frame):
@@ -191,11 +186,12 @@ class SkyPlot:
                 ann.remove()
             annotations = []
 
+            #frame i is grid slot i, for both the target track and the binned results
             time_key = self.sorted_times[frame]
-            rows = self.by_time[time_key]
+            rows = self.by_slot.get(frame, [])
 
             #update target marker on full sky plot
-            idx = get_track_index(time_key)
+            idx = frame
             target_marker_sky.set_data(
                 [self.full_target_theta[idx]],
                 [self.full_target_r[idx]]